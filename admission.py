@@ -0,0 +1,242 @@
+"""Inbound admission control: a cap on requests in flight and a fair, bounded wait queue."""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config import Settings, settings
+from error_handling import overloaded_exception_handler
+from exceptions import OverloadedError
+from mcp_server import TOOL_CALL_CLIENT
+
+MCP = "mcp"
+REST = "rest"
+# Requests that never queue: health checks, metrics, admin and docs stay reachable under load.
+EXEMPT_PATH_PREFIXES = ("/health", "/metrics", "/admin", "/docs", "/redoc", "/openapi.json")
+
+
+class AdmissionController:
+    """Admits at most `max_in_flight` requests at a time and queues the rest fairly.
+
+    Waiting requests are grouped by class (MCP or REST) and, within a class, by client.
+    A free slot goes to the class that has been served least relative to its weight, and
+    within it to the next client in round-robin order, so one busy client cannot starve
+    the others. Requests are shed with an `OverloadedError` when the queue or the client's
+    share of it is full, or when they have waited `max_wait` seconds.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        max_queue_per_client: int,
+        max_wait: float,
+        class_weights: Dict[str, float],
+        clock=time.monotonic,
+    ):
+        """Initializes an idle controller.
+
+        Args:
+            max_in_flight: Requests processed at once.
+            max_queue: Requests allowed to wait for a slot.
+            max_queue_per_client: Requests one client may have waiting.
+            max_wait: Longest a request may wait before being shed.
+            class_weights: Relative share of freed slots per request class.
+            clock: Monotonic time source, overridable in tests.
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self.max_wait = max_wait
+        self.class_weights = {name: max(weight, 1e-6) for name, weight in class_weights.items()}
+        self._clock = clock
+        self._waiting: Dict[str, "OrderedDict[str, Deque[asyncio.Future]]"] = {}
+        # Weighted count of slots handed to each class while others were waiting too.
+        self._served: Dict[str, float] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.admitted: Dict[str, int] = {}
+        self.shed: Dict[Tuple[str, str], int] = {}
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _shed(self, request_class: str, reason: str, detail: str):
+        self.shed[(request_class, reason)] = self.shed.get((request_class, reason), 0) + 1
+        raise OverloadedError(detail, reason, retry_after=self.max_wait)
+
+    def _admit(self, request_class: str):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.admitted[request_class] = self.admitted.get(request_class, 0) + 1
+
+    async def acquire(self, request_class: str, client: str):
+        """Waits for a slot for a request of `request_class` from `client`.
+
+        Raises:
+            OverloadedError: If the request cannot wait or waited too long.
+        """
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self._admit(request_class)
+            return
+        if self.queued >= self.max_queue:
+            self._shed(request_class, "queue_full", "The admission queue is full.")
+        clients = self._waiting.setdefault(request_class, OrderedDict())
+        waiters = clients.get(client)
+        if waiters is not None and len(waiters) >= self.max_queue_per_client:
+            self._shed(request_class, "client_queue_full", "Too many queued requests from one client.")
+        if not clients:
+            # A class that starts waiting again begins level with the busiest one instead
+            # of being owed every slot it did not need while it was idle.
+            active = [self._served[name] for name, queued in self._waiting.items() if queued]
+            self._served[request_class] = max(self._served.get(request_class, 0.0), min(active, default=0.0))
+        if waiters is None:
+            waiters = clients[client] = deque()
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        start = self._clock()
+        try:
+            await asyncio.wait_for(future, self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the wait ended; give it back.
+                self.release()
+            else:
+                self._remove(request_class, client, future)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            self._shed(request_class, "deadline", f"Request waited {self.max_wait:g}s for admission.")
+        finally:
+            waited = self._clock() - start
+            self.wait_count += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def _remove(self, request_class: str, client: str, future: asyncio.Future):
+        clients = self._waiting[request_class]
+        waiters = clients.get(client)
+        if waiters is not None and future in waiters:
+            waiters.remove(future)
+            self.queued -= 1
+            if not waiters:
+                del clients[client]
+
+    def release(self):
+        """Frees a slot and hands it to the next waiting request, if any."""
+        self.in_flight -= 1
+        while self.queued and self.in_flight < self.max_in_flight:
+            request_class = min(
+                (name for name, clients in self._waiting.items() if clients),
+                key=lambda name: self._served.get(name, 0.0),
+            )
+            clients = self._waiting[request_class]
+            client, waiters = next(iter(clients.items()))
+            future = waiters.popleft()
+            self.queued -= 1
+            # Round-robin: the client goes to the back of its class's line.
+            del clients[client]
+            if waiters:
+                clients[client] = waiters
+            if future.done():
+                # Its wait just timed out or was cancelled; the waiter sheds itself.
+                continue
+            self._served[request_class] = (
+                self._served.get(request_class, 0.0) + 1 / self.class_weights.get(request_class, 1.0)
+            )
+            self._admit(request_class)
+            future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns occupancy, queue depth per class, wait times and shed counts."""
+        shed: Dict[str, Dict[str, int]] = {}
+        for (request_class, reason), count in self.shed.items():
+            shed.setdefault(request_class, {})[reason] = count
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "queued_by_class": {
+                name: sum(len(waiters) for waiters in clients.values()) for name, clients in self._waiting.items()
+            },
+            "waiting_clients": sum(len(clients) for clients in self._waiting.values()),
+            "admitted": dict(self.admitted),
+            "shed": shed,
+            "wait": {
+                "avg_ms": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "max_ms": round(self.wait_max * 1000, 3),
+            },
+        }
+
+
+def build_admission_controller(settings: Settings) -> AdmissionController:
+    """Creates a controller from the application settings; limits are per worker process."""
+    return AdmissionController(
+        max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        max_queue_per_client=settings.ADMISSION_MAX_QUEUE_PER_CLIENT,
+        max_wait=settings.ADMISSION_MAX_WAIT,
+        class_weights=settings.ADMISSION_CLASS_WEIGHTS,
+    )
+
+
+class AdmissionMiddleware:
+    """ASGI middleware passing proxied REST requests and MCP messages through admission control.
+
+    MCP messages (POST /mcp) hold their slot while the tool calls they trigger are
+    dispatched back into the app, so those inner requests are not admitted again.
+    Clients are told apart by `client_header` (an API key), falling back to their address.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, mcp_path: str = "/mcp", client_header: str = ""):
+        """Wraps `app`."""
+        self.app = app
+        self.controller = controller
+        self.mcp_path = mcp_path
+        self.client_header = client_header.lower().encode("latin-1")
+
+    def classify(self, scope: Scope) -> Optional[str]:
+        """Returns the request class, or None if the request bypasses admission control."""
+        path = scope["path"]
+        if path == self.mcp_path:
+            return MCP if scope["method"] == "POST" else None
+        if path.startswith(EXEMPT_PATH_PREFIXES) or tuple(scope.get("client") or ()) == TOOL_CALL_CLIENT:
+            return None
+        return REST
+
+    def client_key(self, scope: Scope) -> str:
+        """Identifies the caller by API key header or, failing that, by address."""
+        if self.client_header:
+            for name, value in scope["headers"]:
+                if name == self.client_header:
+                    return "key:" + value.decode("latin-1")
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_class = self.classify(scope) if scope["type"] == "http" else None
+        if request_class is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.controller.acquire(request_class, self.client_key(scope))
+        except OverloadedError as exc:
+            response = await overloaded_exception_handler(Request(scope), exc)
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+
+admission_controller = build_admission_controller(settings)
@@ -0,0 +1,190 @@
+"""Local prefix index answering address autocomplete keystrokes without an upstream call."""
+
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache import ResponseCache
+from config import Settings, settings
+from pagination import page_totals
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_input(text: str) -> str:
+    """Lowercases `text` and collapses punctuation and whitespace into single spaces."""
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def _records_key(page: Dict[str, Any]) -> Optional[str]:
+    """Returns the key of a response's candidate list: its longest list of objects."""
+    best, best_len = None, -1
+    for key, value in page.items():
+        if isinstance(value, list) and len(value) > best_len and all(isinstance(item, dict) for item in value):
+            best, best_len = key, len(value)
+    return best
+
+
+def _is_error(page: Dict[str, Any]) -> bool:
+    return any(key.lower() == "iserror" and value for key, value in page.items())
+
+
+def _with_counts(page: Dict[str, Any], count: int) -> Dict[str, Any]:
+    """Returns `page` with its result and page counts (top-level or under `pagination`) set for `count` results."""
+    counted = {}
+    for key, value in page.items():
+        lowered = key.lower()
+        if lowered == "totalresults":
+            value = count
+        elif lowered == "totalpages":
+            value = 1 if count else 0
+        elif lowered == "pagination" and isinstance(value, dict):
+            value = _with_counts(value, count)
+        counted[key] = value
+    return counted
+
+
+def candidate_tokens(record: Dict[str, Any]) -> Tuple[str, ...]:
+    """Returns the normalized words of every string or number in a candidate."""
+    words = []
+    for value in record.values():
+        if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            words.extend(normalize_input(str(value)).split())
+    return tuple(words)
+
+
+def matches(query: List[str], tokens: Tuple[str, ...]) -> bool:
+    """Whether a candidate matches a partially typed input.
+
+    Every complete word of the input must appear in the candidate and the word being
+    typed (the last one) must start one of the candidate's words.
+    """
+    *complete, partial = query
+    for word in complete:
+        if word not in tokens:
+            return False
+    return any(token.startswith(partial) for token in tokens)
+
+
+class CandidateSet:
+    """A complete autocomplete answer for one prefix, with candidates pre-tokenized."""
+
+    __slots__ = ("template", "records_key", "candidates", "size")
+
+    def __init__(self, page: Dict[str, Any], records_key: str, size: int):
+        """Initializes the set.
+
+        Args:
+            page: The parsed upstream response.
+            records_key: The key of the candidate list within `page`.
+            size: The upstream body size, used as the entry's size in the store.
+        """
+        self.records_key = records_key
+        self.template = {key: value for key, value in page.items() if key != records_key}
+        self.candidates = [(record, candidate_tokens(record)) for record in page[records_key]]
+        self.size = size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def filter(self, query: List[str]) -> bytes:
+        """Returns a response body holding only the candidates that match `query`, counts included."""
+        records = [record for record, tokens in self.candidates if matches(query, tokens)]
+        page = {**_with_counts(self.template, len(records)), self.records_key: records}
+        return json.dumps(page).encode("utf-8")
+
+
+class PrefixIndex:
+    """Answers longer autocomplete inputs by filtering the result of a shorter prefix.
+
+    Only answers the upstream reports as complete are stored: the response must carry a
+    total result count that its candidates reach. An input is answered locally when one
+    of its prefixes has a stored complete set: every address matching the longer input
+    also matches the prefix, so filtering that set loses nothing. Entries live in a
+    `ResponseCache`, bounded by count and size with least-recently-used eviction.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, clock=time.monotonic):
+        """Initializes the index.
+
+        Args:
+            max_entries: Maximum number of stored prefixes.
+            max_bytes: Maximum total size of the stored upstream bodies.
+            ttl: Seconds a stored answer may be used.
+            clock: Monotonic time source, overridable in tests.
+        """
+        self.ttl = ttl
+        self._store = ResponseCache(max_entries, max_bytes, clock)
+        self.lookups = 0
+        self.hits = 0
+        self.stored = 0
+        self.incomplete = 0
+
+    def lookup(self, text: str) -> Optional[bytes]:
+        """Returns a locally built response body for `text`, or None to ask the upstream."""
+        self.lookups += 1
+        normalized = normalize_input(text)
+        query = normalized.split()
+        if not query:
+            return None
+        # Longest stored prefix first: it has the fewest candidates to filter.
+        for end in range(len(normalized), 0, -1):
+            entry = self._store.get(normalized[:end])
+            if entry is not None:
+                self.hits += 1
+                return entry.value.filter(query)
+        return None
+
+    def add(self, text: str, body: bytes):
+        """Stores the upstream answer for `text` if the upstream reports it as a complete candidate set."""
+        normalized = normalize_input(text)
+        if not normalized:
+            return
+        try:
+            page = json.loads(body)
+        except ValueError:
+            return
+        if not isinstance(page, dict) or _is_error(page):
+            return
+        records_key = _records_key(page)
+        if records_key is None:
+            return
+        # Without a reported total the answer may be truncated, so it is never reused.
+        _, total_results = page_totals(page)
+        if total_results is None or len(page[records_key]) < total_results:
+            self.incomplete += 1
+            return
+        self._store.set(normalized, CandidateSet(page, records_key, len(body)), self.ttl)
+        self.stored += 1
+
+    def clear(self):
+        """Forgets every stored answer."""
+        self._store.purge()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit-rate and occupancy statistics."""
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_ratio": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "stored": self.stored,
+            "incomplete": self.incomplete,
+            "entries": len(self._store),
+            "bytes": self._store.total_bytes,
+            "max_entries": self._store.max_entries,
+            "max_bytes": self._store.max_bytes,
+            "evictions": self._store.evictions,
+        }
+
+
+def build_prefix_index(settings: Settings) -> PrefixIndex:
+    """Creates an index sized from the application settings."""
+    return PrefixIndex(
+        settings.AUTOCOMPLETE_INDEX_MAX_ENTRIES,
+        settings.AUTOCOMPLETE_INDEX_MAX_BYTES,
+        settings.AUTOCOMPLETE_INDEX_TTL,
+    )
+
+
+autocomplete_index = build_prefix_index(settings)
@@ -0,0 +1,86 @@
+"""Bounded concurrent fan-out for the batch variants of the single-result endpoints."""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from exceptions import DeadlineExceededError, EnformionGOException, RateLimitError, UpstreamUnavailableError
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def describe_item_error(exc: Exception) -> Tuple[int, Any]:
+    """Maps an exception raised while processing one batch item to a status and detail.
+
+    Mirrors the status codes and messages the single-item endpoints would have returned.
+    """
+    if isinstance(exc, ValidationError):
+        return 422, exc.errors(include_url=False, include_context=False)
+    if isinstance(exc, HTTPException):
+        return exc.status_code, exc.detail
+    if isinstance(exc, RateLimitError):
+        return 429, "Too many requests to the upstream service. Please retry later."
+    if isinstance(exc, UpstreamUnavailableError):
+        return 503, "The upstream service is temporarily unavailable. Please retry later."
+    if isinstance(exc, DeadlineExceededError):
+        return 504, "The request deadline passed before the upstream service answered."
+    if isinstance(exc, EnformionGOException):
+        logger.error("EnformionGO Exception in batch item: %s", exc.detail)
+        return 400, "An internal error occurred while processing the request."
+    logger.exception("Unexpected error in batch item")
+    return 500, "An unexpected error occurred while processing the item."
+
+
+def ndjson_line(index: int, status: int, *, result: bytes = None, error: Any = None) -> bytes:
+    """Encodes one batch record as an NDJSON line.
+
+    Successful results are spliced in as the raw upstream JSON body, so they are never
+    parsed and re-serialised.
+    """
+    if result is not None:
+        return b'{"index":%d,"status":%d,"result":%s}\n' % (index, status, result)
+    return json.dumps({"index": index, "status": status, "error": error}).encode("utf-8") + b"\n"
+
+
+async def run_batch(
+    items: List[Any],
+    process: Callable[[Any], Awaitable[bytes]],
+    concurrency: int,
+) -> AsyncIterator[bytes]:
+    """Processes `items` with at most `concurrency` calls in flight.
+
+    Yields one NDJSON line per item in completion order, tagged with the item's input
+    index. A failing item produces an error line and never aborts the rest of the batch.
+    If the consumer stops early (e.g. the client disconnects), outstanding work is cancelled.
+    """
+    pending: asyncio.Queue = asyncio.Queue()
+    for entry in enumerate(items):
+        pending.put_nowait(entry)
+    done: asyncio.Queue = asyncio.Queue()
+
+    async def worker():
+        while True:
+            try:
+                index, item = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                line = ndjson_line(index, 200, result=await process(item))
+            except Exception as exc:
+                status, detail = describe_item_error(exc)
+                line = ndjson_line(index, status, error=detail)
+            await done.put(line)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max(1, min(concurrency, len(items))))]
+    try:
+        for _ in range(len(items)):
+            yield await done.get()
+    finally:
+        for task in workers:
+            task.cancel()
@@ -0,0 +1,157 @@
+"""Measures the per-request overhead of the compiled dispatch plans.
+
+Run from the repository root (credentials may be dummies, nothing is sent upstream):
+
+    python -m benchmarks.bench_dispatch [--iterations 20000]
+
+Two minimal apps serve `/caller-id` and stop right before the upstream call:
+
+* legacy: a hand-written handler as before the endpoint registry, resolving
+  `Depends(get_settings)`, checking credentials, calling `model_dump`, looking up the
+  cache TTL and timeouts and building the header dict on every request;
+* plan: the handler generated from the compiled `DispatchPlan`.
+
+Both are driven through raw ASGI calls, so the numbers cover routing, body parsing,
+validation and the per-request setup, but no network I/O. The setup step alone is also
+timed without the framework.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import Response
+
+from cache import cache_ttl_for, make_cache_key
+from config import Settings, settings
+from endpoints import DispatchPlan, build_handler, compile_plans
+from exceptions import APIConnectionError
+from models import CallerIdRequest
+from resilience import resolve_timeouts
+
+BODY = json.dumps({"Phone": "555-123-4567"}).encode()
+SEARCH_TYPE = "DevAPICallerID"
+
+
+def get_settings():
+    return settings
+
+
+def legacy_setup(search_request: CallerIdRequest, settings: Settings):
+    """The per-request work the hand-written handlers did before reaching the upstream."""
+    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
+    if not settings.GALAXY_AP_NAME or not settings.GALAXY_AP_PASSWORD:
+        raise APIConnectionError("API credentials (GALAXY_AP_NAME, GALAXY_AP_PASSWORD) are not configured.")
+    ttl = cache_ttl_for(settings, "/caller-id")
+    key = make_cache_key(settings.CALLER_ID_API_URL, SEARCH_TYPE, request_body)
+    headers = {
+        "galaxy-ap-name": settings.GALAXY_AP_NAME,
+        "galaxy-ap-password": settings.GALAXY_AP_PASSWORD.get_secret_value(),
+        "galaxy-search-type": SEARCH_TYPE,
+        "Content-Type": "application/json",
+    }
+    timeouts = resolve_timeouts(settings, "/caller-id")
+    return request_body, ttl, key, headers, timeouts
+
+
+def plan_setup(plan: DispatchPlan, search_type: str, search_request: CallerIdRequest):
+    """The per-request work left with a compiled plan."""
+    request_body = plan.dump(search_request)
+    if plan.credentials_error:
+        raise APIConnectionError(plan.credentials_error)
+    key = make_cache_key(plan.api_url, search_type, request_body)
+    return request_body, plan.cache_ttl, key, plan.headers_for(search_type), plan.timeout
+
+
+def build_apps(plan: DispatchPlan):
+    legacy = FastAPI()
+
+    @legacy.post("/caller-id")
+    async def caller_id(search_request: CallerIdRequest, settings: Settings = Depends(get_settings)):
+        legacy_setup(search_request, settings)
+        return Response(b"{}", media_type="application/json")
+
+    compiled = FastAPI()
+
+    async def dispatch(plan, search_type, payload, paging, projection):
+        plan_setup(plan, search_type, payload)
+        return Response(b"{}", media_type="application/json")
+
+    compiled.add_api_route("/caller-id", build_handler(plan, dispatch), methods=["POST"])
+    return legacy, compiled
+
+
+async def drive(app, iterations: int) -> float:
+    """Returns microseconds per request for `iterations` ASGI requests."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/caller-id",
+        "raw_path": b"/caller-id",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(BODY)).encode())],
+        "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": BODY, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    for _ in range(200):  # warm up
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) * 1e6 / iterations
+
+
+def time_setup(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000, help="Requests timed per variant.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    plan = next(plan for plan in compile_plans(settings) if plan.spec.path == "/caller-id")
+    legacy_app, plan_app = build_apps(plan)
+    request = CallerIdRequest.model_validate_json(BODY)
+
+    results = {
+        "setup_us": {
+            "legacy": round(time_setup(lambda: legacy_setup(request, settings), args.iterations), 3),
+            "plan": round(time_setup(lambda: plan_setup(plan, SEARCH_TYPE, request), args.iterations), 3),
+        },
+        "request_us": {
+            "legacy": round(asyncio.run(drive(legacy_app, args.iterations)), 3),
+            "plan": round(asyncio.run(drive(plan_app, args.iterations)), 3),
+        },
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.iterations} iterations, microseconds per request")
+    print(f"{'':<22}{'legacy':>10}{'plan':>10}{'saved':>10}")
+    for label, key in (("setup only", "setup_us"), ("full ASGI request", "request_us")):
+        legacy, compiled = results[key]["legacy"], results[key]["plan"]
+        print(f"{label:<22}{legacy:>10}{compiled:>10}{legacy - compiled:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
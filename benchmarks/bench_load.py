@@ -0,0 +1,293 @@
+"""Load-tests every proxied endpoint against the local mock upstream.
+
+Run from the repository root (credentials may be dummies, nothing leaves the machine):
+
+    python -m benchmarks.bench_load [--concurrency 16] [--duration 5] [--latency 0.05]
+    python -m benchmarks.bench_load --compare benchmarks/results/<commit>.json
+
+`benchmarks.mock_upstream` is started with the given latency, error and 429 injection,
+and the proxy is started in front of it with `gunicorn main:app` (so `gunicorn.conf.py`
+applies, `--workers` sets `WEB_CONCURRENCY`). Each endpoint is then driven for
+`--duration` seconds with `--concurrency` requests in flight, spread over `--clients`
+load generator processes. Request bodies differ from one request to the next. The
+response cache and request coalescing are off unless `--cache` is given, so every request
+reaches the upstream.
+
+Per endpoint the harness reports requests per second, p50/p95/p99 latency, non-2xx
+responses and the proxy's CPU time per request (user + system time of the gunicorn
+processes, read from /proc). Results are saved as JSON under `benchmarks/results/`,
+named after the current commit. `--compare` prints the change against an earlier
+results file and exits with status 1 when an endpoint regressed by more than
+`--threshold`.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.mock_upstream import add_arguments, mock_options, run as run_mock, upstream_env
+from benchmarks.bench_workers import free_port, wait_ready
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _phone(i: int) -> str:
+    return f"555-{i // 10_000 % 1000:03d}-{i % 10_000:04d}"
+
+
+# Proxy path -> (extra request headers, request body for request number i)
+REQUESTS: Dict[str, Tuple[Dict[str, str], Callable[[int], Dict[str, Any]]]] = {
+    "/contact-enrichment": ({}, lambda i: {"FirstName": "Jane", "LastName": f"Doe{i}", "Phone": _phone(i)}),
+    "/caller-id": ({}, lambda i: {"Phone": _phone(i)}),
+    "/email-id": ({}, lambda i: {"Email": f"jane.doe{i}@example.com"}),
+    "/contact-id": ({}, lambda i: {"PersonId": f"G{i:011d}"}),
+    "/address-id": ({}, lambda i: {"addressLine1": f"{i} Main St", "addressLine2": "Springfield, IL"}),
+    "/address-autocomplete": ({}, lambda i: {"Input": f"{i} Main"}),
+    "/person-search": ({}, lambda i: {"FirstName": "Jane", "LastName": f"Doe{i}"}),
+    "/reverse-phone-search": ({}, lambda i: {"Phone": _phone(i)}),
+    "/id-verification": ({}, lambda i: {"FirstName": "Jane", "LastName": f"Doe{i}", "Phones": [_phone(i)]}),
+    "/census-search": ({}, lambda i: {"FirstName": "Jane", "LastName": f"Doe{i}"}),
+    "/divorce-search": ({}, lambda i: {"FirstName": "Jane", "LastName": f"Doe{i}", "State": "IL"}),
+    "/linkedin-id": ({}, lambda i: {"profileURL": f"https://www.linkedin.com/in/jane-doe-{i}"}),
+    "/property-search-v2": (
+        {"galaxy-search-type": "Property"},
+        lambda i: {"addressLine1": f"{i} Main St", "addressLine2": "Springfield, IL"},
+    ),
+    "/business-search": ({}, lambda i: {"businessName": f"Acme {i}"}),
+    "/business-search-v2": ({"galaxy-search-type": "BusinessV2"}, lambda i: {"businessName": f"Acme {i}"}),
+    "/domain-search": ({"galaxy-search-type": "DomainSearch"}, lambda i: {"domain": f"acme{i}.example"}),
+    "/workplace-search": ({"galaxy-search-type": "Workplace"}, lambda i: {"businessName": f"Acme {i}"}),
+    "/business-id": ({"galaxy-search-type": "BusinessId"}, lambda i: {"businessId": f"B{i:011d}"}),
+    "/caller-id/batch": ({}, lambda i: {"items": [{"Phone": _phone(i * 10 + n)} for n in range(10)]}),
+}
+
+
+async def _load(base_url: str, path: str, concurrency: int, duration: float, seed: int) -> Tuple[List[float], int]:
+    headers, make_body = REQUESTS[path]
+    latencies: List[float] = []
+    failures = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+
+        async def user(offset: int):
+            nonlocal failures
+            number = seed * 1_000_003 + offset
+            while time.perf_counter() < deadline:
+                number += concurrency
+                start = time.perf_counter()
+                response = await client.post(path, json=make_body(number), headers=headers)
+                await response.aread()
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 300:
+                    failures += 1
+
+        await asyncio.gather(*(user(offset) for offset in range(concurrency)))
+    return latencies, failures
+
+
+def run_client(base_url: str, path: str, concurrency: int, duration: float, seed: int, results):
+    """Keeps `concurrency` requests to `path` in flight for `duration` seconds."""
+    results.put(asyncio.run(_load(base_url, path, concurrency, duration, seed)))
+
+
+def process_tree_cpu(pid: int) -> Optional[float]:
+    """Returns the user + system CPU seconds of `pid` and its direct children, if /proc exists."""
+    ticks = os.sysconf("SC_CLK_TCK")
+    total = 0.0
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as handle:
+                # The command name may contain spaces; the fields after it are space separated.
+                fields = handle.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(entry) == pid or int(fields[1]) == pid:
+            total += (int(fields[11]) + int(fields[12])) / ticks
+    return total
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def measure(base_url: str, server_pid: int, path: str, args) -> dict:
+    results = multiprocessing.Queue()
+    per_client = max(1, args.concurrency // args.clients)
+    clients = [
+        multiprocessing.Process(target=run_client, args=(base_url, path, per_client, args.duration, seed, results))
+        for seed in range(args.clients)
+    ]
+    cpu_before = process_tree_cpu(server_pid)
+    for client in clients:
+        client.start()
+    latencies: List[float] = []
+    failures = 0
+    for _ in clients:
+        client_latencies, client_failures = results.get()
+        latencies += client_latencies
+        failures += client_failures
+    for client in clients:
+        client.join()
+    cpu_after = process_tree_cpu(server_pid)
+    latencies.sort()
+    cpu_ms = None
+    if cpu_before is not None and latencies:
+        cpu_ms = round((cpu_after - cpu_before) / len(latencies) * 1000, 3)
+    return {
+        "endpoint": path,
+        "requests": len(latencies),
+        "non_2xx": failures,
+        "rps": round(len(latencies) / args.duration, 1),
+        **{
+            f"p{round(fraction * 100)}_ms": round(value * 1000, 2) if value is not None else None
+            for fraction in (0.5, 0.95, 0.99)
+            for value in [percentile(latencies, fraction)]
+        },
+        "cpu_ms_per_request": cpu_ms,
+    }
+
+
+def current_commit() -> str:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+        return commit + ("-dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Prints the change of every endpoint against `baseline` and returns the regressed ones."""
+    previous = {row["endpoint"]: row for row in baseline["results"]}
+    regressions = []
+    print(f"\nchange against {baseline['commit']} (regression: worse by more than {threshold:.0%})")
+    print(f"{'endpoint':<24}{'req/s':>9}{'p99':>9}{'cpu/req':>9}")
+    columns = ("rps", "p99_ms", "cpu_ms_per_request")
+    for row in current["results"]:
+        before = previous.get(row["endpoint"])
+        if before is None:
+            continue
+        changes = {}
+        for key in columns:
+            higher_is_better = key == "rps"
+            if before.get(key) and row.get(key) is not None:
+                change = row[key] / before[key] - 1
+                changes[key] = change
+                if (-change if higher_is_better else change) > threshold:
+                    regressions.append(row["endpoint"])
+        print(
+            f"{row['endpoint']:<24}"
+            + "".join(f"{changes[key]:>+9.1%}" if key in changes else f"{'':>9}" for key in columns)
+            + ("  REGRESSION" if row["endpoint"] in regressions else "")
+        )
+    return sorted(set(regressions))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cpus = os.process_cpu_count() or 1
+    parser.add_argument("--endpoints", nargs="+", default=list(REQUESTS), choices=list(REQUESTS), metavar="PATH")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of load per endpoint.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight across all clients.")
+    parser.add_argument("--clients", type=int, default=max(1, cpus // 2), help="Load generator processes.")
+    parser.add_argument("--workers", type=int, default=1, help="Proxy worker processes.")
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache and request coalescing on.")
+    parser.add_argument("--save", help="Results file (default: benchmarks/results/<commit>.json).")
+    parser.add_argument("--compare", help="Earlier results file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    upstream_port, port = free_port(), free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    upstream = multiprocessing.Process(target=run_mock, args=(upstream_port,), kwargs=mock_options(args), daemon=True)
+    upstream.start()
+    rows = []
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = {
+                **os.environ,
+                **upstream_env(f"http://127.0.0.1:{upstream_port}"),
+                "GALAXY_AP_NAME": os.environ.get("GALAXY_AP_NAME", "bench"),
+                "GALAXY_AP_PASSWORD": os.environ.get("GALAXY_AP_PASSWORD", "bench"),
+                "JOBS_DB_PATH": os.path.join(data_dir, "jobs.sqlite3"),
+                "SCHEMA_CACHE_PATH": os.path.join(data_dir, "schema_cache.json"),
+                "WEB_CONCURRENCY": str(args.workers),
+                "GUNICORN_BIND": f"127.0.0.1:{port}",
+                "GUNICORN_MAX_REQUESTS": "0",
+                "LOG_LEVEL": "ERROR",
+            }
+            if not args.cache:
+                for name in ("CACHE_ENABLED", "SINGLEFLIGHT_ENABLED", "AUTOCOMPLETE_INDEX_ENABLED"):
+                    env[name] = "false"
+            server = subprocess.Popen(
+                [sys.executable, "-m", "gunicorn", "main:app", "--log-level", "warning"],
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                wait_ready(base_url)
+                # Warm-up: fill the connection pools and let the MCP server finish building.
+                asyncio.run(_load(base_url, "/caller-id", args.concurrency, 1.0, -1))
+                for path in args.endpoints:
+                    rows.append(measure(base_url, server.pid, path, args))
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+    finally:
+        upstream.terminate()
+
+    report = {
+        "commit": current_commit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "machine": {"cpus": cpus, "python": platform.python_version(), "platform": platform.platform()},
+        "options": {key: value for key, value in vars(args).items() if key not in ("save", "compare", "json")},
+        "results": rows,
+    }
+    path = args.save or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as handle:
+        json.dump(report, handle, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{cpus} CPUs, {args.concurrency} requests in flight, {args.duration:g}s per endpoint, results in {path}")
+        print(f"{'endpoint':<24}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'non-2xx':>9}{'cpu ms':>9}")
+        for row in rows:
+            print(
+                f"{row['endpoint']:<24}{row['rps']:>9}{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}"
+                f"{row['non_2xx']:>9}{row['cpu_ms_per_request']:>9}"
+            )
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare(json.load(handle), report, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Measures what an error log call costs the thread that makes it.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_logging [--records 2000] [--write-delay 0.001]
+
+Each setup logs `--records` errors with a traceback from one call site, as an error storm
+would, and reports the caller's time per call:
+
+* `loguru`: the previous configuration, a stdlib handler walking the stack and handing
+  each record to a Loguru sink that writes synchronously;
+* `pipeline`: `logging_config`'s queue and writer thread, without sampling;
+* `pipeline+sampling`: the same with the default per-call-site sampling.
+
+Output goes to a stream whose `write` sleeps `--write-delay` seconds, standing in for a
+stderr pipe that the log collector drains slowly.
+"""
+
+import argparse
+import json
+import logging
+import time
+
+from loguru import logger as loguru_logger
+
+from logging_config import DEFAULT_SAMPLE_BURST, DEFAULT_SAMPLE_WINDOW, LogPipeline, PipelineHandler, RepeatSampler
+
+
+class SlowStream:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def write(self, text: str):
+        time.sleep(self.delay)
+
+    def flush(self):
+        pass
+
+
+class LoguruInterceptHandler(logging.Handler):
+    """The stdlib-to-Loguru bridge as it was configured before the pipeline."""
+
+    def emit(self, record):
+        try:
+            level = loguru_logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+        frame, depth = logging.currentframe(), 2
+        while frame.f_code.co_filename == logging.__file__:
+            frame = frame.f_back
+            depth += 1
+        loguru_logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+
+
+def storm(log: logging.Logger, records: int) -> float:
+    """Logs `records` errors with a traceback and returns the caller's seconds per call."""
+    try:
+        raise ConnectionError("All connection attempts failed")
+    except ConnectionError:
+        start = time.perf_counter()
+        for number in range(records):
+            log.error("Error communicating with EnformionGO API: request %d", number, exc_info=True)
+        return (time.perf_counter() - start) / records
+
+
+def run(name: str, handler: logging.Handler, records: int) -> float:
+    log = logging.getLogger(f"bench.{name}")
+    log.handlers = [handler]
+    log.propagate = False
+    return storm(log, records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2_000)
+    parser.add_argument("--write-delay", type=float, default=0.001, help="Seconds each stream write takes.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+    stream = SlowStream(args.write_delay)
+
+    loguru_logger.remove()
+    loguru_logger.add(stream, level="INFO")
+    results = {"loguru": run("loguru", LoguruInterceptHandler(), args.records)}
+    loguru_logger.remove()
+
+    for name, sampler in (
+        ("pipeline", None),
+        ("pipeline+sampling", RepeatSampler(DEFAULT_SAMPLE_BURST, DEFAULT_SAMPLE_WINDOW)),
+    ):
+        pipeline = LogPipeline(stream, max_queue=args.records)
+        pipeline.start()
+        results[name] = run(name, PipelineHandler(pipeline, sampler), args.records)
+        pipeline.close(timeout=0)
+
+    if args.json:
+        print(json.dumps({name: round(seconds * 1e6, 2) for name, seconds in results.items()}, indent=2))
+        return
+    print(f"{args.records} error records with traceback, {args.write_delay * 1000:g} ms per stream write")
+    print(f"{'setup':>18}{'us/call':>10}")
+    for name, seconds in results.items():
+        print(f"{name:>18}{seconds * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
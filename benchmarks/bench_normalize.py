@@ -0,0 +1,108 @@
+"""Measures what request normalization costs and how many cache keys it saves.
+
+Run from the repository root (credentials may be dummies, nothing is sent upstream):
+
+    python -m benchmarks.bench_normalize [--iterations 50000]
+
+Each request body is validated twice: once with plain mirror models that accept the
+values as sent (the behaviour before normalization), and once with the real request
+models. The second table counts the distinct cache keys produced by equivalent
+spellings of the same phone, email and address.
+"""
+
+import argparse
+import json
+import time
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from cache import make_cache_key
+from models import CallerIdRequest, EmailIdRequest, IdVerificationRequest
+
+
+class PlainCallerId(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    phone: str = Field(..., alias="Phone")
+
+
+class PlainEmailId(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    email: str = Field(..., alias="Email")
+
+
+class PlainIdVerification(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    first_name: Optional[str] = Field(None, alias="FirstName")
+    last_name: Optional[str] = Field(None, alias="LastName")
+    address_line_1: Optional[str] = Field(None, alias="AddressLine1")
+    address_line_2: Optional[str] = Field(None, alias="AddressLine2")
+    phones: Optional[List[str]] = Field(None, alias="Phones")
+    emails: Optional[List[str]] = Field(None, alias="Emails")
+
+
+CASES = {
+    "caller-id": (
+        PlainCallerId,
+        CallerIdRequest,
+        [{"Phone": "(555) 123-4567"}, {"Phone": "555-123-4567"}, {"Phone": "+15551234567"}, {"Phone": "555.123.4567"}],
+    ),
+    "email-id": (
+        PlainEmailId,
+        EmailIdRequest,
+        [{"Email": "Jane.Doe@Example.com"}, {"Email": "jane.doe@example.com"}, {"Email": " JANE.DOE@EXAMPLE.COM "}],
+    ),
+    "id-verification": (
+        PlainIdVerification,
+        IdVerificationRequest,
+        [
+            {"FirstName": "Jane", "AddressLine1": "123 Main St", "Phones": ["(555) 123-4567"]},
+            {"FirstName": "Jane", "AddressLine1": "123  MAIN ST ", "Phones": ["555-123-4567", "+15551234567"]},
+        ],
+    ),
+}
+
+
+def validate_and_key(model, raw: bytes) -> str:
+    """The per-request work up to the cache lookup."""
+    request_body = model.model_validate_json(raw).model_dump(by_alias=True, exclude_none=True)
+    return make_cache_key("https://upstream.invalid", "bench", request_body)
+
+
+def time_per_request(model, bodies: List[bytes], iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        validate_and_key(model, bodies[i % len(bodies)])
+    return (time.perf_counter() - start) * 1e6 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50_000, help="Requests timed per variant.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    results = {}
+    for name, (plain, normalized, variants) in CASES.items():
+        bodies = [json.dumps(variant).encode() for variant in variants]
+        results[name] = {
+            "variants": len(bodies),
+            "keys_plain": len({validate_and_key(plain, body) for body in bodies}),
+            "keys_normalized": len({validate_and_key(normalized, body) for body in bodies}),
+            "plain_us": round(time_per_request(plain, bodies, args.iterations), 3),
+            "normalized_us": round(time_per_request(normalized, bodies, args.iterations), 3),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.iterations} iterations, microseconds per request up to the cache lookup")
+    print(f"{'':<18}{'plain':>10}{'normalized':>12}{'added':>10}{'variants':>10}{'keys':>10}")
+    for name, row in results.items():
+        added = row["normalized_us"] - row["plain_us"]
+        keys = f"{row['keys_plain']}->{row['keys_normalized']}"
+        print(f"{name:<18}{row['plain_us']:>10}{row['normalized_us']:>12}{added:>10.3f}{row['variants']:>10}{keys:>10}")
+
+
+if __name__ == "__main__":
+    main()
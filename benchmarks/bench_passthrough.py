@@ -0,0 +1,122 @@
+"""Compares the parse-and-re-serialise response path with raw passthrough.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_passthrough [--records 200] [--iterations 200]
+
+For a synthetic property-search page it reports CPU time per request and the peak
+memory allocated while building one response, for:
+
+* parse: `json.loads` + `jsonable_encoder` + `JSONResponse`, what FastAPI does when an
+  endpoint returns the upstream dict (the previous behaviour);
+* passthrough: forwarding the upstream bytes in a `PassthroughResponse`;
+* passthrough (gzip): the same with a gzip-compressed upstream body sent to a client
+  that accepts gzip, i.e. no decompression at all.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from passthrough import PassthroughResponse, RawBody
+
+SCOPE = {"type": "http", "headers": [(b"accept-encoding", b"gzip, deflate")]}
+
+
+def make_payload(records: int) -> bytes:
+    """Builds a property-search-like page with `records` results."""
+    results = []
+    for i in range(records):
+        results.append(
+            {
+                "propertyId": f"P{i:08d}",
+                "address": {
+                    "addressLine1": f"{i} Main St",
+                    "city": "Springfield",
+                    "state": "IL",
+                    "zipCode": "62701",
+                    "county": "Sangamon",
+                    "latitude": 39.78 + i / 1e5,
+                    "longitude": -89.65 - i / 1e5,
+                },
+                "owners": [
+                    {"firstName": "Jane", "lastName": f"Doe{i}", "ownershipType": "Individual", "since": "2011-04-01"},
+                    {"firstName": "John", "lastName": f"Doe{i}", "ownershipType": "Individual", "since": "2011-04-01"},
+                ],
+                "assessments": [
+                    {"year": 2015 + y, "landValue": 40_000 + y * 1_000, "improvementValue": 150_000 + y * 3_000}
+                    for y in range(8)
+                ],
+                "sales": [{"date": f"20{10 + s}-06-15", "price": 180_000 + s * 12_500, "type": "Warranty"} for s in range(4)],
+                "apn": f"14-{i:06d}-000",
+                "fips": "17167",
+                "bedrooms": 3,
+                "bathrooms": 2.5,
+                "livingAreaSqft": 1850,
+                "yearBuilt": 1978,
+            }
+        )
+    return json.dumps({"pagination": {"currentPageNumber": 1, "totalResults": records}, "results": results}).encode()
+
+
+async def _discard(message):
+    pass
+
+
+def parse_path(raw: bytes):
+    return JSONResponse(jsonable_encoder(json.loads(raw)))
+
+
+def passthrough_path(body: RawBody):
+    response = PassthroughResponse(body)
+    asyncio.run(response(SCOPE, None, _discard))
+    return response
+
+
+def measure(label: str, fn, arg, iterations: int) -> dict:
+    """Returns CPU ms per call and peak KiB allocated by one call."""
+    fn(arg)  # warm up
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(arg)
+    cpu_ms = (time.process_time() - start) * 1000 / iterations
+
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"path": label, "cpu_ms_per_request": round(cpu_ms, 3), "peak_kib": round(peak / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=200, help="Results per synthetic page.")
+    parser.add_argument("--iterations", type=int, default=200, help="Requests timed per path.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    raw = make_payload(args.records)
+    compressed = gzip.compress(raw)
+    results = [
+        measure("parse", parse_path, raw, args.iterations),
+        measure("passthrough", passthrough_path, RawBody(raw), args.iterations),
+        measure("passthrough (gzip)", passthrough_path, RawBody(compressed, encoding="gzip"), args.iterations),
+    ]
+
+    if args.json:
+        print(json.dumps({"payload_bytes": len(raw), "gzip_bytes": len(compressed), "results": results}, indent=2))
+        return
+    print(f"payload: {len(raw) / 1024:.1f} KiB ({len(compressed) / 1024:.1f} KiB gzip), {args.iterations} iterations")
+    print(f"{'path':<22}{'cpu ms/request':>16}{'peak KiB':>12}")
+    for row in results:
+        print(f"{row['path']:<22}{row['cpu_ms_per_request']:>16}{row['peak_kib']:>12}")
+
+
+if __name__ == "__main__":
+    main()
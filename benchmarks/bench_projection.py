@@ -0,0 +1,153 @@
+"""Compares ways of applying a `fields` projection and the bytes it saves.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_projection [--persons 20] [--iterations 200]
+
+A synthetic person-search page is projected onto a few fields with:
+
+* parse-then-prune: the C `json` decoder builds the full document, `Projection.apply`
+  prunes it and the selection is re-encoded (what the server does);
+* skip-while-parsing: a Python scanner that only materialises selected values and skips
+  the rest with regular expressions, i.e. projection during parsing.
+
+The full `json.loads` and the original and projected sizes are reported for reference.
+"""
+
+import argparse
+import json
+import re
+import time
+from json.decoder import JSONDecoder, scanstring
+
+from projection import Projection, parse_fields
+
+FIELDS = "persons.tahoeId,persons.name.firstName,persons.name.lastName,pagination"
+
+_scan_once = JSONDecoder().scan_once
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{}]')
+
+
+def person(i: int) -> dict:
+    return {
+        "tahoeId": f"G{i}",
+        "name": {"firstName": "Jane", "middleName": "Q", "lastName": "Doe"},
+        "age": 40,
+        "addresses": [
+            {
+                "street": f"{n} Main St",
+                "city": "Springfield",
+                "state": "IL",
+                "zip": "62701",
+                "firstReportedDate": "1/1/2000",
+                "lastReportedDate": "1/1/2020",
+                "phoneNumbers": ["555-123-4567"] * 3,
+            }
+            for n in range(8)
+        ],
+        "phoneNumbers": [{"phoneNumber": "555-123-4567", "company": "AT&T", "isConnected": True}] * 6,
+        "emailAddresses": [{"emailAddress": "jane@example.com", "isPremium": False}] * 4,
+        "relativesSummary": [{"firstName": "John", "lastName": "Doe", "tahoeId": "G1"}] * 10,
+    }
+
+
+def _skip(text: str, index: int) -> int:
+    """Returns the end of the JSON value at `index` without building it."""
+    first = text[index]
+    if first == '"':
+        return _STRING.match(text, index).end()
+    if first in "{[":
+        depth = 0
+        for match in _TOKEN.finditer(text, index):
+            token = match.group()
+            if token[0] == '"':
+                continue
+            depth += 1 if token in "{[" else -1
+            if depth == 0:
+                return match.end()
+    return _scan_once(text, index)[1]
+
+
+def _parse(text: str, index: int, tree):
+    index = _WHITESPACE.match(text, index).end()
+    if tree is None:
+        return _scan_once(text, index)
+    first = text[index]
+    if first == "{":
+        kept = {}
+        index = _WHITESPACE.match(text, index + 1).end()
+        if text[index] == "}":
+            return kept, index + 1
+        while True:
+            key, index = scanstring(text, index + 1)
+            index = _WHITESPACE.match(text, _WHITESPACE.match(text, index).end() + 1).end()
+            lowered = key.lower()
+            if lowered in tree:
+                kept[key], index = _parse(text, index, tree[lowered])
+            else:
+                index = _skip(text, index)
+            index = _WHITESPACE.match(text, index).end()
+            if text[index] == "}":
+                return kept, index + 1
+            index = _WHITESPACE.match(text, index + 1).end()
+    if first == "[":
+        items = []
+        index = _WHITESPACE.match(text, index + 1).end()
+        if text[index] == "]":
+            return items, index + 1
+        while True:
+            item, index = _parse(text, index, tree)
+            items.append(item)
+            index = _WHITESPACE.match(text, index).end()
+            if text[index] == "]":
+                return items, index + 1
+            index += 1
+    return _scan_once(text, index)
+
+
+def skip_while_parsing(projection: Projection, body: bytes) -> bytes:
+    selected = _parse(body.decode("utf-8"), 0, projection.tree)[0]
+    return json.dumps(selected, separators=(",", ":")).encode("utf-8")
+
+
+def time_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--persons", type=int, default=20, help="Records on the synthetic page.")
+    parser.add_argument("--iterations", type=int, default=200, help="Projections timed per variant.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    page = {"persons": [person(i) for i in range(args.persons)], "pagination": {"totalPages": 5}, "isError": False}
+    body = json.dumps(page, separators=(",", ":")).encode("utf-8")
+    projection = parse_fields(FIELDS)
+    projected = projection.project_bytes(body)
+    assert skip_while_parsing(projection, body) == projected
+
+    results = {
+        "original_bytes": len(body),
+        "projected_bytes": len(projected),
+        "json_loads_us": round(time_us(lambda: json.loads(body), args.iterations), 1),
+        "parse_then_prune_us": round(time_us(lambda: projection.project_bytes(body), args.iterations), 1),
+        "skip_while_parsing_us": round(time_us(lambda: skip_while_parsing(projection, body), args.iterations), 1),
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"fields={FIELDS}")
+    print(f"size: {results['original_bytes']} -> {results['projected_bytes']} bytes")
+    for label in ("json_loads_us", "parse_then_prune_us", "skip_while_parsing_us"):
+        print(f"{label:<24}{results[label]:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Measures cold-start time: from process start to the first answered requests.
+
+Run from the repository root (credentials may be dummies, nothing leaves the machine):
+
+    python -m benchmarks.bench_startup [--runs 5]
+
+Each run starts a fresh `uvicorn main:app` process and reports
+
+* `import`: seconds spent importing `main` (measured in a separate interpreter);
+* `first_request`: process start until `GET /health` is first answered;
+* `first_mcp`: process start until an MCP client has initialised a session and listed the
+  tools (`initialize` followed by `tools/list` on /mcp).
+
+Runs are made with a cold schema cache (`SCHEMA_CACHE_PATH` missing) and a warm one (the
+file written by the previous run), showing what a restarted or freshly scaled replica
+with a prebuilt cache gains. Medians over `--runs` are reported.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+IMPORT_SCRIPT = "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"
+MCP_HEADERS = {"accept": "application/json, text/event-stream", "content-type": "application/json"}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: dict) -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], env=env, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def wait_for_health(client: httpx.Client, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if client.get("/health").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.005)
+    raise RuntimeError("server did not start")
+
+
+def list_tools(client: httpx.Client) -> int:
+    """Opens an MCP session, lists the tools and returns how many there are."""
+    initialize = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {},
+            "clientInfo": {"name": "bench_startup", "version": "1"},
+        },
+    }
+    response = client.post("/mcp", json=initialize, headers=MCP_HEADERS)
+    response.raise_for_status()
+    headers = {**MCP_HEADERS, "mcp-session-id": response.headers.get("mcp-session-id", "")}
+    client.post("/mcp", json={"jsonrpc": "2.0", "method": "notifications/initialized"}, headers=headers)
+    response = client.post("/mcp", json={"jsonrpc": "2.0", "id": 2, "method": "tools/list"}, headers=headers)
+    response.raise_for_status()
+    return len(response.json()["result"]["tools"])
+
+
+def measure_run(env: dict) -> dict:
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            wait_for_health(client)
+            first_request = time.perf_counter() - start
+            tools = list_tools(client)
+            first_mcp = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return {"first_request": first_request, "first_mcp": first_mcp, "tools": tools}
+
+
+def measure(env: dict, runs: int, warm: bool) -> dict:
+    samples = []
+    for _ in range(runs):
+        if not warm and os.path.exists(env["SCHEMA_CACHE_PATH"]):
+            os.remove(env["SCHEMA_CACHE_PATH"])
+        run = measure_run(env)
+        run["import"] = measure_import(env)
+        samples.append(run)
+    return {
+        "cache": "warm" if warm else "cold",
+        "tools": samples[-1]["tools"],
+        **{
+            name: round(statistics.median(sample[name] for sample in samples) * 1000, 1)
+            for name in ("import", "first_request", "first_mcp")
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Server starts per cache state.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = {
+            **os.environ,
+            "GALAXY_AP_NAME": os.environ.get("GALAXY_AP_NAME", "bench"),
+            "GALAXY_AP_PASSWORD": os.environ.get("GALAXY_AP_PASSWORD", "bench"),
+            "JOBS_DB_PATH": os.path.join(data_dir, "jobs.sqlite3"),
+            "SCHEMA_CACHE_PATH": os.path.join(data_dir, "schema_cache.json"),
+            "LOG_LEVEL": "WARNING",
+        }
+        # Interpreter and site-packages pages are warmed once so every run sees the same page cache.
+        measure_import(env)
+        rows = [measure(env, args.runs, warm=False), measure(env, args.runs, warm=True)]
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"median of {args.runs} server starts, milliseconds")
+    print(f"{'cache':>6}{'import':>10}{'first request':>15}{'first MCP':>11}{'tools':>7}")
+    for row in rows:
+        print(f"{row['cache']:>6}{row['import']:>10}{row['first_request']:>15}{row['first_mcp']:>11}{row['tools']:>7}")
+
+
+if __name__ == "__main__":
+    main()
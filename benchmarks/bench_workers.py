@@ -0,0 +1,159 @@
+"""Measures how throughput scales with the number of gunicorn workers.
+
+Run from the repository root (credentials may be dummies, nothing leaves the machine):
+
+    python -m benchmarks.bench_workers [--workers 1 2 4] [--duration 10] [--concurrency 64]
+
+For each worker count the server is started with `gunicorn main:app` (so
+`gunicorn.conf.py` applies) in front of `benchmarks.mock_upstream`, answering instantly.
+The response cache and request coalescing are disabled, so every request goes through
+validation, the upstream pool and serialisation. Load comes from `--clients` separate
+processes, each keeping `--concurrency / --clients` requests in flight.
+
+Scaling is bounded by the cores of the machine: the mock upstream and the load clients
+compete with the workers for CPU, so run it on a host with more cores than workers.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.mock_upstream import run as run_mock, upstream_env
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _load(url: str, concurrency: int, duration: float, seed: int) -> list:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+
+        async def user(offset: int):
+            number = offset
+            while time.perf_counter() < deadline:
+                number += concurrency
+                digits = (seed * 7919 + number) % 10_000_000
+                phone = f"555-{digits // 10_000:03d}-{digits % 10_000:04d}"
+                start = time.perf_counter()
+                response = await client.post(url, json={"Phone": phone})
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(user(offset) for offset in range(concurrency)))
+    return latencies
+
+
+def run_client(url: str, concurrency: int, duration: float, seed: int, results):
+    """Keeps `concurrency` requests in flight for `duration` seconds."""
+    results.put(asyncio.run(_load(url, concurrency, duration, seed)))
+
+
+def wait_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def measure(workers: int, upstream_port: int, args) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = {
+            **os.environ,
+            "GALAXY_AP_NAME": os.environ.get("GALAXY_AP_NAME", "bench"),
+            "GALAXY_AP_PASSWORD": os.environ.get("GALAXY_AP_PASSWORD", "bench"),
+            "CALLER_ID_API_URL": upstream_env(f"http://127.0.0.1:{upstream_port}")["CALLER_ID_API_URL"],
+            "CACHE_ENABLED": "false",
+            "SINGLEFLIGHT_ENABLED": "false",
+            "JOBS_DB_PATH": os.path.join(data_dir, "jobs.sqlite3"),
+            "WEB_CONCURRENCY": str(workers),
+            "GUNICORN_BIND": f"127.0.0.1:{port}",
+            "GUNICORN_MAX_REQUESTS": "0",
+            "LOG_LEVEL": "WARNING",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "main:app", "--log-level", "warning"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_ready(base_url)
+            results = multiprocessing.Queue()
+            per_client = max(1, args.concurrency // args.clients)
+            # A short warm-up run fills the connection pools of every worker.
+            clients = [
+                multiprocessing.Process(
+                    target=run_client, args=(f"{base_url}/caller-id", per_client, args.duration, seed, results)
+                )
+                for seed in range(args.clients)
+            ]
+            asyncio.run(_load(f"{base_url}/caller-id", per_client, 1.0, -1))
+            for client in clients:
+                client.start()
+            latencies = [latency for _ in clients for latency in results.get()]
+            for client in clients:
+                client.join()
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    latencies.sort()
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "rps": round(len(latencies) / args.duration, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cpus = os.process_cpu_count() or 1
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, max(1, cpus // 2), cpus}))
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per worker count.")
+    parser.add_argument("--concurrency", type=int, default=64, help="Requests in flight across all clients.")
+    parser.add_argument("--clients", type=int, default=max(1, cpus // 2), help="Load generator processes.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    upstream_port = free_port()
+    upstream = multiprocessing.Process(target=run_mock, args=(upstream_port,), daemon=True)
+    upstream.start()
+    try:
+        rows = [measure(workers, upstream_port, args) for workers in args.workers]
+    finally:
+        upstream.terminate()
+
+    if args.json:
+        print(json.dumps({"cpus": cpus, "results": rows}, indent=2))
+        return
+    base = rows[0]["rps"] or 1
+    print(f"{cpus} CPUs, {args.concurrency} requests in flight from {args.clients} client processes")
+    print(f"{'workers':>8}{'req/s':>10}{'speedup':>9}{'p50 ms':>9}{'p99 ms':>9}")
+    for row in rows:
+        print(f"{row['workers']:>8}{row['rps']:>10}{row['rps'] / base:>9.2f}{row['p50_ms']:>9}{row['p99_ms']:>9}")
+
+
+if __name__ == "__main__":
+    main()
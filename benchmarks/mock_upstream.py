@@ -0,0 +1,522 @@
+"""A local stand-in for the EnformionGO API, for load tests that spend no API credits.
+
+Run from the repository root:
+
+    python -m benchmarks.mock_upstream [--port 9000] [--latency 0.05] [--error-rate 0.01]
+
+Every `*_API_URL` endpoint of `config.Settings` is served under its own path, so pointing
+the proxy at the mock only takes the environment variables printed on startup (see
+`upstream_env`). Responses have the shape and size of real ones: search endpoints return
+pages of full records with `pagination` totals and honour `Page`/`ResultsPerPage`, the
+lookup endpoints return a single record. Bodies are gzip-compressed for clients that
+accept it, as the real API does.
+
+Options inject upstream behaviour:
+
+* `--latency` / `--latency-sigma`: log-normally distributed response time with the given
+  median (seconds) and spread, which gives a realistic long tail;
+* `--error-rate`: share of requests answered with a 500;
+* `--throttle-rate` / `--retry-after`: share of requests answered with a 429 and its
+  `Retry-After` header.
+"""
+
+import argparse
+import asyncio
+import functools
+import gzip
+import json
+import math
+import os
+import random
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+# config.py builds the settings on import, which requires credentials; the mock only
+# reads the default URLs, so placeholders will do.
+os.environ.setdefault("GALAXY_AP_NAME", "mock")
+os.environ.setdefault("GALAXY_AP_PASSWORD", "mock")
+
+from config import Settings  # noqa: E402
+
+DEFAULT_TOTAL_RESULTS = 100
+LOOKUP_VARIANTS = 16
+_REASONS = {
+    200: b"OK",
+    400: b"Bad Request",
+    404: b"Not Found",
+    429: b"Too Many Requests",
+    500: b"Internal Server Error",
+}
+
+
+def _address(n: int) -> Dict[str, Any]:
+    return {
+        "isDeliverable": True,
+        "isMergedAddress": False,
+        "isPublic": True,
+        "addressHash": f"{n * 7919:032x}",
+        "houseNumber": str(100 + n),
+        "streetPreDirection": "",
+        "streetName": "Main",
+        "streetPostDirection": "",
+        "streetType": "St",
+        "unit": "",
+        "unitType": None,
+        "city": "SPRINGFIELD",
+        "state": "IL",
+        "county": "SANGAMON",
+        "zip": "62701",
+        "zip4": "1234",
+        "latitude": "39.781721",
+        "longitude": "-89.650148",
+        "addressOrder": n + 1,
+        "propertyIndicator": "Residential",
+        "firstReportedDate": "1/1/2005",
+        "lastReportedDate": "6/1/2024",
+        "fullAddress": f"{100 + n} Main St; Springfield, IL 62701-1234",
+        "phoneNumbers": [f"555-123-{n:04d}", f"555-987-{n:04d}"],
+    }
+
+
+def _phone(n: int) -> Dict[str, Any]:
+    return {
+        "phoneNumber": f"(555) 123-{n:04d}",
+        "company": "AT&T Mobility",
+        "location": "SPRINGFIELD, IL",
+        "phoneType": "Wireless",
+        "isConnected": True,
+        "isPublic": True,
+        "latitude": "39.78",
+        "longitude": "-89.65",
+        "phoneOrder": n + 1,
+        "firstReportedDate": "1/1/2010",
+        "lastReportedDate": "6/1/2024",
+    }
+
+
+def _email(n: int) -> Dict[str, Any]:
+    return {"emailAddress": f"jane.doe{n}@example.com", "emailOrdinal": n + 1, "isPremium": False, "nonBusiness": 1}
+
+
+def _name(first: str = "JANE", last: str = "DOE") -> Dict[str, Any]:
+    return {
+        "prefix": "",
+        "firstName": first,
+        "middleName": "Q",
+        "lastName": last,
+        "suffix": "",
+        "rawNames": [f"{first} {last}"],
+    }
+
+
+def person(i: int, addresses: int = 8, phones: int = 6, emails: int = 4, relatives: int = 10) -> Dict[str, Any]:
+    """A person record as returned by the search and contact endpoints."""
+    return {
+        "tahoeId": f"G{i:011d}",
+        "name": _name(),
+        "isPublic": True,
+        "isOptedOut": False,
+        "age": 40 + i % 30,
+        "dob": "1/1/1980",
+        "dobs": [{"dob": "1/1/1980", "age": 40 + i % 30}],
+        "isDeceased": False,
+        "akas": [_name("JANIE"), _name("JANE", "SMITH")],
+        "addresses": [_address(n) for n in range(addresses)],
+        "phoneNumbers": [_phone(n) for n in range(phones)],
+        "emailAddresses": [_email(n) for n in range(emails)],
+        "relativesSummary": [
+            {
+                "tahoeId": f"G{i + n:011d}",
+                "firstName": "JOHN",
+                "lastName": "DOE",
+                "relativeLevel": "1st",
+                "relativeType": "Spouse",
+            }
+            for n in range(relatives)
+        ],
+        "associatesSummary": [{"tahoeId": f"G{i + n:011d}", "firstName": "JIM", "lastName": "BEAM"} for n in range(5)],
+        "locations": [{"city": "SPRINGFIELD", "state": "IL"}, {"city": "CHICAGO", "state": "IL"}],
+    }
+
+
+def contact(i: int) -> Dict[str, Any]:
+    """The smaller person record of the enrichment and caller/email ID endpoints."""
+    return person(i, addresses=3, phones=3, emails=2, relatives=0)
+
+
+def identity(i: int) -> Dict[str, Any]:
+    return {
+        "tahoeId": f"G{i:011d}",
+        "name": _name(),
+        "dob": "1/1/1980",
+        "address": _address(0),
+        "identityScore": 92,
+        "matchDetails": {field: "Match" for field in ("name", "dob", "address", "phone", "email", "ssn")},
+    }
+
+
+def address_detail(i: int) -> Dict[str, Any]:
+    return {**_address(i), "residents": [contact(i + n) for n in range(2)], "owner": _name("JOHN")}
+
+
+def autocomplete(i: int) -> Dict[str, Any]:
+    address = _address(i)
+    fields = ("houseNumber", "streetName", "streetType", "city", "state", "zip", "fullAddress")
+    return {key: address[key] for key in fields}
+
+
+def census(i: int) -> Dict[str, Any]:
+    return {
+        "censusId": f"C{i:09d}",
+        "decade": 1940,
+        "name": _name(),
+        "age": 30,
+        "birthPlace": "ILLINOIS",
+        "residence": {"city": "SPRINGFIELD", "county": "SANGAMON", "state": "IL"},
+        "household": [{"name": _name("JOHN"), "relationship": "Head", "age": 32} for _ in range(4)],
+    }
+
+
+def divorce(i: int) -> Dict[str, Any]:
+    return {
+        "divorceId": f"D{i:09d}",
+        "party1": {"name": _name(), "age": 35},
+        "party2": {"name": _name("JOHN"), "age": 37},
+        "marriageDate": "6/1/2001",
+        "divorceDate": "3/1/2012",
+        "city": "SPRINGFIELD",
+        "county": "SANGAMON",
+        "state": "IL",
+        "certificateNumber": f"{i:08d}",
+    }
+
+
+def linkedin(i: int) -> Dict[str, Any]:
+    return {
+        "profileUrl": f"https://www.linkedin.com/in/jane-doe-{i}",
+        "name": _name(),
+        "headline": "Operations Manager",
+        "location": "Springfield, Illinois",
+        "positions": [
+            {
+                "title": "Operations Manager",
+                "company": f"ACME {n}",
+                "startDate": f"{2010 + n}",
+                "description": "x" * 120,
+            }
+            for n in range(5)
+        ],
+        "education": [{"school": "University of Illinois", "degree": "BS"}],
+        "person": contact(i),
+    }
+
+
+def property_record(i: int) -> Dict[str, Any]:
+    return {
+        "propertyId": f"P{i:09d}",
+        "apn": f"14-{i:06d}-000",
+        "fips": "17167",
+        "address": _address(i),
+        "owners": [{"name": _name(first), "ownershipType": "Individual"} for first in ("JANE", "JOHN")],
+        "building": {"yearBuilt": 1978, "livingSquareFeet": 1850, "bedrooms": 3, "bathrooms": 2, "stories": 2},
+        "lot": {"acres": 0.25, "squareFeet": 10890, "zoning": "R1"},
+        "assessment": {"year": 2023, "landValue": 30000, "improvementValue": 120000, "totalValue": 150000},
+        "sales": [
+            {
+                "saleDate": f"1/1/{2000 + n}",
+                "salePrice": 100000 + n * 15000,
+                "documentType": "Warranty Deed",
+                "buyer": _name(),
+            }
+            for n in range(6)
+        ],
+        "mortgages": [
+            {"lender": f"BANK {n}", "amount": 90000 + n * 10000, "recordingDate": f"1/1/{2000 + n}", "term": 360}
+            for n in range(4)
+        ],
+    }
+
+
+def business(i: int) -> Dict[str, Any]:
+    return {
+        "poseidonId": f"B{i:011d}",
+        "businessId": f"B{i:011d}",
+        "businessName": f"ACME WIDGETS {i} LLC",
+        "businessType": "LLC",
+        "status": "Active",
+        "filingDate": "3/1/2004",
+        "stateOfIncorporation": "IL",
+        "addresses": [_address(n) for n in range(3)],
+        "phoneNumbers": [_phone(n) for n in range(2)],
+        "officers": [{"name": _name(), "title": "Manager", "tahoeId": f"G{i + n:011d}"} for n in range(4)],
+        "filings": [{"filingType": "Annual Report", "filingDate": f"3/1/{2010 + n}", "state": "IL"} for n in range(6)],
+        "ucc": [
+            {"creditor": f"BANK {n}", "filingDate": f"1/1/{2015 + n}", "collateral": "All assets"} for n in range(2)
+        ],
+    }
+
+
+def domain(i: int) -> Dict[str, Any]:
+    return {
+        "domain": f"acme{i}.example",
+        "createdDate": "5/1/2004",
+        "expiresDate": "5/1/2030",
+        "registrar": "Example Registrar, Inc.",
+        "registrant": {
+            "name": _name(),
+            "organization": f"ACME WIDGETS {i} LLC",
+            "address": _address(0),
+            "email": _email(0),
+        },
+        "nameServers": [f"ns{n}.example.net" for n in range(4)],
+    }
+
+
+def workplace(i: int) -> Dict[str, Any]:
+    return {
+        "person": contact(i),
+        "businessName": f"ACME WIDGETS {i} LLC",
+        "title": "Operations Manager",
+        "businessAddress": _address(1),
+        "businessPhone": _phone(1),
+        "firstSeenDate": "1/1/2015",
+        "lastSeenDate": "6/1/2024",
+    }
+
+
+@dataclass(frozen=True)
+class Route:
+    """How the mock answers one upstream endpoint.
+
+    Attributes:
+        key: The response field holding the record (lookups) or the page of records (searches).
+        build: Builds record `i`.
+        per_page: Records per page for searches; None for single-record lookups.
+    """
+
+    key: str
+    build: Callable[[int], Dict[str, Any]]
+    per_page: Optional[int] = 10
+
+
+# Keyed by the `Settings` field holding the upstream URL
+ROUTES: Dict[str, Route] = {
+    "PERSON_SEARCH_API_URL": Route("persons", person),
+    "REVERSE_PHONE_API_URL": Route("persons", person),
+    "CONTACT_ENRICHMENT_API_URL": Route("person", contact, None),
+    "CALLER_ID_API_URL": Route("person", contact, None),
+    "EMAIL_ID_API_URL": Route("person", contact, None),
+    "CONTACT_ID_API_URL": Route("person", functools.partial(person, addresses=15, phones=10, emails=6), None),
+    "ADDRESS_ID_API_URL": Route("address", address_detail, None),
+    "ADDRESS_AUTOCOMPLETE_API_URL": Route("addresses", autocomplete),
+    "ID_VERIFICATION_API_URL": Route("person", identity, None),
+    "CENSUS_SEARCH_API_URL": Route("censusRecords", census),
+    "DIVORCE_SEARCH_API_URL": Route("divorceRecords", divorce),
+    "LINKEDIN_ID_API_URL": Route("profile", linkedin, None),
+    "PROPERTY_SEARCH_V2_API_URL": Route("propertyV2Records", property_record),
+    "BUSINESS_SEARCH_V2_API_URL": Route("businessV2Records", business),
+    "DOMAIN_SEARCH_API_URL": Route("domainRecords", domain),
+    "WORKPLACE_SEARCH_API_URL": Route("workplaceRecords", workplace),
+    "BUSINESS_ID_API_URL": Route("businessRecords", business),
+}
+
+
+def upstream_paths() -> Dict[str, str]:
+    """Maps each `*_API_URL` setting to the path of its default URL."""
+    return {
+        name: urlsplit(field.default).path
+        for name, field in Settings.model_fields.items()
+        if name.endswith("_API_URL")
+    }
+
+
+def upstream_env(base_url: str) -> Dict[str, str]:
+    """Returns environment variables pointing every upstream URL setting at the mock."""
+    return {name: base_url.rstrip("/") + path for name, path in upstream_paths().items()}
+
+
+def _field(body: Dict[str, Any], name: str) -> Any:
+    lowered = name.lower()
+    return next((value for key, value in body.items() if key.lower() == lowered), None)
+
+
+def _as_positive_int(value: Any, default: int) -> int:
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return default
+
+
+@functools.lru_cache(maxsize=1024)
+def render(setting: str, page: int, per_page: int, total_results: int) -> Tuple[bytes, bytes]:
+    """Returns the plain and gzip-compressed body of a response."""
+    route = ROUTES[setting]
+    response: Dict[str, Any] = {}
+    if route.per_page is None:
+        response[route.key] = route.build(page)
+    else:
+        first = (page - 1) * per_page
+        response[route.key] = [route.build(i) for i in range(first, min(first + per_page, total_results))]
+        response["pagination"] = {
+            "currentPageNumber": page,
+            "resultsPerPage": per_page,
+            "totalPages": math.ceil(total_results / per_page),
+            "totalResults": total_results,
+        }
+    response.update(
+        {
+            "searchCriteria": [],
+            "totalRequestExecutionTimeMs": 42,
+            "requestId": f"{page:08x}-0000-4000-8000-{per_page:012x}",
+            "requestType": setting.removesuffix("_API_URL"),
+            "isError": False,
+            "error": {"inputErrors": [], "warnings": []},
+        }
+    )
+    body = json.dumps(response).encode()
+    return body, gzip.compress(body, compresslevel=5)
+
+
+class MockUpstream:
+    """Answers EnformionGO requests with canned responses and injected latency and errors."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_sigma: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        total_results: int = DEFAULT_TOTAL_RESULTS,
+        seed: Optional[int] = None,
+    ):
+        """Initializes the mock; rates are fractions of requests between 0 and 1."""
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.total_results = total_results
+        self.random = random.Random(seed)
+        self.routes = {path: setting for setting, path in upstream_paths().items()}
+        self.responses: Dict[int, int] = {}
+
+    def delay(self) -> float:
+        """Returns how long the next response takes."""
+        if self.latency <= 0:
+            return 0.0
+        return self.latency * math.exp(self.random.gauss(0.0, self.latency_sigma))
+
+    def respond(self, path: str, body: bytes, accept_gzip: bool = False) -> Tuple[int, Dict[str, str], bytes]:
+        """Returns the status, headers and body answering a request."""
+        setting = self.routes.get(path)
+        if setting is None:
+            return self._count(404, {}, b'{"isError":true,"error":{"message":"Not found"}}')
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            return self._count(429, {"Retry-After": f"{self.retry_after:g}"}, b'{"message":"Rate limit exceeded"}')
+        if roll < self.throttle_rate + self.error_rate:
+            return self._count(500, {}, b'{"isError":true,"error":{"message":"Internal server error"}}')
+        try:
+            request = json.loads(body) if body else {}
+        except ValueError:
+            return self._count(400, {}, b'{"isError":true,"error":{"message":"Invalid JSON"}}')
+        route = ROUTES[setting]
+        if route.per_page is None:
+            # A few record variants, chosen by the request, keep rendered bodies cacheable.
+            page, per_page = zlib.crc32(body) % LOOKUP_VARIANTS, 1
+        else:
+            page = _as_positive_int(_field(request, "Page"), 1)
+            per_page = _as_positive_int(_field(request, "ResultsPerPage"), route.per_page)
+        plain, compressed = render(setting, page, per_page, self.total_results)
+        if accept_gzip:
+            return self._count(200, {"Content-Encoding": "gzip"}, compressed)
+        return self._count(200, {}, plain)
+
+    def _count(self, status: int, headers: Dict[str, str], body: bytes):
+        self.responses[status] = self.responses.get(status, 0) + 1
+        return status, headers, body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serves the HTTP/1.1 keep-alive connection of one client."""
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.split(b"\r\n")
+                path = lines[0].split(b" ")[1].decode().split("?")[0]
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(b":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get(b"content-length", 0)))
+                delay = self.delay()
+                if delay:
+                    await asyncio.sleep(delay)
+                status, extra, payload = self.respond(path, body, b"gzip" in headers.get(b"accept-encoding", b""))
+                response = [b"HTTP/1.1 %d %s" % (status, _REASONS.get(status, b"")), b"Content-Type: application/json"]
+                response += [f"{name}: {value}".encode() for name, value in extra.items()]
+                response.append(b"Content-Length: %d" % len(payload))
+                writer.write(b"\r\n".join(response) + b"\r\n\r\n" + payload)
+                if headers.get(b"connection", b"").lower() == b"close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, IndexError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 9000):
+        """Serves requests until cancelled."""
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+
+def run(port: int, host: str = "127.0.0.1", **options):
+    """Runs a `MockUpstream` with `options` on `host:port` until the process ends."""
+    mock = MockUpstream(**options)
+    try:
+        import uvloop
+
+        uvloop.run(mock.serve(host, port))
+    except ImportError:
+        asyncio.run(mock.serve(host, port))
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Adds the options shaping the mock's behaviour to a benchmark's parser."""
+    parser.add_argument("--latency", type=float, default=0.0, help="Median upstream response time in seconds.")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread of the response time.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 500.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with a 429.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of injected 429s, in seconds.")
+    parser.add_argument("--total-results", type=int, default=DEFAULT_TOTAL_RESULTS, help="Results of every search.")
+
+
+def mock_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """Returns the `MockUpstream` options parsed by `add_arguments`."""
+    return {
+        "latency": args.latency,
+        "latency_sigma": args.latency_sigma,
+        "error_rate": args.error_rate,
+        "throttle_rate": args.throttle_rate,
+        "retry_after": args.retry_after,
+        "total_results": args.total_results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    for name, url in upstream_env(f"http://{args.host}:{args.port}").items():
+        print(f"export {name}={url}")
+    run(args.port, args.host, **mock_options(args))
+
+
+if __name__ == "__main__":
+    main()
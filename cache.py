@@ -0,0 +1,179 @@
+"""In-process TTL + LRU response cache for the EnformionGO API wrapper."""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from config import Settings, settings
+
+# Rough per-entry bookkeeping cost added to the body size when enforcing the byte cap.
+ENTRY_OVERHEAD_BYTES = 256
+
+
+def make_cache_key(api_url: str, search_type: str, request_body: Any) -> str:
+    """Builds a stable key from the upstream URL, search type and canonical request body.
+
+    The body is expected to be the output of `model_dump(by_alias=True, exclude_none=True)`;
+    keys are sorted so that field order never produces distinct entries.
+    """
+    canonical = json.dumps(request_body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    digest = hashlib.sha256(f"{api_url}\n{search_type}\n{canonical}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def cache_ttl_for(settings: Settings, endpoint: Optional[str]) -> float:
+    """Returns the TTL in seconds for an endpoint; 0 means the endpoint is not cached."""
+    if not settings.CACHE_ENABLED or endpoint is None:
+        return 0.0
+    return settings.CACHE_TTLS.get(endpoint, settings.CACHE_DEFAULT_TTL)
+
+
+class CacheEntry:
+    """A cached upstream response body."""
+
+    __slots__ = ("value", "endpoint", "created_at", "expires_at", "size", "hits")
+
+    def __init__(self, value: Any, endpoint: Optional[str], ttl: float, now: float):
+        """Initializes the entry.
+
+        Args:
+            value: The upstream response body; its `len()` is its size in bytes.
+            endpoint: The wrapper endpoint the entry belongs to.
+            ttl: Time to live in seconds.
+            now: The current monotonic time.
+        """
+        self.value = value
+        self.endpoint = endpoint
+        self.created_at = now
+        self.expires_at = now + ttl
+        self.size = len(value) + ENTRY_OVERHEAD_BYTES
+        self.hits = 0
+
+
+class ResponseCache:
+    """A bounded cache with per-entry TTLs and least-recently-used eviction.
+
+    Both an entry count and a total byte budget are enforced; whichever is hit first
+    evicts the least recently used entries. All operations are synchronous and never
+    yield to the event loop, so no locking is needed within a worker.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, clock=time.monotonic):
+        """Initializes the cache.
+
+        Args:
+            max_entries: Maximum number of entries held.
+            max_bytes: Maximum total size of the held entries.
+            clock: Monotonic time source, overridable in tests.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        """The combined size of the held entries."""
+        return self._bytes
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Returns the live entry for `key`, or None on a miss or expiry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= self._clock():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        entry.hits += 1
+        self.hits += 1
+        return entry
+
+    def contains(self, key: str) -> bool:
+        """Whether a live entry is held for `key`, without counting a lookup or refreshing it."""
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > self._clock()
+
+    def pop(self, key: str) -> Optional[CacheEntry]:
+        """Removes and returns the live entry for `key`, counting the lookup like `get`."""
+        entry = self.get(key)
+        if entry is not None:
+            self._remove(key)
+        return entry
+
+    def set(self, key: str, value: Any, ttl: float, endpoint: Optional[str] = None):
+        """Stores `value` under `key` for `ttl` seconds, evicting LRU entries as needed."""
+        if ttl <= 0:
+            return
+        entry = CacheEntry(value, endpoint, ttl, self._clock())
+        if entry.size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def purge(self, endpoint: Optional[str] = None) -> int:
+        """Removes all entries, or only those of `endpoint`. Returns the number removed."""
+        if endpoint is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            return removed
+        keys = [key for key, entry in self._entries.items() if entry.endpoint == endpoint]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and per-endpoint occupancy."""
+        now = self._clock()
+        endpoints: Dict[str, Dict[str, Any]] = {}
+        for entry in self._entries.values():
+            info = endpoints.setdefault(entry.endpoint or "unknown", {"entries": 0, "bytes": 0, "hits": 0})
+            info["entries"] += 1
+            info["bytes"] += entry.size
+            info["hits"] += entry.hits
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "expired_pending": sum(1 for entry in self._entries.values() if entry.expires_at <= now),
+            "endpoints": endpoints,
+        }
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+def build_response_cache(settings: Settings) -> ResponseCache:
+    """Creates a cache sized from the application settings."""
+    return ResponseCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_MAX_BYTES)
+
+
+response_cache = build_response_cache(settings)
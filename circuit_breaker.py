@@ -0,0 +1,175 @@
+"""Per-upstream circuit breakers for the EnformionGO API wrapper."""
+
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from config import Settings, settings
+from exceptions import UpstreamUnavailableError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops sending traffic to an upstream URL that keeps failing or answering slowly.
+
+    The breaker looks at a rolling window of recent calls. Once enough calls have been
+    seen and either the failure rate or the slow-call rate crosses its threshold, the
+    breaker opens and every call fails fast. After `open_seconds` it lets a limited
+    number of probe calls through (half-open): a successful probe closes the breaker,
+    a failed or slow one opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int,
+        min_calls: int,
+        failure_rate: float,
+        slow_call_seconds: float,
+        slow_call_rate: float,
+        open_seconds: float,
+        half_open_probes: int,
+        clock=time.monotonic,
+    ):
+        """Initializes a closed breaker.
+
+        Args:
+            name: The upstream URL guarded by the breaker.
+            window: Number of recent calls considered.
+            min_calls: Calls needed in the window before the breaker may trip.
+            failure_rate: Fraction of failed calls that trips the breaker.
+            slow_call_seconds: Calls taking at least this long count as slow.
+            slow_call_rate: Fraction of slow calls that trips the breaker.
+            open_seconds: How long the breaker stays open before probing.
+            half_open_probes: Concurrent probe calls allowed while half-open.
+            clock: Monotonic time source, overridable in tests.
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self._calls = deque(maxlen=window)  # (failed, slow) per finished call
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._probes = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """Admits a call or fails fast.
+
+        Raises:
+            UpstreamUnavailableError: If the breaker is open, or half-open with all probe slots taken.
+        """
+        if self.state == OPEN:
+            remaining = self.opened_at + self.open_seconds - self._clock()
+            if remaining > 0:
+                self.rejected += 1
+                raise UpstreamUnavailableError(
+                    f"Circuit breaker for {self.name} is open; failing fast.", retry_after=remaining
+                )
+            self.state = HALF_OPEN
+            self._probes = 0
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_probes:
+                self.rejected += 1
+                raise UpstreamUnavailableError(
+                    f"Circuit breaker for {self.name} is probing recovery; failing fast.", retry_after=1.0
+                )
+            self._probes += 1
+
+    def record(self, success: Optional[bool], elapsed: float):
+        """Records the outcome of an admitted call.
+
+        Args:
+            success: True or False for a finished call, None if it was abandoned
+                (e.g. cancelled or rate limited) and says nothing about upstream health.
+            elapsed: Duration of the call in seconds.
+        """
+        if self.state == HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+        if success is None:
+            return
+        failed = not success
+        slow = elapsed >= self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            if failed or slow:
+                self._open()
+            else:
+                self.state = CLOSED
+                self._calls.clear()
+            return
+        self._calls.append((failed, slow))
+        if self.state == CLOSED and len(self._calls) >= self.min_calls:
+            total = len(self._calls)
+            failures = sum(1 for failed, _ in self._calls if failed)
+            slow_calls = sum(1 for _, slow in self._calls if slow)
+            if failures / total >= self.failure_rate or slow_calls / total >= self.slow_call_rate:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = self._clock()
+        self._calls.clear()
+        self.times_opened += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the breaker state for health reporting."""
+        data: Dict[str, Any] = {
+            "state": self.state,
+            "recent_calls": len(self._calls),
+            "recent_failures": sum(1 for failed, _ in self._calls if failed),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+        if self.state == OPEN:
+            data["retry_in"] = round(max(0.0, self.opened_at + self.open_seconds - self._clock()), 3)
+        return data
+
+
+class CircuitBreakerRegistry:
+    """Lazily creates one breaker per upstream URL."""
+
+    def __init__(self, settings: Settings):
+        """Initializes the registry from the breaker settings."""
+        self._settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        """Returns the breaker guarding `url`."""
+        breaker = self._breakers.get(url)
+        if breaker is None:
+            s = self._settings
+            breaker = self._breakers[url] = CircuitBreaker(
+                url,
+                window=s.BREAKER_WINDOW,
+                min_calls=s.BREAKER_MIN_CALLS,
+                failure_rate=s.BREAKER_FAILURE_RATE,
+                slow_call_seconds=s.BREAKER_SLOW_CALL_SECONDS,
+                slow_call_rate=s.BREAKER_SLOW_CALL_RATE,
+                open_seconds=s.BREAKER_OPEN_SECONDS,
+                half_open_probes=s.BREAKER_HALF_OPEN_PROBES,
+            )
+        return breaker
+
+    def any_open(self) -> bool:
+        """Whether any upstream is currently failing fast."""
+        return any(breaker.state != CLOSED for breaker in self._breakers.values())
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the state of every breaker keyed by upstream URL."""
+        return {url: breaker.as_dict() for url, breaker in self._breakers.items()}
+
+    def reset(self):
+        """Forgets all breakers."""
+        self._breakers.clear()
+
+
+circuit_breakers = CircuitBreakerRegistry(settings)
@@ -1,16 +1,50 @@
 """Configuration for the EnformionGO API wrapper."""
 
 import os
+from typing import Dict, List, Optional
 
-from pydantic import SecretStr
+from pydantic import BaseModel, SecretStr
 from pydantic_settings import BaseSettings
 
 
+class TimeoutPolicy(BaseModel):
+    """Per-endpoint upstream timeouts in seconds; unset values fall back to the global defaults."""
+
+    connect: Optional[float] = None
+    read: Optional[float] = None
+    total: Optional[float] = None  # Budget for all attempts, including retries and backoff
+
+
+class Credential(BaseModel):
+    """One EnformionGO account of the credential pool."""
+
+    name: str
+    password: SecretStr
+    weight: float = 1.0  # Share of the traffic relative to the other accounts
+    max_rps: Optional[float] = None  # Server-wide request ceiling for this account
+
+
+class PrefetchRule(BaseModel):
+    """A follow-up lookup sent ahead of time for the leading records of a search response."""
+
+    target: str  # Endpoint path of the follow-up lookup
+    id_fields: List[str]  # Record fields holding the ID; the first one set is used
+    request_field: str  # Request field of the follow-up that takes the ID
+    search_type: Optional[str] = None  # Defaults to the endpoint's own or the one callers last used
+    top: int = 2  # Leading records of the response to prefetch
+
+
 class Settings(BaseSettings):
     """Application settings."""
 
     GALAXY_AP_NAME: str
     GALAXY_AP_PASSWORD: SecretStr  # Use SecretStr for sensitive values
+    GALAXY_AP_WEIGHT: float = 1.0
+    GALAXY_AP_MAX_RPS: Optional[float] = None
+
+    # Further accounts sharing the upstream traffic, e.g. [{"name": "...", "password": "...", "weight": 2}]
+    GALAXY_AP_POOL: List[Credential] = []
+    CREDENTIAL_SIDELINE_SECONDS: float = 60.0  # How long an account answering auth or quota errors is skipped
 
     PERSON_SEARCH_API_URL: str = "https://devapi.enformion.com/PersonSearch"
     REVERSE_PHONE_API_URL: str = "https://devapi.enformion.com/ReversePhoneSearch"
@@ -30,6 +64,159 @@ class Settings(BaseSettings):
     WORKPLACE_SEARCH_API_URL: str = "https://devapi.enformion.com/WorkplaceSearch"
     BUSINESS_ID_API_URL: str = "https://devapi.enformion.com/BusinessID"
 
+    # Upstream connection pool (one long-lived client per worker)
+    UPSTREAM_TIMEOUT: float = 15.0  # Default read/write timeout per attempt
+    UPSTREAM_CONNECT_TIMEOUT: float = 5.0
+    UPSTREAM_TOTAL_TIMEOUT: float = 30.0  # Default budget across all attempts
+    UPSTREAM_POOL_TIMEOUT: float = 5.0  # Max seconds to wait for a free pooled connection
+    UPSTREAM_MAX_CONNECTIONS: int = 100
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    UPSTREAM_KEEPALIVE_EXPIRY: float = 30.0
+    UPSTREAM_HTTP2: bool = False  # Requires the optional `h2` package (httpx[http2])
+    UPSTREAM_PREWARM_CONNECTIONS: int = 0  # Connections to open per upstream origin at startup
+    UPSTREAM_COMPRESSION: bool = True  # Ask the upstream for gzip/deflate bodies
+
+    # Forward upstream bodies byte-for-byte instead of parsing and re-serialising them
+    RESPONSE_PASSTHROUGH: bool = True
+
+    # Per-endpoint timeout overrides, keyed by endpoint path
+    UPSTREAM_TIMEOUTS: Dict[str, TimeoutPolicy] = {
+        "/address-autocomplete": TimeoutPolicy(connect=2.0, read=3.0, total=5.0),
+        "/caller-id": TimeoutPolicy(read=8.0, total=15.0),
+        "/email-id": TimeoutPolicy(read=8.0, total=15.0),
+        "/property-search-v2": TimeoutPolicy(read=45.0, total=60.0),
+        "/business-search": TimeoutPolicy(read=30.0, total=45.0),
+        "/business-search-v2": TimeoutPolicy(read=30.0, total=45.0),
+    }
+
+    # Retries of read-only lookups on connection errors and 5xx responses
+    RETRY_ENABLED: bool = True
+    RETRY_MAX_ATTEMPTS: int = 3
+    RETRY_BACKOFF_BASE: float = 0.2
+    RETRY_BACKOFF_MAX: float = 2.0
+
+    # Hedged requests: resend when an attempt is slower than the endpoint's recent percentile
+    HEDGE_ENABLED: bool = False
+    HEDGE_PERCENTILE: float = 0.95
+    HEDGE_MIN_DELAY: float = 0.05
+    HEDGE_MIN_SAMPLES: int = 20
+
+    # Circuit breakers, one per upstream URL
+    BREAKER_ENABLED: bool = True
+    BREAKER_WINDOW: int = 20  # Recent calls considered
+    BREAKER_MIN_CALLS: int = 10  # Calls needed before the breaker may trip
+    BREAKER_FAILURE_RATE: float = 0.5
+    BREAKER_SLOW_CALL_SECONDS: float = 10.0
+    BREAKER_SLOW_CALL_RATE: float = 0.8
+    BREAKER_OPEN_SECONDS: float = 30.0  # Time spent failing fast before probing recovery
+    BREAKER_HALF_OPEN_PROBES: int = 1
+
+    # Worker processes serving the app; set by gunicorn.conf.py so server-wide limits are shared out
+    WEB_CONCURRENCY: int = 1
+
+    # Client-side upstream rate limiting (server-wide, split across WEB_CONCURRENCY workers)
+    RATE_LIMIT_GLOBAL_RPS: float = 0.0  # 0 disables the steady-state global limit
+    RATE_LIMIT_GLOBAL_BURST: float = 20.0
+    RATE_LIMIT_SEARCH_TYPE_RPS: Dict[str, float] = {}  # e.g. {"Person": 5}
+    RATE_LIMIT_MAX_WAIT: float = 5.0  # Longest a call may queue before a 429 is returned
+    RATE_LIMIT_DEFAULT_RETRY_AFTER: float = 1.0  # Pause after an upstream 429 without Retry-After
+
+    # Clients may bound a request's upstream time with this header, in seconds
+    REQUEST_TIMEOUT_HEADER: str = "X-Request-Timeout"
+    CANCEL_ON_DISCONNECT: bool = True  # Cancel a POST's upstream calls when its client disconnects
+
+    # Inbound admission control (per worker process): requests beyond the in-flight cap
+    # queue fairly per client, MCP and REST traffic apart, and are shed with a 503 when
+    # the queue is full or their wait exceeds ADMISSION_MAX_WAIT
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 100
+    ADMISSION_MAX_QUEUE: int = 200
+    ADMISSION_MAX_QUEUE_PER_CLIENT: int = 20
+    ADMISSION_MAX_WAIT: float = 2.0
+    ADMISSION_CLASS_WEIGHTS: Dict[str, float] = {"rest": 1.0, "mcp": 1.0}
+    ADMISSION_CLIENT_HEADER: str = "X-API-Key"  # Identifies clients; their address is used without it
+
+    # Batch endpoints
+    BATCH_MAX_ITEMS: int = 1_000
+    BATCH_CONCURRENCY: int = 8  # Upstream calls in flight per batch request
+
+    # All-pages mode of the paged search endpoints
+    PAGINATION_CONCURRENCY: int = 4  # Pages fetched at once per request
+    PAGINATION_MAX_RECORDS: int = 10_000  # Upper bound for the max_records query parameter
+
+    # Timeout for MCP tool calls dispatched into this app (batches can take a while)
+    MCP_TOOL_TIMEOUT: float = 120.0
+    # OpenAPI schema and MCP tools kept across restarts, rebuilt when the code changes ("" disables)
+    SCHEMA_CACHE_PATH: str = "schema_cache.json"
+
+    # Share one upstream call between identical concurrent requests
+    SINGLEFLIGHT_ENABLED: bool = True
+
+    # In-process response cache
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 10_000
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_DEFAULT_TTL: float = 0.0  # TTL of endpoints not in CACHE_TTLS; 0 leaves them uncached
+    # Per-endpoint TTLs in seconds; 0 disables caching for that endpoint.
+    CACHE_TTLS: Dict[str, float] = {
+        "/census-search": 86_400.0,
+        "/divorce-search": 86_400.0,
+        "/linkedin-id": 3_600.0,
+        "/caller-id": 900.0,
+        "/email-id": 900.0,
+        "/contact-id": 900.0,
+        "/address-id": 900.0,
+        "/address-autocomplete": 60.0,
+    }
+
+    # Opt-in on-disk copy of the response cache, shared by the workers of a host and kept across restarts
+    RESPONSE_STORE_ENABLED: bool = False
+    RESPONSE_STORE_PATH: str = "responses.sqlite3"
+    RESPONSE_STORE_MAX_BYTES: int = 512 * 1024 * 1024
+    RESPONSE_STORE_STALE_SECONDS: float = 300.0  # How long past its TTL an entry is served while it is refreshed
+
+    # Opt-in local prefix index answering /address-autocomplete from complete shorter-prefix results
+    AUTOCOMPLETE_INDEX_ENABLED: bool = False
+    AUTOCOMPLETE_INDEX_MAX_ENTRIES: int = 5_000
+    AUTOCOMPLETE_INDEX_MAX_BYTES: int = 16 * 1024 * 1024
+    AUTOCOMPLETE_INDEX_TTL: float = 3_600.0
+
+    # Opt-in store answering repeated /contact-id and /business-id lookups by ID
+    ENTITY_STORE_ENABLED: bool = False
+    ENTITY_STORE_MAX_ENTRIES: int = 50_000
+    ENTITY_STORE_MAX_BYTES: int = 64 * 1024 * 1024
+    ENTITY_STORE_TTL: float = 900.0  # How long a lookup response may answer the same ID
+
+    # Opt-in speculative prefetch of the ID lookups that usually follow a search
+    PREFETCH_ENABLED: bool = False
+    PREFETCH_RULES: Dict[str, PrefetchRule] = {
+        "/person-search": PrefetchRule(target="/contact-id", id_fields=["tahoeId"], request_field="PersonId"),
+        "/business-search": PrefetchRule(
+            target="/business-id", id_fields=["businessId", "poseidonId"], request_field="businessId"
+        ),
+        "/business-search-v2": PrefetchRule(
+            target="/business-id", id_fields=["businessId", "poseidonId"], request_field="businessId"
+        ),
+    }
+    PREFETCH_TTL: float = 60.0  # How long a prefetched answer waits for its follow-up call
+    PREFETCH_MAX_ENTRIES: int = 2_000
+    PREFETCH_MAX_BYTES: int = 16 * 1024 * 1024
+    PREFETCH_CONCURRENCY: int = 4  # Prefetches in flight per worker; more are skipped, not queued
+    # Server-wide prefetches per minute per follow-up search type (split across WEB_CONCURRENCY workers)
+    PREFETCH_BUDGET_PER_MINUTE: Dict[str, float] = {}
+    PREFETCH_DEFAULT_BUDGET_PER_MINUTE: float = 60.0
+
+    # Prometheus metrics served at GET /metrics
+    METRICS_ENABLED: bool = True
+
+    # Background bulk jobs (POST /jobs), checkpointed to SQLite so restarts resume
+    JOBS_DB_PATH: str = "jobs.sqlite3"
+    JOBS_CONCURRENCY: int = 4  # Upstream calls in flight across all jobs
+    JOBS_MAX_ROWS: int = 1_000_000  # Rows accepted per submitted file
+    JOBS_MAX_UPLOAD_BYTES: int = 256 * 1024 * 1024  # Size of a submitted file; larger uploads get a 413
+    JOBS_ENDPOINTS: List[str] = ["/contact-enrichment", "/id-verification"]
+    JOBS_POLL_INTERVAL: float = 1.0  # How often idle workers look for jobs submitted through other workers
+
     class Config:
         """Pydantic settings configuration."""
 
@@ -0,0 +1,251 @@
+"""Load-balanced pool of EnformionGO accounts for upstream calls."""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
+
+from config import Credential, Settings, settings
+from exceptions import RateLimitError
+from http_client import UpstreamResponse
+from rate_limit import TokenBucket, parse_retry_after
+
+# Upstream answers meaning the account itself was refused rather than the request.
+AUTH_STATUS_CODES = frozenset({401, 403})
+QUOTA_STATUS_CODES = frozenset({402, 429})
+SIDELINE_STATUS_CODES = AUTH_STATUS_CODES | QUOTA_STATUS_CODES
+
+
+def configured_credentials(settings: Settings) -> List[Credential]:
+    """Returns the primary account (if set) followed by the accounts of `GALAXY_AP_POOL`."""
+    credentials = []
+    if settings.GALAXY_AP_NAME and settings.GALAXY_AP_PASSWORD:
+        credentials.append(
+            Credential(
+                name=settings.GALAXY_AP_NAME,
+                password=settings.GALAXY_AP_PASSWORD,
+                weight=settings.GALAXY_AP_WEIGHT,
+                max_rps=settings.GALAXY_AP_MAX_RPS,
+            )
+        )
+    credentials.extend(
+        credential for credential in settings.GALAXY_AP_POOL if credential.name and credential.password
+    )
+    return credentials
+
+
+class Account:
+    """Usage, health and rate ceiling of one pooled account."""
+
+    def __init__(self, credential: Credential, rate: Optional[float], now: float):
+        """Initializes an idle, healthy account.
+
+        Args:
+            credential: The account's name, password, weight and ceiling.
+            rate: This worker's share of the account's request ceiling, or None.
+            now: The current monotonic time.
+        """
+        self.name = credential.name
+        self.weight = max(credential.weight, 1e-6)
+        self.headers = {
+            "galaxy-ap-name": credential.name,
+            "galaxy-ap-password": credential.password.get_secret_value(),
+        }
+        self.bucket = TokenBucket(rate, max(1.0, rate), now) if rate else None
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.auth_errors = 0
+        self.quota_errors = 0
+        self.sidelined = 0
+        self.sidelined_until = 0.0
+        self.sideline_reason: Optional[str] = None
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        # Weighted count of calls handed to the account, for spreading traffic by weight.
+        self.virtual_time = 0.0
+
+    def delay(self, now: float) -> float:
+        """Seconds a call would wait for the account's rate ceiling."""
+        if self.bucket is None:
+            return 0.0
+        delay = self.bucket.reserve(now)
+        self.bucket.refund()
+        return delay
+
+    def as_dict(self, now: float) -> Dict[str, Any]:
+        """Returns the account's usage and health, without its password."""
+        finished = self.requests - self.in_flight
+        return {
+            "weight": self.weight,
+            "max_rps": self.bucket.configured_rate if self.bucket else None,
+            "healthy": self.sidelined_until <= now,
+            "sidelined_for": round(max(0.0, self.sidelined_until - now), 3),
+            "sideline_reason": self.sideline_reason if self.sidelined_until > now else None,
+            "sidelined": self.sidelined,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "auth_errors": self.auth_errors,
+            "quota_errors": self.quota_errors,
+            "latency": {
+                "avg_ms": round(self.latency_total / finished * 1000, 3) if finished else 0.0,
+                "max_ms": round(self.latency_max * 1000, 3),
+            },
+        }
+
+
+class CredentialPool:
+    """Sends each upstream call with the least-loaded healthy account.
+
+    Load is the number of calls in flight divided by the account's weight; idle accounts
+    are picked in proportion to their weights. Accounts at their request ceiling are
+    passed over while another has capacity. An account answering with an auth or quota
+    error is sidelined for a while and the call is repeated with another account; if
+    every account is sidelined, the one due back first is used.
+    """
+
+    def __init__(
+        self,
+        credentials: List[Credential],
+        sideline_seconds: float,
+        max_wait: float,
+        workers: int = 1,
+        clock=time.monotonic,
+    ):
+        """Initializes the pool.
+
+        Args:
+            credentials: The accounts, in order of preference for ties.
+            sideline_seconds: How long an account answering auth or quota errors is skipped,
+                unless a 429 says otherwise through `Retry-After`.
+            max_wait: Longest a call may wait for an account's rate ceiling.
+            workers: Worker processes sharing the server-wide account ceilings.
+            clock: Monotonic time source, overridable in tests.
+        """
+        self._clock = clock
+        now = clock()
+        workers = max(1, workers)
+        self.accounts = [
+            Account(credential, credential.max_rps / workers if credential.max_rps else None, now)
+            for credential in credentials
+        ]
+        self.sideline_seconds = sideline_seconds
+        self.max_wait = max_wait
+        self.failovers = 0
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def _candidates(self, now: float, exclude: List[Account]) -> List[Account]:
+        """Returns the healthy accounts not in `exclude`, or the one due back first."""
+        healthy = [a for a in self.accounts if a.sidelined_until <= now and a not in exclude]
+        if not healthy:
+            remaining = [a for a in self.accounts if a not in exclude] or self.accounts
+            return [min(remaining, key=lambda a: a.sidelined_until)]
+        # An account returning from the sideline starts level with the others instead of
+        # taking every call until it has caught up.
+        floor = min(a.virtual_time for a in healthy)
+        for account in healthy:
+            if account.sideline_reason is not None:
+                account.sideline_reason = None
+                account.virtual_time = max(account.virtual_time, floor)
+        return healthy
+
+    async def acquire(self, exclude: List[Account] = ()) -> Account:
+        """Picks an account for one call, waiting for its rate ceiling if all are at theirs.
+
+        Raises:
+            RateLimitError: If every account would make the call wait longer than `max_wait`.
+        """
+        now = self._clock()
+        candidates = self._candidates(now, exclude)
+        account = candidates[0]
+        if len(candidates) > 1:
+            account = min(candidates, key=lambda a: (a.delay(now), a.in_flight / a.weight, a.virtual_time))
+        delay = account.delay(now)
+        if delay > self.max_wait:
+            raise RateLimitError("Every upstream account is at its request ceiling.", retry_after=delay)
+        if account.bucket is not None:
+            account.bucket.reserve(now)
+        account.in_flight += 1
+        account.requests += 1
+        account.virtual_time += 1 / account.weight
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # The call was abandoned while waiting, e.g. its deadline passed: give the slot back.
+                account.in_flight -= 1
+                account.requests -= 1
+                account.virtual_time -= 1 / account.weight
+                if account.bucket is not None:
+                    account.bucket.refund()
+                raise
+        return account
+
+    def release(self, account: Account, status_code: Optional[int], seconds: float, retry_after: Optional[float]):
+        """Records the outcome of a call made with `account`; None means it failed without an answer."""
+        account.in_flight -= 1
+        account.latency_total += seconds
+        account.latency_max = max(account.latency_max, seconds)
+        if status_code is None or status_code >= 400:
+            account.errors += 1
+        if status_code in SIDELINE_STATUS_CODES:
+            if status_code in AUTH_STATUS_CODES:
+                account.auth_errors += 1
+                reason, duration = "auth", self.sideline_seconds
+            else:
+                account.quota_errors += 1
+                reason = "quota"
+                duration = self.sideline_seconds if retry_after is None else retry_after
+            account.sidelined += 1
+            account.sideline_reason = reason
+            account.sidelined_until = max(account.sidelined_until, self._clock() + duration)
+
+    async def call(self, post: Callable[[Mapping[str, str]], Awaitable[UpstreamResponse]]) -> UpstreamResponse:
+        """Sends `post` with an account's credential headers, failing over on auth or quota errors."""
+        tried: List[Account] = []
+        while True:
+            account = None
+            try:
+                # Cancelled while waiting for a ceiling, acquire gives its slot back itself.
+                account = await self.acquire(tried)
+                start = time.perf_counter()
+                response = await post(account.headers)
+            except BaseException:
+                if account is not None:
+                    self.release(account, None, time.perf_counter() - start, None)
+                raise
+            retry_after = None
+            if response.status_code in QUOTA_STATUS_CODES:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.release(account, response.status_code, time.perf_counter() - start, retry_after)
+            tried.append(account)
+            if response.status_code not in SIDELINE_STATUS_CODES or not self._has_untried(tried):
+                return response
+            self.failovers += 1
+
+    def _has_untried(self, tried: List[Account]) -> bool:
+        now = self._clock()
+        return any(a.sidelined_until <= now and a not in tried for a in self.accounts)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns per-account usage, latency and health, keyed by account name."""
+        now = self._clock()
+        return {
+            "failovers": self.failovers,
+            "accounts": {account.name: account.as_dict(now) for account in self.accounts},
+        }
+
+
+def build_credential_pool(settings: Settings) -> CredentialPool:
+    """Creates the pool from the application settings."""
+    return CredentialPool(
+        configured_credentials(settings),
+        sideline_seconds=settings.CREDENTIAL_SIDELINE_SECONDS,
+        max_wait=settings.RATE_LIMIT_MAX_WAIT,
+        workers=settings.WEB_CONCURRENCY,
+    )
+
+
+credential_pool = build_credential_pool(settings)
@@ -0,0 +1,152 @@
+"""Per-request deadlines and cancellation of abandoned requests."""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from exceptions import DeadlineExceededError
+
+# Monotonic time by which the current request wants its answer, if the client set one.
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class CancellationStats:
+    """Counts requests that ran out of time or lost their client, and the upstream calls cut short."""
+
+    def __init__(self):
+        """Initializes the counters."""
+        self.deadline_exceeded = 0
+        self.disconnects = 0
+        self.upstream_cancelled = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the counters."""
+        return {
+            "deadline_exceeded": self.deadline_exceeded,
+            "client_disconnects": self.disconnects,
+            "upstream_calls_cancelled": self.upstream_cancelled,
+        }
+
+
+def parse_timeout(value: Optional[str]) -> Optional[float]:
+    """Parses a timeout header given in (fractional) seconds; invalid values are ignored."""
+    if not value:
+        return None
+    try:
+        timeout = float(value)
+    except ValueError:
+        return None
+    return timeout if timeout > 0 and math.isfinite(timeout) else None
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left until the current request's deadline, or None without one."""
+    deadline = request_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+@asynccontextmanager
+async def within_deadline():
+    """Bounds the enclosed work by the current request's deadline, cancelling it when it passes.
+
+    Raises:
+        DeadlineExceededError: If the deadline passed before or during the work.
+    """
+    remaining = time_remaining()
+    if remaining is None:
+        yield
+        return
+    if remaining <= 0:
+        cancellation_stats.deadline_exceeded += 1
+        raise DeadlineExceededError("The request deadline passed before the upstream call started.")
+    timeout = asyncio.timeout(remaining)
+    try:
+        async with timeout:
+            yield
+    except TimeoutError:
+        if not timeout.expired():
+            raise
+        cancellation_stats.deadline_exceeded += 1
+        raise DeadlineExceededError("The request deadline passed before the upstream answered.") from None
+
+
+class DeadlineMiddleware:
+    """ASGI middleware applying the client's timeout header and cancelling abandoned requests.
+
+    A positive number of seconds in `header` sets the request's deadline (see
+    `within_deadline`). Once a POST request's body has been read, the middleware listens
+    for the client disconnecting and cancels the handler, and with it any upstream call
+    it is waiting for, unless the response has already been sent.
+    """
+
+    def __init__(self, app: ASGIApp, header: str = "X-Request-Timeout", cancel_on_disconnect: bool = True):
+        """Wraps `app`."""
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+        self.cancel_on_disconnect = cancel_on_disconnect
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timeout = None
+        for name, value in scope["headers"]:
+            if name == self.header:
+                timeout = parse_timeout(value.decode("latin-1"))
+                break
+        token = request_deadline.set(None if timeout is None else time.monotonic() + timeout)
+        try:
+            if self.cancel_on_disconnect and scope["method"] == "POST":
+                await self._run_cancellable(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            request_deadline.reset(token)
+
+    async def _run_cancellable(self, scope: Scope, receive: Receive, send: Send):
+        body_read = asyncio.Event()
+        response_sent = False
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] != "http.request" or not message.get("more_body", False):
+                body_read.set()
+            return message
+
+        async def send_wrapper(message: Message):
+            nonlocal response_sent
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_sent = True
+            await send(message)
+
+        async def wait_for_disconnect():
+            # Only listen once the app has the whole body, so no request message is lost.
+            await body_read.wait()
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        handler = asyncio.create_task(self.app(scope, receive_wrapper, send_wrapper))
+        watcher = asyncio.create_task(wait_for_disconnect())
+        try:
+            await asyncio.wait((handler, watcher), return_when=asyncio.FIRST_COMPLETED)
+            if not handler.done() and not response_sent:
+                cancellation_stats.disconnects += 1
+                handler.cancel()
+            try:
+                await handler
+            except asyncio.CancelledError:
+                # Only swallow the cancellation issued above, not one aimed at this task.
+                if asyncio.current_task().cancelling():
+                    raise
+        finally:
+            for task in (watcher, handler):
+                if not task.done():
+                    task.cancel()
+
+
+cancellation_stats = CancellationStats()
@@ -0,0 +1,508 @@
+"""Declarative registry of the proxied EnformionGO endpoints and their dispatch plans.
+
+Each endpoint is one `EndpointSpec` row in `ENDPOINTS`. At startup every row is compiled
+into an immutable `DispatchPlan` holding everything a request needs that does not depend
+on the request itself (upstream URL, static headers, serializer, cache TTL and timeouts),
+and a route handler is generated from it.
+"""
+
+import inspect
+from dataclasses import dataclass
+from enum import Enum
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, NamedTuple, Optional, Type
+
+import httpx
+from fastapi import Depends, Header, HTTPException
+from pydantic import BaseModel
+
+from cache import cache_ttl_for
+from config import Settings
+from credentials import configured_credentials
+from entities import EntityLookup
+from models import (
+    AddressAutoCompleteRequest,
+    AddressIdRequest,
+    BatchRequest,
+    BusinessIDRequest,
+    BusinessSearchRequest,
+    CallerIdRequest,
+    CensusSearchRequest,
+    ContactEnrichmentRequest,
+    ContactIdRequest,
+    DivorceSearchRequest,
+    DomainSearchRequest,
+    EmailIdRequest,
+    IdVerificationRequest,
+    LinkedInIdRequest,
+    PersonSearchRequest,
+    PropertySearchV2Request,
+    ReversePhoneSearchRequest,
+    WorkplaceSearchRequest,
+)
+from pagination import AllPagesQuery
+from projection import FIELDS_QUERY, Projection, parse_fields
+from resilience import resolve_timeouts
+
+
+# --- Enums ---
+class PersonSearchType(str, Enum):
+    person = "Person"
+    teaser = "Teaser"
+
+
+# --- Validation Dependencies ---
+def validate_contact_enrichment_request(request: ContactEnrichmentRequest):
+    """Dependency to validate that at least two search criteria are provided."""
+    criteria_count = 0
+    # A name counts as one criterion
+    if request.first_name or request.middle_name or request.last_name:
+        criteria_count += 1
+    if request.phone:
+        criteria_count += 1
+    if request.address:
+        criteria_count += 1
+    if request.email:
+        criteria_count += 1
+
+    if criteria_count < 2:
+        raise HTTPException(
+            status_code=400,
+            detail="Contact Enrichment requires at least two search criteria from: Name, Phone, Address, or Email."
+        )
+    return request
+
+def validate_id_verification_request(request: IdVerificationRequest):
+    """Dependency to validate that at least two ID verification criteria are provided."""
+    criteria_count = 0
+    if request.first_name or request.middle_name or request.last_name:
+        criteria_count += 1
+    if request.phones:
+        criteria_count += 1
+    if request.address_line_1 or request.address_line_2:
+        criteria_count += 1
+    if request.emails:
+        criteria_count += 1
+    if request.ssn:
+        criteria_count +=1
+
+    if criteria_count < 2:
+        raise HTTPException(
+            status_code=400,
+            detail="ID Verification requires at least two criteria from: SSN, Name, Phone, Address, or Email."
+        )
+    return request
+
+
+# --- Registry ---
+class SearchTypeHeader(NamedTuple):
+    """A `galaxy-search-type` header supplied by the caller."""
+
+    description: str
+    annotation: Any = str
+    default: Any = ...
+
+
+@dataclass(frozen=True)
+class EndpointSpec:
+    """One proxied endpoint.
+
+    Attributes:
+        path: The route path.
+        name: The handler name, which also names the OpenAPI operation and MCP tool.
+        tag: The OpenAPI tag.
+        model: The request model (the item model for batches).
+        url_setting: The `Settings` field holding the upstream URL.
+        doc: The endpoint description.
+        search_type: A fixed `galaxy-search-type`, or None if `search_type_header` is used.
+        search_type_header: The caller-supplied search type header, if any.
+        validator: An optional dependency that validates the request model.
+        paged: Whether the endpoint supports all-pages mode.
+        batch: Whether the endpoint takes a `BatchRequest` of `model` items.
+        endpoint: The endpoint whose cache, timeouts and metrics apply; defaults to `path`.
+        prefix_index_field: A request field answered through the local autocomplete prefix
+            index, if any.
+        entity_lookup: How this endpoint is answered from the entity store, if it can be.
+    """
+
+    path: str
+    name: str
+    tag: str
+    model: Type[BaseModel]
+    url_setting: str
+    doc: str
+    search_type: Optional[str] = None
+    search_type_header: Optional[SearchTypeHeader] = None
+    validator: Optional[Callable] = None
+    paged: bool = False
+    batch: bool = False
+    endpoint: Optional[str] = None
+    prefix_index_field: Optional[str] = None
+    entity_lookup: Optional[EntityLookup] = None
+
+
+@dataclass(frozen=True, slots=True)
+class DispatchPlan:
+    """Everything about an endpoint that is resolved once instead of on every request."""
+
+    spec: EndpointSpec
+    settings: Settings
+    endpoint: str
+    api_url: str
+    base_headers: Mapping[str, str]
+    headers_by_search_type: Mapping[str, Mapping[str, str]]
+    dump: Callable[[BaseModel], Dict[str, Any]]
+    cache_ttl: float
+    timeout: httpx.Timeout
+    total_timeout: float
+    credentials_error: Optional[str]
+
+    def headers_for(self, search_type: str) -> Mapping[str, str]:
+        """Returns the upstream request headers for a search type."""
+        headers = self.headers_by_search_type.get(search_type)
+        if headers is None:
+            headers = {**self.base_headers, "galaxy-search-type": search_type}
+        return headers
+
+
+def compile_plan(spec: EndpointSpec, settings: Settings) -> DispatchPlan:
+    """Resolves an endpoint spec against the settings."""
+    endpoint = spec.endpoint or spec.path
+    credentials_error = None
+    if not configured_credentials(settings):
+        credentials_error = "API credentials (GALAXY_AP_NAME, GALAXY_AP_PASSWORD) are not configured."
+    # The account credentials are added per call by the credential pool.
+    base_headers = {"Content-Type": "application/json"}
+
+    # Prebuild the headers for every search type known in advance.
+    search_types: List[str] = []
+    if spec.search_type is not None:
+        search_types.append(spec.search_type)
+    elif spec.search_type_header is not None and isinstance(spec.search_type_header.annotation, type) and issubclass(
+        spec.search_type_header.annotation, Enum
+    ):
+        search_types.extend(member.value for member in spec.search_type_header.annotation)
+    headers_by_search_type = {
+        search_type: MappingProxyType({**base_headers, "galaxy-search-type": search_type})
+        for search_type in search_types
+    }
+
+    serializer = spec.model.__pydantic_serializer__
+
+    def dump(request: BaseModel) -> Dict[str, Any]:
+        return serializer.to_python(request, by_alias=True, exclude_none=True)
+
+    timeout, total = resolve_timeouts(settings, endpoint)
+    return DispatchPlan(
+        spec=spec,
+        settings=settings,
+        endpoint=endpoint,
+        api_url=getattr(settings, spec.url_setting),
+        base_headers=MappingProxyType(base_headers),
+        headers_by_search_type=MappingProxyType(headers_by_search_type),
+        dump=dump,
+        cache_ttl=cache_ttl_for(settings, endpoint),
+        timeout=timeout,
+        total_timeout=total,
+        credentials_error=credentials_error,
+    )
+
+
+def compile_plans(settings: Settings, specs: List[EndpointSpec] = None) -> List[DispatchPlan]:
+    """Compiles a dispatch plan for every registered endpoint, in registration order."""
+    return [compile_plan(spec, settings) for spec in (ENDPOINTS if specs is None else specs)]
+
+
+Dispatch = Callable[[DispatchPlan, str, Any, Optional[AllPagesQuery], Optional[Projection]], Awaitable[Any]]
+
+
+def build_handler(plan: DispatchPlan, dispatch: Dispatch) -> Callable:
+    """Generates the route handler for a plan.
+
+    The handler's signature is built from the spec so FastAPI sees the same body, header
+    and query parameters a hand-written handler would declare. Every handler accepts the
+    `fields` projection parameter.
+    """
+    spec = plan.spec
+    body_type = BatchRequest if spec.batch else spec.model
+    body_default = Depends(spec.validator) if spec.validator else inspect.Parameter.empty
+    parameters = [
+        inspect.Parameter(
+            "batch" if spec.batch else "search_request",
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            annotation=body_type,
+            default=body_default,
+        )
+    ]
+    if spec.paged:
+        parameters.append(
+            inspect.Parameter(
+                "paging", inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=AllPagesQuery, default=Depends()
+            )
+        )
+    header = spec.search_type_header
+    if header is not None:
+        parameters.append(
+            inspect.Parameter(
+                "galaxy_search_type",
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                annotation=header.annotation,
+                default=Header(header.default, description=header.description),
+            )
+        )
+
+    parameters.append(
+        inspect.Parameter(
+            "fields", inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=Optional[str], default=FIELDS_QUERY
+        )
+    )
+
+    fixed_search_type = spec.search_type
+
+    async def handler(search_request=None, batch=None, paging=None, galaxy_search_type=None, fields=None):
+        if galaxy_search_type is None:
+            search_type = fixed_search_type
+        else:
+            search_type = getattr(galaxy_search_type, "value", galaxy_search_type)
+        payload = batch if search_request is None else search_request
+        return await dispatch(plan, search_type, payload, paging, parse_fields(fields))
+
+    handler.__name__ = handler.__qualname__ = spec.name
+    handler.__doc__ = spec.doc
+    handler.__signature__ = inspect.Signature(parameters)
+    return handler
+
+
+_SINGLE = "Dev APIs (Single Result)"
+_BATCH = "Dev APIs (Batch)"
+_BATCH_DOC = """Runs {name} lookups for many {subjects}; each item is {article} {name} request body.
+
+Results stream back as NDJSON in completion order, one line per item with its input
+`index`, a `status`, and either the upstream `result` or an `error`."""
+
+
+ENDPOINTS: List[EndpointSpec] = [
+    # --- Dev APIs (Single Result) Endpoints ---
+    EndpointSpec(
+        "/contact-enrichment",
+        "contact_enrichment",
+        _SINGLE,
+        ContactEnrichmentRequest,
+        "CONTACT_ENRICHMENT_API_URL",
+        "Performs a contact enrichment search. Requires at least two criteria.",
+        search_type="DevAPIContactEnrich",
+        validator=validate_contact_enrichment_request,
+    ),
+    EndpointSpec(
+        "/caller-id",
+        "caller_id",
+        _SINGLE,
+        CallerIdRequest,
+        "CALLER_ID_API_URL",
+        "Retrieves information associated with a provided phone number.",
+        search_type="DevAPICallerID",
+    ),
+    EndpointSpec(
+        "/email-id",
+        "email_id",
+        _SINGLE,
+        EmailIdRequest,
+        "EMAIL_ID_API_URL",
+        "Retrieves information associated with a provided email address.",
+        search_type="DevAPIEmailID",
+    ),
+    EndpointSpec(
+        "/contact-id",
+        "contact_id",
+        _SINGLE,
+        ContactIdRequest,
+        "CONTACT_ID_API_URL",
+        "Searches for contact information using a unique person ID.",
+        search_type="DevAPIContactID",
+        entity_lookup=EntityLookup("person", "PersonId"),
+    ),
+    EndpointSpec(
+        "/address-id",
+        "address_id",
+        _SINGLE,
+        AddressIdRequest,
+        "ADDRESS_ID_API_URL",
+        "Finds contact info for current owners or residents of a property.",
+        search_type="DevAPIAddressID",
+    ),
+    EndpointSpec(
+        "/address-autocomplete",
+        "address_autocomplete",
+        _SINGLE,
+        AddressAutoCompleteRequest,
+        "ADDRESS_AUTOCOMPLETE_API_URL",
+        "Provides address autocomplete functionality.",
+        search_type="DevAPIAddressAutoComplete",
+        prefix_index_field="Input",
+    ),
+    # --- Dev APIs (Batch) Endpoints ---
+    EndpointSpec(
+        "/caller-id/batch",
+        "caller_id_batch",
+        _BATCH,
+        CallerIdRequest,
+        "CALLER_ID_API_URL",
+        _BATCH_DOC.format(name="Caller ID", subjects="phone numbers", article="a"),
+        search_type="DevAPICallerID",
+        batch=True,
+        endpoint="/caller-id",
+    ),
+    EndpointSpec(
+        "/email-id/batch",
+        "email_id_batch",
+        _BATCH,
+        EmailIdRequest,
+        "EMAIL_ID_API_URL",
+        _BATCH_DOC.format(name="Email ID", subjects="email addresses", article="an"),
+        search_type="DevAPIEmailID",
+        batch=True,
+        endpoint="/email-id",
+    ),
+    EndpointSpec(
+        "/contact-id/batch",
+        "contact_id_batch",
+        _BATCH,
+        ContactIdRequest,
+        "CONTACT_ID_API_URL",
+        _BATCH_DOC.format(name="Contact ID", subjects="person IDs", article="a"),
+        search_type="DevAPIContactID",
+        batch=True,
+        endpoint="/contact-id",
+    ),
+    EndpointSpec(
+        "/address-id/batch",
+        "address_id_batch",
+        _BATCH,
+        AddressIdRequest,
+        "ADDRESS_ID_API_URL",
+        _BATCH_DOC.format(name="Address ID", subjects="addresses", article="an"),
+        search_type="DevAPIAddressID",
+        batch=True,
+        endpoint="/address-id",
+    ),
+    # --- People Data Endpoints ---
+    EndpointSpec(
+        "/person-search",
+        "person_search",
+        "People Data",
+        PersonSearchRequest,
+        "PERSON_SEARCH_API_URL",
+        "Performs a person search by proxying the request to the EnformionGO API.",
+        search_type_header=SearchTypeHeader("Search type.", PersonSearchType, PersonSearchType.person),
+    ),
+    EndpointSpec(
+        "/reverse-phone-search",
+        "reverse_phone_search",
+        "People Data",
+        ReversePhoneSearchRequest,
+        "REVERSE_PHONE_API_URL",
+        "Performs a reverse phone search by proxying the request to the EnformionGO API.",
+        search_type="ReversePhone",
+        paged=True,
+    ),
+    EndpointSpec(
+        "/id-verification",
+        "id_verification",
+        "People Data",
+        IdVerificationRequest,
+        "ID_VERIFICATION_API_URL",
+        "Provides an identity score and verification flag. Requires at least two criteria.",
+        search_type="DevAPIIDVerification",
+        validator=validate_id_verification_request,
+    ),
+    EndpointSpec(
+        "/census-search",
+        "census_search",
+        "People Data",
+        CensusSearchRequest,
+        "CENSUS_SEARCH_API_URL",
+        "Searches historical population data.",
+        search_type="Census",
+    ),
+    EndpointSpec(
+        "/divorce-search",
+        "divorce_search",
+        "People Data",
+        DivorceSearchRequest,
+        "DIVORCE_SEARCH_API_URL",
+        "Searches for divorce records.",
+        search_type="Divorce",
+    ),
+    EndpointSpec(
+        "/linkedin-id",
+        "linkedin_id",
+        "People Data",
+        LinkedInIdRequest,
+        "LINKEDIN_ID_API_URL",
+        "Searches by a LinkedIn profile URL.",
+        search_type="LinkedinID",
+    ),
+    # --- Property Data Endpoints ---
+    EndpointSpec(
+        "/property-search-v2",
+        "property_search_v2",
+        "Property Data",
+        PropertySearchV2Request,
+        "PROPERTY_SEARCH_V2_API_URL",
+        "Searches for property data.",
+        search_type_header=SearchTypeHeader("The galaxy-search-type for Property Search V2."),
+        paged=True,
+    ),
+    # --- Business Data Endpoints ---
+    EndpointSpec(
+        "/business-search",
+        "business_search",
+        "Business Data",
+        BusinessSearchRequest,
+        "BUSINESS_SEARCH_V2_API_URL",
+        "Searches for business data using various criteria.",
+        search_type="Business",
+        paged=True,
+    ),
+    EndpointSpec(
+        "/business-search-v2",
+        "business_search_v2",
+        "Business Data",
+        BusinessSearchRequest,
+        "BUSINESS_SEARCH_V2_API_URL",
+        "Searches for business data using various criteria.",
+        search_type_header=SearchTypeHeader("The galaxy-search-type for Business Search V2."),
+        paged=True,
+    ),
+    EndpointSpec(
+        "/domain-search",
+        "domain_search",
+        "Business Data",
+        DomainSearchRequest,
+        "DOMAIN_SEARCH_API_URL",
+        "Searches for domain data.",
+        search_type_header=SearchTypeHeader("The galaxy-search-type for Domain Search."),
+        paged=True,
+    ),
+    EndpointSpec(
+        "/workplace-search",
+        "workplace_search",
+        "Business Data",
+        WorkplaceSearchRequest,
+        "WORKPLACE_SEARCH_API_URL",
+        "Searches for workplace data.",
+        search_type_header=SearchTypeHeader("The galaxy-search-type for Workplace Search."),
+        paged=True,
+    ),
+    EndpointSpec(
+        "/business-id",
+        "business_id",
+        "Business Data",
+        BusinessIDRequest,
+        "BUSINESS_ID_API_URL",
+        "Searches by business ID.",
+        search_type_header=SearchTypeHeader("The galaxy-search-type for Business ID Search."),
+        paged=True,
+        entity_lookup=EntityLookup("business", "businessId"),
+    ),
+]
@@ -0,0 +1,111 @@
+"""Opt-in store answering repeated ID lookups by ID alone.
+
+`/contact-id` and `/business-id` responses are held by entity kind, search type and ID,
+so a later lookup of the same ID is answered with the very same upstream body while it
+is fresh, however the request was spelled. Records seen in search results are never
+used: they carry less data than the ID lookups return.
+"""
+
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from cache import ResponseCache
+from config import Settings, settings
+from passthrough import RawBody
+
+
+class EntityLookup(NamedTuple):
+    """How an ID endpoint is answered from the store.
+
+    Attributes:
+        kind: The entity kind looked up, e.g. "person".
+        field: The request field holding the ID.
+    """
+
+    kind: str
+    field: str
+
+
+def lookup_id(lookup: EntityLookup, request_body: Dict[str, Any]) -> Optional[str]:
+    """Returns the ID of a plain first-page lookup, or None if the request asks for more."""
+    entity_id = request_body.get(lookup.field)
+    for key, value in request_body.items():
+        if key != lookup.field and not (key == "Page" and value == 1):
+            return None
+    if not isinstance(entity_id, str) or not entity_id.strip():
+        return None
+    return entity_id.strip()
+
+
+def _is_error(page: Dict[str, Any]) -> bool:
+    return any(key.lower() == "iserror" and value for key, value in page.items())
+
+
+class EntityStore:
+    """A bounded, TTL-limited index of ID lookup responses by entity kind, search type and ID."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, clock=time.monotonic):
+        """Initializes the store.
+
+        Args:
+            max_entries: Maximum number of stored responses.
+            max_bytes: Maximum total size of the stored responses.
+            ttl: Seconds a response may be served after it was fetched.
+            clock: Monotonic time source, overridable in tests.
+        """
+        self.ttl = ttl
+        self._store = ResponseCache(max_entries, max_bytes, clock)
+        self.ingested = 0
+        self.lookups = 0
+        self.hits = 0
+
+    def ingest(self, lookup: EntityLookup, search_type: str, entity_id: str, body: RawBody):
+        """Stores the upstream response to a lookup of `entity_id`.
+
+        Meant to run after the response has been sent; malformed and error bodies are ignored.
+        """
+        try:
+            page = body.json()
+        except ValueError:
+            return
+        if not isinstance(page, dict) or _is_error(page):
+            return
+        self._store.set(f"{lookup.kind}:{search_type}:{entity_id}", body, self.ttl)
+        self.ingested += 1
+
+    def lookup(self, lookup: EntityLookup, search_type: str, entity_id: str) -> Optional[RawBody]:
+        """Returns the fresh stored response to a lookup of `entity_id`, if any."""
+        self.lookups += 1
+        entry = self._store.get(f"{lookup.kind}:{search_type}:{entity_id}")
+        if entry is None:
+            return None
+        self.hits += 1
+        return entry.value
+
+    def clear(self):
+        """Forgets every stored record."""
+        self._store.purge()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns lookup counters, including the upstream calls avoided, and occupancy."""
+        return {
+            "ingested_responses": self.ingested,
+            "lookups": self.lookups,
+            "upstream_calls_avoided": self.hits,
+            "hit_ratio": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "entries": len(self._store),
+            "bytes": self._store.total_bytes,
+            "evictions": self._store.evictions,
+        }
+
+
+def build_entity_store(settings: Settings) -> EntityStore:
+    """Creates a store sized from the application settings."""
+    return EntityStore(
+        settings.ENTITY_STORE_MAX_ENTRIES,
+        settings.ENTITY_STORE_MAX_BYTES,
+        settings.ENTITY_STORE_TTL,
+    )
+
+
+entity_store = build_entity_store(settings)
@@ -1,11 +1,12 @@
 """Error handling for the EnformionGO API wrapper."""
 
 import logging
+import math
 from fastapi import Request
 from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
-from exceptions import EnformionGOException
+from exceptions import DeadlineExceededError, EnformionGOException, OverloadedError, RateLimitError, UpstreamUnavailableError
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +21,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     Returns:
         The JSON response.
     """
-    logger.error(f"HTTP Exception: {exc.detail}", exc_info=True)
+    logger.error("HTTP Exception: %s", exc.detail, exc_info=True)
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
@@ -29,8 +30,56 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
 
 async def enformiongo_exception_handler(request: Request, exc: EnformionGOException):
     """Handles EnformionGO exceptions."""
-    logger.error(f"EnformionGO Exception: {exc.detail}", exc_info=True)
+    logger.error("EnformionGO Exception: %s", exc.detail, exc_info=True)
     return JSONResponse(
         status_code=400,
         content={"detail": "An internal error occurred while processing the request."},
-    )
\ No newline at end of file
+    )
+
+
+async def rate_limit_exception_handler(request: Request, exc: RateLimitError):
+    """Handles rate limit exceptions with a 429 so callers back off instead of retrying blindly."""
+    logger.warning("Rate limited: %s", exc.detail)
+    headers = {}
+    if exc.retry_after is not None:
+        headers["Retry-After"] = str(max(1, math.ceil(exc.retry_after)))
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests to the upstream service. Please retry later."},
+        headers=headers,
+    )
+
+
+async def upstream_unavailable_exception_handler(request: Request, exc: UpstreamUnavailableError):
+    """Handles short-circuited upstream calls with a 503 so callers fail fast."""
+    logger.warning("Upstream unavailable: %s", exc.detail)
+    headers = {}
+    if exc.retry_after is not None:
+        headers["Retry-After"] = str(max(1, math.ceil(exc.retry_after)))
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "The upstream service is temporarily unavailable. Please retry later."},
+        headers=headers,
+    )
+
+
+async def overloaded_exception_handler(request: Request, exc: OverloadedError):
+    """Handles requests shed by admission control with a 503 so callers back off quickly."""
+    logger.warning("Request shed (%s): %s", exc.reason, exc.detail)
+    headers = {}
+    if exc.retry_after is not None:
+        headers["Retry-After"] = str(max(1, math.ceil(exc.retry_after)))
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "The service is over capacity. Please retry later."},
+        headers=headers,
+    )
+
+
+async def deadline_exceeded_exception_handler(request: Request, exc: DeadlineExceededError):
+    """Handles requests whose own deadline passed with a 504, since retrying the same deadline cannot help."""
+    logger.info("Deadline exceeded: %s", exc.detail)
+    return JSONResponse(
+        status_code=504,
+        content={"detail": "The request deadline passed before the upstream service answered."},
+    )
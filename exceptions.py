@@ -1,5 +1,8 @@
 """Custom exceptions for the EnformionGO API wrapper."""
 
+from typing import Optional
+
+
 class EnformionGOException(Exception):
     """Base exception for the EnformionGO API wrapper."""
 
@@ -19,3 +22,51 @@ class APIConnectionError(EnformionGOException):
 
 class InvalidRequestError(EnformionGOException):
     """Raised when the request to the EnformionGO API is invalid."""
+
+
+class RateLimitError(EnformionGOException):
+    """Raised when an upstream call is rejected by the local or upstream rate limit."""
+
+    def __init__(self, detail: str, retry_after: Optional[float] = None):
+        """Initializes the exception.
+
+        Args:
+            detail: The detail of the exception.
+            retry_after: Suggested number of seconds before retrying, if known.
+        """
+        super().__init__(detail)
+        self.retry_after = retry_after
+
+
+class UpstreamUnavailableError(EnformionGOException):
+    """Raised when calls to an upstream endpoint are short-circuited while it recovers."""
+
+    def __init__(self, detail: str, retry_after: Optional[float] = None):
+        """Initializes the exception.
+
+        Args:
+            detail: The detail of the exception.
+            retry_after: Suggested number of seconds before retrying, if known.
+        """
+        super().__init__(detail)
+        self.retry_after = retry_after
+
+
+class OverloadedError(EnformionGOException):
+    """Raised when an inbound request is shed because the service is at capacity."""
+
+    def __init__(self, detail: str, reason: str, retry_after: Optional[float] = None):
+        """Initializes the exception.
+
+        Args:
+            detail: The detail of the exception.
+            reason: Why the request was shed: queue_full, client_queue_full or deadline.
+            retry_after: Suggested number of seconds before retrying, if known.
+        """
+        super().__init__(detail)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(EnformionGOException):
+    """Raised when a request's client-supplied deadline passes before the upstream answers."""
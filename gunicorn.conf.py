@@ -0,0 +1,89 @@
+"""Gunicorn configuration for the multi-process production mode.
+
+    gunicorn main:app
+
+Gunicorn picks this file up from the working directory. Each worker is a uvicorn worker
+that uses uvloop and httptools when they are installed. Everything can be overridden from
+the environment:
+
+* `WEB_CONCURRENCY`: worker processes; defaults to the CPUs available to the container
+  (affinity and cgroup quota), capped by `GUNICORN_MAX_WORKERS`;
+* `GUNICORN_BIND` (or `PORT`), `GUNICORN_KEEPALIVE`, `GUNICORN_TIMEOUT`,
+  `GUNICORN_GRACEFUL_TIMEOUT`;
+* `GUNICORN_MAX_REQUESTS` / `GUNICORN_MAX_REQUESTS_JITTER`: requests after which a worker
+  is gracefully replaced, bounding memory growth (0 disables recycling);
+* `GUNICORN_PRELOAD`: import the app once in the master (default on).
+
+The app is imported before workers fork, but nothing it creates at import time holds
+sockets, threads or event-loop state: the upstream pool and the job runner are created by
+each worker's lifespan. Caches, metrics and rate limiter buckets are per worker; the
+configured rate limits are shared out between workers (see `WEB_CONCURRENCY` in
+`config.py`).
+"""
+
+import gc
+import math
+import os
+import random
+
+# Ceiling of the automatic worker count
+DEFAULT_MAX_WORKERS = 16
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name, "").strip()
+    return int(value) if value else default
+
+
+def available_cpus(cpu_max_path: str = CGROUP_CPU_MAX) -> int:
+    """Returns the CPUs this process may use, honouring affinity and a cgroup v2 quota."""
+    cpus = os.process_cpu_count() or 1
+    try:
+        with open(cpu_max_path) as handle:
+            quota, period = handle.read().split()[:2]
+    except (OSError, ValueError):
+        return cpus
+    if quota != "max":
+        cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    return cpus
+
+
+def worker_count(environ=os.environ, cpus: int = None) -> int:
+    """Returns `WEB_CONCURRENCY` if set, otherwise one worker per available CPU."""
+    configured = environ.get("WEB_CONCURRENCY", "").strip()
+    if configured:
+        return max(1, int(configured))
+    cpus = available_cpus() if cpus is None else cpus
+    return max(1, min(cpus, int(environ.get("GUNICORN_MAX_WORKERS") or DEFAULT_MAX_WORKERS)))
+
+
+bind = os.environ.get("GUNICORN_BIND") or f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = worker_count()
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# The app reads this to share server-wide limits between the workers.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() not in ("0", "false", "no")
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+# Heartbeat timeout; async workers keep reporting while requests wait on the upstream.
+timeout = _env_int("GUNICORN_TIMEOUT", 60)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 20_000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10)
+
+# Heartbeat files on tmpfs, so a slow disk cannot make healthy workers look stuck.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+
+def when_ready(server):
+    """Freezes the preloaded app's objects so forked workers keep sharing their pages."""
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    """Gives each worker its own random state, e.g. for independent retry jitter."""
+    random.seed()
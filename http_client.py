@@ -0,0 +1,270 @@
+"""Shared upstream connection pool for the EnformionGO API wrapper."""
+
+import asyncio
+import importlib.util
+import logging
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import Settings
+from passthrough import UPSTREAM_ACCEPT_ENCODING, RawBody
+
+logger = logging.getLogger(__name__)
+
+# httpcore trace events that mark the moment a request got hold of a connection,
+# either by opening a new one or by starting to write on a pooled one.
+_CONNECTION_ACQUIRED_EVENTS = frozenset(
+    {
+        "connection.connect_tcp.started",
+        "connection.connect_unix_socket.started",
+        "http11.send_request_headers.started",
+        "http2.send_request_headers.started",
+    }
+)
+
+
+def http2_available() -> bool:
+    """Returns True if the optional `h2` package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def upstream_origins(settings: Settings) -> list:
+    """Returns the distinct scheme://host[:port] origins of every configured upstream URL."""
+    origins = []
+    for name, value in settings.model_dump().items():
+        if name.endswith("_API_URL") and isinstance(value, str):
+            parts = urlsplit(value)
+            origin = f"{parts.scheme}://{parts.netloc}"
+            if origin not in origins:
+                origins.append(origin)
+    return origins
+
+
+class PoolStats:
+    """Counters describing how busy the upstream pool is and how long requests wait for it."""
+
+    def __init__(self):
+        """Initializes the counters."""
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.new_connections = 0
+        self.pool_timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        """Records the time a request spent waiting for a pooled connection."""
+        self.wait_count += 1
+        self.wait_total += seconds
+        if seconds > self.wait_max:
+            self.wait_max = seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the counters as a JSON-serialisable dict."""
+        avg = self.wait_total / self.wait_count if self.wait_count else 0.0
+        return {
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "new_connections": self.new_connections,
+            "pool_timeouts": self.pool_timeouts,
+            "wait": {
+                "count": self.wait_count,
+                "avg_ms": round(avg * 1000, 3),
+                "max_ms": round(self.wait_max * 1000, 3),
+            },
+        }
+
+
+class UpstreamResponse:
+    """A fully received upstream response whose body is kept as sent on the wire."""
+
+    __slots__ = ("status_code", "headers", "body")
+
+    def __init__(self, status_code: int, headers: httpx.Headers, body: RawBody):
+        """Initializes the response.
+
+        Args:
+            status_code: The upstream status code.
+            headers: The upstream response headers.
+            body: The raw, possibly compressed, body.
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+    @property
+    def text(self) -> str:
+        """The decoded body as text, for logging."""
+        return self.body.decoded().decode("utf-8", errors="replace")
+
+
+class UpstreamPool:
+    """Owns the single long-lived `httpx.AsyncClient` used for every upstream call.
+
+    The client is created in the FastAPI lifespan via `start()` and closed via
+    `aclose()`, so each worker process keeps its own pool of keep-alive connections.
+    """
+
+    def __init__(self):
+        """Initializes an unstarted pool."""
+        self._client: Optional[httpx.AsyncClient] = None
+        self._limits: Optional[httpx.Limits] = None
+        self._http2 = False
+        self.stats = PoolStats()
+
+    @property
+    def started(self) -> bool:
+        """Whether the pool currently holds an open client."""
+        return self._client is not None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client. Raises if the pool has not been started."""
+        if self._client is None:
+            raise RuntimeError("The upstream connection pool has not been started.")
+        return self._client
+
+    async def start(self, settings: Settings, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """Creates the shared client and optionally pre-warms connections.
+
+        Args:
+            settings: The application settings.
+            transport: Optional transport override, mainly for tests.
+        """
+        if self._client is not None:
+            return
+
+        http2 = settings.UPSTREAM_HTTP2
+        if http2 and not http2_available():
+            logger.warning("UPSTREAM_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1.")
+            http2 = False
+
+        self._limits = httpx.Limits(
+            max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY,
+        )
+        self._http2 = http2
+        self.stats = PoolStats()
+        accept_encoding = UPSTREAM_ACCEPT_ENCODING if settings.UPSTREAM_COMPRESSION else "identity"
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.UPSTREAM_TIMEOUT, pool=settings.UPSTREAM_POOL_TIMEOUT),
+            limits=self._limits,
+            http2=http2,
+            transport=transport,
+            headers={"Accept-Encoding": accept_encoding},
+        )
+
+        if settings.UPSTREAM_PREWARM_CONNECTIONS > 0:
+            await self.prewarm(upstream_origins(settings), settings.UPSTREAM_PREWARM_CONNECTIONS)
+
+    async def aclose(self):
+        """Closes the shared client and all pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def prewarm(self, origins: list, connections: int):
+        """Opens up to `connections` keep-alive connections to each origin.
+
+        Failures are logged and ignored; pre-warming is only an optimisation.
+        """
+        per_origin = 1 if self._http2 else connections
+
+        async def _touch(origin: str):
+            try:
+                await self.client.head(origin)
+            except httpx.HTTPError as exc:
+                logger.warning("Could not pre-warm connection to %s: %s", origin, exc)
+
+        await asyncio.gather(*(_touch(origin) for origin in origins for _ in range(per_origin)))
+        logger.info("Pre-warmed %d upstream connection(s) to %d origin(s).", per_origin, len(origins))
+
+    async def post(
+        self,
+        url: str,
+        *,
+        json: Any,
+        headers: Dict[str, str],
+        timeout: Optional[httpx.Timeout] = None,
+    ) -> UpstreamResponse:
+        """Sends a POST through the shared client, recording pool statistics.
+
+        The body is read without undoing its `Content-Encoding`, so it can be cached and
+        forwarded compressed.
+        """
+        client = self.client
+        stats = self.stats
+        start = time.perf_counter()
+        acquired_at = None
+
+        async def trace(event: str, info: dict):
+            nonlocal acquired_at
+            if acquired_at is None and event in _CONNECTION_ACQUIRED_EVENTS:
+                acquired_at = time.perf_counter()
+            if event == "connection.connect_tcp.started":
+                stats.new_connections += 1
+
+        stats.requests += 1
+        stats.in_flight += 1
+        if stats.in_flight > stats.peak_in_flight:
+            stats.peak_in_flight = stats.in_flight
+        try:
+            request = client.build_request(
+                "POST",
+                url,
+                json=json,
+                headers=headers,
+                timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout,
+                extensions={"trace": trace},
+            )
+            response = await client.send(request, stream=True)
+            try:
+                if response.is_stream_consumed:
+                    # Bodies built in memory (e.g. by a mock transport) arrive already read and decoded.
+                    content, encoding = response.content, None
+                else:
+                    content = b"".join([chunk async for chunk in response.aiter_raw()])
+                    encoding = response.headers.get("content-encoding")
+            finally:
+                await response.aclose()
+            body = RawBody(content, response.headers.get("content-type", "application/json"), encoding)
+            return UpstreamResponse(response.status_code, response.headers, body)
+        except httpx.PoolTimeout:
+            stats.pool_timeouts += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            if acquired_at is not None:
+                stats.record_wait(acquired_at - start)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns pool configuration, occupancy and wait-time statistics."""
+        data: Dict[str, Any] = {"started": self.started, "http2": self._http2}
+        if self._limits is not None:
+            data["limits"] = {
+                "max_connections": self._limits.max_connections,
+                "max_keepalive_connections": self._limits.max_keepalive_connections,
+                "keepalive_expiry": self._limits.keepalive_expiry,
+            }
+        data["connections"] = self._connection_counts()
+        data.update(self.stats.as_dict())
+        return data
+
+    def _connection_counts(self) -> Dict[str, int]:
+        """Best-effort occupancy read from the underlying httpcore pool."""
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {"open": 0, "idle": 0, "active": 0}
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {"open": len(connections), "idle": idle, "active": len(connections) - idle}
+
+
+upstream_pool = UpstreamPool()
@@ -0,0 +1,530 @@
+"""Background bulk jobs: enrich uploaded CSV or NDJSON files row by row.
+
+A submitted file is split into rows and stored in a local SQLite database together with
+the job. An in-process runner sends the pending rows upstream with bounded concurrency
+and checkpoints every result as it completes, so a restarted server resumes where it
+stopped and never sends (and bills) a completed row again; only the rows that were in
+flight when the process died are sent again. Results are downloaded as NDJSON in row
+order, in the same line format as the batch endpoints.
+"""
+
+import asyncio
+import csv
+import os
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from batch import describe_item_error, ndjson_line
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not on Windows; a single process always runs jobs there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"  # Still being uploaded; not run until queued
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+
+CSV = "csv"
+NDJSON = "ndjson"
+
+# Rows inserted per transaction while a file is read
+INSERT_CHUNK = 1000
+# Pending rows loaded at a time while a job runs
+WORK_CHUNK = 500
+# Result rows read at a time while a download streams
+RESULT_CHUNK = 500
+# Longest pause, in seconds, before a runner retries after an unexpected error
+MAX_RETRY_DELAY = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    succeeded INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_rows (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    input TEXT NOT NULL,
+    status INTEGER,
+    result BLOB,
+    error TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+# Processes one row for an endpoint path, returning the upstream JSON body
+ProcessRow = Callable[[str, Dict[str, Any]], Awaitable[bytes]]
+
+
+def _set_path(row: Dict[str, Any], column: str, value: Any):
+    keys = column.split(".")
+    for key in keys[:-1]:
+        row = row.setdefault(key, {})
+    row[keys[-1]] = value
+
+
+async def read_upload(request: Request, max_bytes: int) -> bytes:
+    """Reads an uploaded file as it arrives, refusing it once it exceeds `max_bytes`.
+
+    Raises:
+        HTTPException: 413 for a file larger than `max_bytes`.
+    """
+    too_large = HTTPException(status_code=413, detail=f"A job file may be at most {max_bytes} bytes.")
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        raise too_large
+    content = bytearray()
+    async for chunk in request.stream():
+        content += chunk
+        if len(content) > max_bytes:
+            raise too_large
+    return bytes(content)
+
+
+def csv_rows(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Parses CSV lines into request bodies.
+
+    The header names the request fields by alias. Dotted headers such as
+    `Address.addressLine1` build nested objects, cells starting with `[` are read as JSON
+    lists, and empty cells are left out.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [column.strip() for column in header]
+    for cells in reader:
+        row: Dict[str, Any] = {}
+        for column, cell in zip(columns, cells):
+            cell = cell.strip()
+            if not cell:
+                continue
+            if cell.startswith("["):
+                try:
+                    cell = json.loads(cell)
+                except ValueError:
+                    pass
+            _set_path(row, column, cell)
+        yield row
+
+
+def ndjson_rows(lines: Iterable[str]) -> Iterator[Any]:
+    """Parses NDJSON lines into request bodies, skipping blank lines.
+
+    Lines that are not valid JSON are kept as their text, to be reported as row errors.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line
+
+
+class JobStore:
+    """SQLite persistence for jobs and their rows.
+
+    Runs on the event loop: every statement is a short indexed read or a single-row
+    write, and WAL mode keeps commits cheap.
+    """
+
+    def __init__(self, path: str):
+        """Opens (creating if needed) the database at `path`."""
+        self.path = path
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        """Closes the database."""
+        self._db.close()
+
+    def create_job(self, endpoint: str) -> str:
+        """Registers a new, empty job that is not run until it is queued, and returns its ID."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._db.execute(
+            "INSERT INTO jobs (id, endpoint, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, endpoint, PENDING, now, now),
+        )
+        return job_id
+
+    def add_rows(self, job_id: str, start: int, rows: List[Any]):
+        """Stores a chunk of input rows, numbered from `start`, in one transaction."""
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT INTO job_rows (job_id, idx, input) VALUES (?, ?, ?)",
+                [(job_id, start + offset, json.dumps(row)) for offset, row in enumerate(rows)],
+            )
+            self._db.execute("UPDATE jobs SET total = ? WHERE id = ?", (start + len(rows), job_id))
+
+    def delete_job(self, job_id: str):
+        """Removes a job and its rows."""
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM job_rows WHERE job_id = ?", (job_id,))
+            self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def set_status(self, job_id: str, status: str):
+        """Moves a job to `status`."""
+        self._db.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (status, time.time(), job_id))
+
+    def status(self, job_id: str) -> Optional[str]:
+        """Returns a job's status, or None if it does not exist."""
+        row = self._db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def start(self, job_id: str) -> bool:
+        """Marks a queued or running job running; False if it was cancelled or finished meanwhile."""
+        cursor = self._db.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+            (RUNNING, time.time(), job_id, QUEUED, RUNNING),
+        )
+        return cursor.rowcount > 0
+
+    def finish(self, job_id: str):
+        """Marks a running job completed, unless it was cancelled meanwhile."""
+        self._db.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (COMPLETED, time.time(), job_id, RUNNING),
+        )
+
+    def next_job(self) -> Optional[Tuple[str, str]]:
+        """Returns the (ID, endpoint) of the oldest unfinished job, if any."""
+        return self._db.execute(
+            "SELECT id, endpoint FROM jobs WHERE status IN (?, ?) ORDER BY created_at LIMIT 1", (QUEUED, RUNNING)
+        ).fetchone()
+
+    def pending_rows(self, job_id: str, limit: int) -> List[Tuple[int, Any]]:
+        """Returns up to `limit` rows of a job that have no result yet."""
+        cursor = self._db.execute(
+            "SELECT idx, input FROM job_rows WHERE job_id = ? AND status IS NULL ORDER BY idx LIMIT ?",
+            (job_id, limit),
+        )
+        return [(index, json.loads(text)) for index, text in cursor]
+
+    def complete_row(self, job_id: str, index: int, status: int, result: Optional[bytes] = None, error: Any = None):
+        """Checkpoints the outcome of one row together with the job's progress counters."""
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "UPDATE job_rows SET status = ?, result = ?, error = ? WHERE job_id = ? AND idx = ?",
+                (status, result, None if error is None else json.dumps(error), job_id, index),
+            )
+            self._db.execute(
+                "UPDATE jobs SET completed = completed + 1, succeeded = succeeded + ?, updated_at = ? WHERE id = ?",
+                (int(status == 200), time.time(), job_id),
+            )
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Returns a job's state and progress, or None if it does not exist."""
+        row = self._db.execute(
+            "SELECT id, endpoint, status, total, completed, succeeded, created_at, updated_at FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        job_id, endpoint, status, total, done, succeeded, created_at, updated_at = row
+        return {
+            "id": job_id,
+            "endpoint": endpoint,
+            "status": status,
+            "total": total,
+            "completed": done,
+            "succeeded": succeeded,
+            "failed": done - succeeded,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Returns every job, newest first."""
+        ids = [row[0] for row in self._db.execute("SELECT id FROM jobs ORDER BY created_at DESC")]
+        return [self.job(job_id) for job_id in ids]
+
+    def result_lines(self, job_id: str, after: int, limit: int) -> List[Tuple[int, bytes]]:
+        """Returns up to `limit` completed rows after index `after` as NDJSON lines."""
+        cursor = self._db.execute(
+            "SELECT idx, status, result, error FROM job_rows "
+            "WHERE job_id = ? AND idx > ? AND status IS NOT NULL ORDER BY idx LIMIT ?",
+            (job_id, after, limit),
+        )
+        lines = []
+        for index, status, result, error in cursor:
+            if result is not None:
+                lines.append((index, ndjson_line(index, status, result=bytes(result))))
+            else:
+                lines.append((index, ndjson_line(index, status, error=json.loads(error))))
+        return lines
+
+
+class RunnerLock:
+    """An exclusive, non-blocking lock file electing the one process that runs jobs.
+
+    Every worker process serves the job API, but only the holder of the lock sends rows
+    upstream. The lock is released by the operating system when its holder exits, so
+    another worker takes over after a crash or a recycled worker.
+    """
+
+    def __init__(self, path: str):
+        """Initializes the lock for `path` without acquiring it."""
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        """Whether this process holds the lock."""
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """Takes the lock if it is free; returns whether this process holds it."""
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        """Gives the lock up."""
+        if self._fd is not None and self._fd >= 0:
+            os.close(self._fd)
+        self._fd = None
+
+
+class JobRunner:
+    """Runs stored jobs one at a time, oldest first, with a bounded number of rows in flight.
+
+    Safe to run in every worker of a multi-process server: the job database is shared and
+    a `RunnerLock` next to it lets one worker at a time do the work. Jobs submitted or
+    cancelled through other workers are noticed within `JOBS_POLL_INTERVAL`.
+    """
+
+    def __init__(self):
+        """Creates an idle runner; `start` opens the store and begins work."""
+        self.store: Optional[JobStore] = None
+        self.endpoints: List[str] = []
+        self.max_rows = 0
+        self._process: Optional[ProcessRow] = None
+        self._concurrency = 1
+        self._poll_interval = 1.0
+        self._lock: Optional[RunnerLock] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, settings, process: ProcessRow):
+        """Opens the job database and resumes any unfinished job.
+
+        Args:
+            settings: The application settings.
+            process: Sends one validated row upstream and returns the response body.
+        """
+        if self._task is not None:
+            return
+        self.store = JobStore(settings.JOBS_DB_PATH)
+        self.endpoints = list(settings.JOBS_ENDPOINTS)
+        self.max_rows = settings.JOBS_MAX_ROWS
+        self._process = process
+        self._concurrency = max(1, settings.JOBS_CONCURRENCY)
+        self._poll_interval = settings.JOBS_POLL_INTERVAL
+        self._lock = RunnerLock(settings.JOBS_DB_PATH + ".lock")
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def aclose(self):
+        """Stops work; unfinished rows are picked up again on the next start."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._lock.release()
+        self.store.close()
+        self.store = None
+
+    def _require_store(self) -> JobStore:
+        if self.store is None:
+            raise HTTPException(status_code=503, detail="The job runner is not running.")
+        return self.store
+
+    async def submit(self, endpoint: str, fmt: str, content: bytes) -> Dict[str, Any]:
+        """Stores an uploaded file as a new job and queues it.
+
+        Rows are inserted in chunks, yielding to the event loop in between so a large file
+        does not stall requests being served. The job is only queued once every row is
+        stored, and is deleted if the upload fails or is cancelled part way.
+
+        Raises:
+            HTTPException: 404 for an endpoint that does not accept jobs, 413 for a file
+                with more than `JOBS_MAX_ROWS` rows.
+        """
+        store = self._require_store()
+        if endpoint not in self.endpoints:
+            raise HTTPException(status_code=404, detail=f"Jobs are not available for {endpoint}.")
+        parse = csv_rows if fmt == CSV else ndjson_rows
+        job_id = store.create_job(endpoint)
+        lines = content.decode("utf-8-sig").splitlines(keepends=True)
+        total = 0
+        chunk: List[Any] = []
+        try:
+            for row in parse(lines):
+                chunk.append(row)
+                if total + len(chunk) > self.max_rows:
+                    raise HTTPException(status_code=413, detail=f"A job may contain at most {self.max_rows} rows.")
+                if len(chunk) >= INSERT_CHUNK:
+                    store.add_rows(job_id, total, chunk)
+                    total += len(chunk)
+                    chunk = []
+                    await asyncio.sleep(0)
+            if chunk:
+                store.add_rows(job_id, total, chunk)
+        except BaseException:
+            # Includes the upload being cancelled, e.g. by the client disconnecting.
+            store.delete_job(job_id)
+            raise
+        store.set_status(job_id, QUEUED)
+        self._wake.set()
+        return store.job(job_id)
+
+    def job(self, job_id: str) -> Dict[str, Any]:
+        """Returns a job's progress.
+
+        Raises:
+            HTTPException: 404 if the job does not exist.
+        """
+        job = self._require_store().job(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+        return job
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Returns every job, newest first."""
+        return self._require_store().jobs()
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """Stops an unfinished job; rows already completed keep their results."""
+        job = self.job(job_id)
+        if job["status"] in (QUEUED, RUNNING):
+            self.store.set_status(job_id, CANCELLED)
+            job["status"] = CANCELLED
+        return job
+
+    async def results(self, job_id: str) -> AsyncIterator[bytes]:
+        """Streams the completed rows of a job as NDJSON, in row order."""
+        self.job(job_id)
+        after = -1
+        while True:
+            lines = self.store.result_lines(job_id, after, RESULT_CHUNK)
+            if not lines:
+                return
+            for after, line in lines:
+                yield line
+
+    async def _idle(self):
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), self._poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        failures = 0
+        while True:
+            if not self._lock.acquire():
+                await self._idle()
+                continue
+            job = self.store.next_job()
+            if job is None:
+                await self._idle()
+                continue
+            job_id, endpoint = job
+            try:
+                if not self.store.start(job_id):
+                    continue
+                await self._run_job(job_id, endpoint)
+                self.store.finish(job_id)
+            except Exception:
+                failures += 1
+                delay = min(MAX_RETRY_DELAY, self._poll_interval * 2**failures)
+                logger.exception("Job %s stopped unexpectedly; retrying in %.1fs.", job_id, delay)
+                # Let another worker take over while this one backs off.
+                self._lock.release()
+                await asyncio.sleep(delay)
+            else:
+                failures = 0
+
+    def _cancelled(self, job_id: str) -> bool:
+        # Read from the database, as the cancel request may have reached another worker.
+        return self.store.status(job_id) == CANCELLED
+
+    async def _run_job(self, job_id: str, endpoint: str):
+        """Processes a job's pending rows until none are left or the job is cancelled."""
+        while not self._cancelled(job_id):
+            rows = self.store.pending_rows(job_id, WORK_CHUNK)
+            if not rows:
+                return
+            queue = iter(rows)
+
+            async def worker():
+                for index, row in queue:
+                    if self._cancelled(job_id):
+                        return
+                    try:
+                        result = await self._process(endpoint, row)
+                    except Exception as exc:
+                        status, detail = describe_item_error(exc)
+                        self.store.complete_row(job_id, index, status, error=detail)
+                    else:
+                        self.store.complete_row(job_id, index, 200, result=result)
+
+            # A failing worker cancels the others, so no row is still in flight when the runner retries.
+            async with asyncio.TaskGroup() as workers:
+                for _ in range(min(self._concurrency, len(rows))):
+                    workers.create_task(worker())
+
+    def stats(self) -> Dict[str, Any]:
+        """Reports the runner's configuration and job counts by status."""
+        counts: Dict[str, int] = {}
+        if self.store is not None:
+            for job in self.store.jobs():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {
+            "running": self._task is not None,
+            "runs_jobs": self._lock is not None and self._lock.held,
+            "concurrency": self._concurrency,
+            "endpoints": self.endpoints,
+            "jobs": counts,
+        }
+
+
+job_runner = JobRunner()
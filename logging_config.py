@@ -1,39 +1,252 @@
-"""Logging configuration for the EnformionGO API wrapper."""
+"""Logging configuration for the EnformionGO API wrapper.
 
+Log calls never block the event loop. A record is put on a bounded queue and a background
+thread formats it (`msg % args`, tracebacks) and writes it to stderr, so call sites
+should pass arguments instead of pre-formatted f-strings, and must not mutate them after
+the call. When the queue is full, new records are dropped and counted instead of waiting.
+Repetitive records are rate limited per call site: `LOG_SAMPLE_BURST` records per
+`LOG_SAMPLE_WINDOW` seconds are written, the rest are counted and reported with the next
+record from that call site. Records logged through Loguru go through the same pipeline.
+
+Configured from the environment: `LOG_LEVEL` (default INFO), `LOG_FORMAT` (`json`, one
+object per line, or `text`), `LOG_QUEUE_SIZE`, `LOG_SAMPLE_BURST` (0 disables sampling)
+and `LOG_SAMPLE_WINDOW`.
+"""
+
+import atexit
+import json
 import logging
 import os
+import queue
 import sys
+import threading
+import time
+from typing import Any, Dict, Optional
 
 from loguru import logger
 
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_SAMPLE_BURST = 10
+DEFAULT_SAMPLE_WINDOW = 1.0
+# Call sites tracked by the sampler before its table is reset
+MAX_SAMPLED_SITES = 1_024
+TEXT_FORMAT = "%(asctime)s.%(msecs)03d | %(levelname)-8s | %(name)s:%(funcName)s:%(lineno)d - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through `extra=`.
+_RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "suppressed"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object, including fields passed through `extra=`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "function": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Formats a record as a human-readable line, in the layout Loguru uses by default."""
+
+    def __init__(self):
+        """Initializes the formatter."""
+        super().__init__(TEXT_FORMAT, "%Y-%m-%d %H:%M:%S")
 
-class InterceptHandler(logging.Handler):
-    """Intercepts standard logging messages and redirects them to Loguru."""
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        if getattr(record, "suppressed", 0):
+            line += f" ({record.suppressed} similar records suppressed)"
+        return line
 
-    def emit(self, record):
-        """Emits the record.
 
-        Args:
-            record: The record.
-        """
+class RepeatSampler:
+    """Lets `burst` records per call site through in each `window` seconds."""
+
+    def __init__(self, burst: int, window: float):
+        """Initializes the sampler."""
+        self.burst = burst
+        self.window = window
+        self.suppressed = 0
+        # (path, line) -> [window start, records allowed, records suppressed]
+        self._sites: Dict[tuple, list] = {}
+
+    def allow(self, record: logging.LogRecord) -> bool:
+        """Returns whether to write the record; the first one of a new window reports the suppressed count."""
+        key = (record.pathname, record.lineno)
+        state = self._sites.get(key)
+        if state is None or record.created - state[0] >= self.window:
+            if state is None and len(self._sites) >= MAX_SAMPLED_SITES:
+                self._sites.clear()
+            if state is not None and state[2]:
+                record.suppressed = state[2]
+            self._sites[key] = [record.created, 1, 0]
+            return True
+        if state[1] < self.burst:
+            state[1] += 1
+            return True
+        state[2] += 1
+        self.suppressed += 1
+        return False
+
+
+class LogPipeline:
+    """A bounded queue of log records, formatted and written by a background thread."""
+
+    def __init__(self, stream=None, max_queue: int = DEFAULT_QUEUE_SIZE, formatter: Optional[logging.Formatter] = None):
+        """Initializes the pipeline; `stream` defaults to stderr at write time."""
+        self.stream = stream
+        self.max_queue = max_queue
+        self.formatter = formatter or JsonFormatter()
+        self.written = 0
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Starts the writer thread; idempotent."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._drain, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, record: logging.LogRecord):
+        """Queues a record, dropping it if the queue is full."""
         try:
-            level = logger.level(record.levelname).name
-        except ValueError:
-            level = record.levelno
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
-        frame, depth = logging.currentframe(), 2
-        while frame.f_code.co_filename == logging.__file__:
-            frame = frame.f_back
-            depth += 1
+    def configure(self, max_queue: int, formatter: logging.Formatter):
+        """Applies new settings and (re)starts the writer thread, writing records queued so far first."""
+        self.close()
+        self.max_queue = max_queue
+        self.formatter = formatter
+        self._queue = queue.Queue(max_queue)
+        self.start()
 
-        logger.opt(depth=depth, exception=record.exc_info).log(
-            level, record.getMessage()
+    def close(self, timeout: float = 2.0):
+        """Writes the queued records and stops the writer thread."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._thread = None
+
+    def reset_after_fork(self):
+        """Replaces the queue and thread, which do not survive a fork, in a child process."""
+        running = self._thread is not None
+        self._queue = queue.Queue(self.max_queue)
+        self._thread = None
+        if running:
+            self.start()
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize(), "max_queue": self.max_queue, "written": self.written, "dropped": self.dropped}
+
+    def _format(self, record: logging.LogRecord) -> str:
+        try:
+            return self.formatter.format(record) + "\n"
+        except Exception as e:
+            return f"Could not format log record from {record.pathname}:{record.lineno}: {e!r}\n"
+
+    def _drain(self):
+        while True:
+            record = self._queue.get()
+            stopping = record is None
+            lines = [] if stopping else [self._format(record)]
+            # Write whatever else is queued in the same call.
+            while not stopping and len(lines) < 256:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    stopping = True
+                else:
+                    lines.append(self._format(record))
+            if lines:
+                stream = self.stream or sys.stderr
+                try:
+                    stream.write("".join(lines))
+                    stream.flush()
+                except (OSError, ValueError):
+                    pass
+                self.written += len(lines)
+            if stopping:
+                return
+
+
+class PipelineHandler(logging.Handler):
+    """Hands records to a `LogPipeline`, after rate limiting repetitive ones."""
+
+    def __init__(self, pipeline: LogPipeline, sampler: Optional[RepeatSampler] = None):
+        """Initializes the handler."""
+        super().__init__()
+        self.pipeline = pipeline
+        self.sampler = sampler
+
+    def emit(self, record: logging.LogRecord):
+        if self.sampler is None or self.sampler.allow(record):
+            self.pipeline.submit(record)
+
+    @property
+    def suppressed(self) -> int:
+        """Records held back by the sampler."""
+        return self.sampler.suppressed if self.sampler else 0
+
+    def stats(self) -> dict:
+        return {**self.pipeline.stats(), "suppressed": self.suppressed}
+
+
+def _forward_loguru(message):
+    """Loguru sink passing Loguru records to the standard logging pipeline."""
+    record = message.record
+    exception = record["exception"]
+    log_handler.handle(
+        logging.LogRecord(
+            name=record["name"] or "loguru",
+            level=record["level"].no,
+            pathname=record["file"].path,
+            lineno=record["line"],
+            msg=record["message"],
+            args=None,
+            exc_info=(exception.type, exception.value, exception.traceback) if exception else None,
+            func=record["function"],
         )
+    )
 
 
 def setup_logging():
     """Sets up the logging for the application."""
     log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
+    formatter = TextFormatter() if os.environ.get("LOG_FORMAT", "json").lower() == "text" else JsonFormatter()
+    log_pipeline.configure(int(os.environ.get("LOG_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)), formatter)
+    burst = int(os.environ.get("LOG_SAMPLE_BURST", DEFAULT_SAMPLE_BURST))
+    window = float(os.environ.get("LOG_SAMPLE_WINDOW", DEFAULT_SAMPLE_WINDOW))
+    log_handler.sampler = RepeatSampler(burst, window) if burst > 0 else None
+
     logger.remove()
-    logger.add(sys.stderr, level=log_level)
-    logging.basicConfig(handlers=[InterceptHandler()], level=0)
\ No newline at end of file
+    logger.add(_forward_loguru, level=log_level, format="{message}")
+    # Level checks happen before records are created, so disabled levels cost nothing.
+    logging.basicConfig(handlers=[log_handler], level=log_level)
+
+
+log_pipeline = LogPipeline()
+log_handler = PipelineHandler(log_pipeline)
+atexit.register(log_pipeline.close)
+os.register_at_fork(after_in_child=log_pipeline.reset_after_fork)
@@ -1,125 +1,460 @@
-from typing import List, Optional
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+import asyncio
+import functools
 import logging
-from enum import Enum
+import time
+from contextlib import asynccontextmanager
 import httpx
-from fastapi import FastAPI, Header, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Query, Request
+from pydantic import ValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from fastapi_mcp import FastApiMCP
-
-from config import Settings, settings
-from error_handling import http_exception_handler, enformiongo_exception_handler
-from exceptions import APIConnectionError, InvalidRequestError
-from logging_config import setup_logging
-from models import (
-    PropertySearchV2Request,
-    DomainSearchRequest,
-    WorkplaceSearchRequest,
-    BusinessIDRequest,
-    PersonSearchRequest,
-    ContactEnrichmentRequest,
-    ReversePhoneSearchRequest,
-    CallerIdRequest,
-    EmailIdRequest,
-    ContactIdRequest,
-    AddressIdRequest,
-    AddressAutoCompleteRequest,
-    IdVerificationRequest,
-    CensusSearchRequest,
-    DivorceSearchRequest,
-    LinkedInIdRequest,
-    BusinessSearchRequest,
+from starlette.background import BackgroundTasks
+
+from admission import AdmissionMiddleware, admission_controller
+from autocomplete import autocomplete_index
+from batch import NDJSON_MEDIA_TYPE, run_batch
+from cache import make_cache_key, response_cache
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, circuit_breakers
+from config import PrefetchRule, settings
+from credentials import credential_pool
+from deadlines import DeadlineMiddleware, cancellation_stats, within_deadline
+from endpoints import DispatchPlan, build_handler, compile_plans
+from entities import EntityLookup, entity_store, lookup_id
+from error_handling import (
+    deadline_exceeded_exception_handler,
+    http_exception_handler,
+    enformiongo_exception_handler,
+    rate_limit_exception_handler,
+    upstream_unavailable_exception_handler,
 )
+from exceptions import (
+    APIConnectionError,
+    DeadlineExceededError,
+    InvalidRequestError,
+    RateLimitError,
+    UpstreamUnavailableError,
+)
+from http_client import UpstreamResponse, upstream_pool
+from jobs import CSV, NDJSON, job_runner, read_upload
+from logging_config import log_handler, setup_logging
+from mcp_server import LazyMCP
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, UpstreamTimer, record_cache_hit
+from metrics import record_projection, registry as metrics_registry
+from models import BatchRequest
+from pagination import AllPagesQuery, stream_pages
+from passthrough import PassthroughResponse, RawBody
+from prefetch import prefetcher
+from projection import Projection
+from rate_limit import parse_retry_after, rate_limiter
+from resilience import upstream_resilience
+from response_store import response_store
+from singleflight import upstream_flights
 
 # --- Logging Setup ---
 setup_logging()
 logger = logging.getLogger(__name__)
 
 
-# --- Configuration ---
-def get_settings():
-    return settings
-
-
-# --- Enums ---
-class PersonSearchType(str, Enum):
-    person = "Person"
-    teaser = "Teaser"
-
-
-# --- Validation Dependencies ---
-def validate_contact_enrichment_request(request: ContactEnrichmentRequest):
-    """Dependency to validate that at least two search criteria are provided."""
-    criteria_count = 0
-    # A name counts as one criterion
-    if request.first_name or request.middle_name or request.last_name:
-        criteria_count += 1
-    if request.phone:
-        criteria_count += 1
-    if request.address:
-        criteria_count += 1
-    if request.email:
-        criteria_count += 1
-    
-    if criteria_count < 2:
-        raise HTTPException(
-            status_code=400,
-            detail="Contact Enrichment requires at least two search criteria from: Name, Phone, Address, or Email."
-        )
-    return request
-
-def validate_id_verification_request(request: IdVerificationRequest):
-    """Dependency to validate that at least two ID verification criteria are provided."""
-    criteria_count = 0
-    if request.first_name or request.middle_name or request.last_name:
-        criteria_count += 1
-    if request.phones:
-        criteria_count += 1
-    if request.address_line_1 or request.address_line_2:
-        criteria_count += 1
-    if request.emails:
-        criteria_count += 1
-    if request.ssn:
-        criteria_count +=1
-    
-    if criteria_count < 2:
-        raise HTTPException(
-            status_code=400,
-            detail="ID Verification requires at least two criteria from: SSN, Name, Phone, Address, or Email."
-        )
-    return request
+# Hex digits of the request key exposed as X-Request-Fingerprint
+FINGERPRINT_LENGTH = 16
+# Characters of an upstream error body included in the log record
+ERROR_BODY_LOG_CHARS = 500
 
 
 # --- API Helper Function ---
+async def _post_upstream(
+    plan: DispatchPlan,
+    search_type: str,
+    request_body: dict,
+    headers: Dict[str, str],
+) -> RawBody:
+    """Sends a request to the EnformionGO API and returns the raw response body.
+
+    Every attempt is rate limited and sent with an account from the credential pool;
+    connection errors and 5xx responses are retried (and slow attempts optionally hedged)
+    within the endpoint's total timeout budget. Calls to an upstream URL whose circuit
+    breaker is open fail fast.
+    """
+    settings = plan.settings
+    api_url = plan.api_url
+
+    def post(credentials: Mapping[str, str]):
+        return upstream_pool.post(api_url, json=request_body, headers={**headers, **credentials}, timeout=plan.timeout)
+
+    async def send() -> UpstreamResponse:
+        await rate_limiter.acquire(search_type)
+        return await credential_pool.call(post)
+
+    breaker = circuit_breakers.for_url(api_url) if settings.BREAKER_ENABLED else None
+    if breaker is not None:
+        breaker.before_call()
+    start = time.perf_counter()
+    success = None
+    try:
+        response = await upstream_resilience.call(send, settings, plan.endpoint, plan.total_timeout)
+        success = response.status_code < 500
+    except asyncio.CancelledError:
+        cancellation_stats.upstream_cancelled += 1
+        raise
+    except (httpx.TimeoutException, TimeoutError) as exc:
+        success = False
+        raise APIConnectionError(f"Request to EnformionGO API timed out: {exc!r}")
+    except httpx.RequestError as exc:
+        success = False
+        raise APIConnectionError(f"Error communicating with EnformionGO API: {exc}")
+    finally:
+        if breaker is not None:
+            breaker.record(success, time.perf_counter() - start)
+
+    if response.status_code == 429:
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        rate_limiter.on_throttled(search_type, retry_after)
+        raise RateLimitError(f"EnformionGO API rate limit hit for '{search_type}'.", retry_after=retry_after)
+    if response.status_code >= 300:
+        logger.error(
+            "Invalid request to EnformionGO API. Status: %s, Response: %.*s",
+            response.status_code,
+            ERROR_BODY_LOG_CHARS,
+            response.body,
+        )
+        raise InvalidRequestError("The request to the upstream service failed.")
+    rate_limiter.on_success(search_type)
+    return response.body
+
+
+async def fetch_enformion_api(
+    plan: DispatchPlan,
+    search_type: str,
+    request_body: dict,
+) -> Tuple[RawBody, Dict[str, str]]:
+    """Fetches the raw EnformionGO response body for a request.
+
+    Successful responses are cached per endpoint according to `Settings.CACHE_TTLS`,
+    reported through an `X-Cache` header of HIT, MISS or BYPASS. Identical concurrent
+    requests share a single upstream call and are marked `X-Coalesced: true`. The
+    `X-Request-Fingerprint` header identifies the canonical upstream request. Answers
+    fetched ahead of time by the prefetcher are marked `X-Prefetch: HIT`. With the
+    on-disk response store, answers kept across restarts are marked `X-Response-Store`;
+    a STALE one is served while it is refreshed in the background. The wait for the
+    upstream is bounded by the deadline the client set, if any.
+
+    Returns:
+        The upstream body, still compressed if the upstream compressed it, and the
+        headers describing how it was obtained.
+    """
+    if plan.credentials_error:
+        raise APIConnectionError(plan.credentials_error)
+
+    settings = plan.settings
+    ttl = plan.cache_ttl
+    # Request bodies are canonical (see normalization.py), so equivalent requests share a key.
+    request_key = make_cache_key(plan.api_url, search_type, request_body)
+    fingerprint = request_key[:FINGERPRINT_LENGTH]
+    if ttl > 0:
+        entry = response_cache.get(request_key)
+        if entry is not None:
+            age = int(time.monotonic() - entry.created_at)
+            record_cache_hit(search_type)
+            return entry.value, {"X-Cache": "HIT", "Age": str(age), "X-Request-Fingerprint": fingerprint}
+
+    headers = plan.headers_for(search_type)
+
+    async def fetch() -> RawBody:
+        body = await _post_upstream(plan, search_type, request_body, headers)
+        _remember(plan, request_key, body, ttl)
+        return body
+
+    if ttl > 0:
+        stored = response_store.get(request_key)
+        if stored is not None:
+            age = int(time.time() - stored.created_at)
+            record_cache_hit(search_type)
+            if stored.stale:
+                response_store.revalidate(request_key, functools.partial(_refresh, plan, request_key, fetch))
+            else:
+                response_cache.set(request_key, stored.value, stored.expires_at - time.time(), endpoint=plan.endpoint)
+            status = "STALE" if stored.stale else "HIT"
+            response_headers = {"X-Cache": status, "X-Response-Store": status, "Age": str(age)}
+            return stored.value, {**response_headers, "X-Request-Fingerprint": fingerprint}
+
+    response_headers = {"X-Cache": "MISS" if ttl > 0 else "BYPASS", "X-Request-Fingerprint": fingerprint}
+    with UpstreamTimer(search_type):
+        # A coalesced call keeps running for the other waiters when this one's deadline passes.
+        async with within_deadline():
+            body = None
+            if plan.endpoint in prefetcher.targets:
+                body = await prefetcher.take(plan.endpoint, search_type, request_key)
+            if body is not None:
+                response_headers["X-Prefetch"] = "HIT"
+                _remember(plan, request_key, body, ttl)
+            elif settings.SINGLEFLIGHT_ENABLED:
+                body, shared = await upstream_flights.do(request_key, fetch)
+                if shared:
+                    response_headers["X-Coalesced"] = "true"
+            else:
+                body = await fetch()
+    return body, response_headers
+
+
+def _remember(plan: DispatchPlan, request_key: str, body: RawBody, ttl: float):
+    if ttl > 0:
+        response_cache.set(request_key, body, ttl, endpoint=plan.endpoint)
+        response_store.save(request_key, plan.endpoint, body, ttl)
+
+
+async def _refresh(plan: DispatchPlan, request_key: str, fetch: Callable[[], Awaitable[RawBody]]):
+    # Shares the call with any request that missed the cache for the same key meanwhile.
+    if plan.settings.SINGLEFLIGHT_ENABLED:
+        await upstream_flights.do(request_key, fetch)
+    else:
+        await fetch()
+
+
 async def call_enformion_api(
-    api_url: str, search_type: str, request_body: dict, settings: Settings = Depends(get_settings)
+    plan: DispatchPlan,
+    search_type: str,
+    request_body: dict,
+    projection: Optional[Projection] = None,
+):
+    """Generic helper to call the EnformionGO API.
+
+    With `RESPONSE_PASSTHROUGH` the upstream bytes are forwarded untouched; otherwise the
+    body is parsed and re-serialised. A `projection` is applied to the response only; the
+    cache and the prefetcher always see the full upstream body.
+    """
+    body, response_headers = await fetch_enformion_api(plan, search_type, request_body)
+    response = _respond(plan, body, response_headers, projection)
+    rule = prefetcher.rules.get(plan.endpoint)
+    if rule is not None:
+        response.background = BackgroundTasks()
+        response.background.add_task(_prefetch_follow_ups, rule, body)
+    return response
+
+
+async def _prefetch_follow_ups(rule: PrefetchRule, body: RawBody):
+    """Starts the lookups expected to follow a search response, within the prefetch budget."""
+    target = plans_by_path.get(rule.target)
+    if target is None:
+        return
+    search_type = target.spec.search_type or rule.search_type or prefetcher.search_type_seen(rule.target)
+    if search_type is None:
+        return
+    headers = target.headers_for(search_type)
+    busy = admission_controller.queued > 0 or rate_limiter.queued > 0
+    for entity_id in prefetcher.follow_up_ids(rule, body):
+        try:
+            request_body = target.dump(target.spec.model.model_validate({rule.request_field: entity_id}))
+        except ValidationError:
+            continue
+        key = make_cache_key(target.api_url, search_type, request_body)
+        if (target.cache_ttl > 0 and response_cache.contains(key)) or not prefetcher.wanted(key):
+            continue
+        if not prefetcher.admit(search_type, busy):
+            break
+        prefetcher.start(key, functools.partial(_post_upstream, target, search_type, request_body, headers))
+
+
+def _respond(plan: DispatchPlan, body: RawBody, headers: Dict[str, str], projection: Optional[Projection] = None):
+    if projection is not None:
+        return _project(body, headers, projection)
+    if plan.settings.RESPONSE_PASSTHROUGH:
+        return PassthroughResponse(body, headers=headers)
+    return JSONResponse(body.json(), headers=headers)
+
+
+def _project(body: RawBody, headers: Dict[str, str], projection: Projection) -> PassthroughResponse:
+    """Returns the selected fields of a body, reporting the size before and after."""
+    original = body.decoded()
+    projected = projection.project_bytes(original)
+    record_projection(len(original), len(projected))
+    headers = {**headers, "X-Original-Size": str(len(original)), "X-Projected-Size": str(len(projected))}
+    return PassthroughResponse(RawBody(projected), headers=headers)
+
+
+def _local_response(body: RawBody, headers: Dict[str, str], projection: Optional[Projection]):
+    if projection is not None:
+        return _project(body, headers, projection)
+    return PassthroughResponse(body, headers=headers)
+
+
+async def call_with_prefix_index(
+    plan: DispatchPlan,
+    search_type: str,
+    request_body: dict,
+    projection: Optional[Projection] = None,
+):
+    """Answers an autocomplete request from the local prefix index when possible.
+
+    Inputs extending a prefix whose complete candidate set is indexed are filtered locally
+    (`X-Autocomplete-Index: HIT`); other inputs go upstream and their answers are indexed.
+    """
+    text = request_body.get(plan.spec.prefix_index_field) or ""
+    local = autocomplete_index.lookup(text)
+    if local is not None:
+        fingerprint = make_cache_key(plan.api_url, search_type, request_body)[:FINGERPRINT_LENGTH]
+        headers = {"X-Cache": "HIT", "X-Autocomplete-Index": "HIT", "X-Request-Fingerprint": fingerprint}
+        return _local_response(RawBody(local), headers, projection)
+    body, response_headers = await fetch_enformion_api(plan, search_type, request_body)
+    if response_headers["X-Cache"] != "HIT":
+        autocomplete_index.add(text, body.decoded())
+    response_headers["X-Autocomplete-Index"] = "MISS"
+    return _respond(plan, body, response_headers, projection)
+
+
+async def call_with_entity_store(
+    plan: DispatchPlan,
+    search_type: str,
+    request_body: dict,
+    projection: Optional[Projection] = None,
 ):
-    """Generic helper to call the EnformionGO API."""
-    if not settings.GALAXY_AP_NAME or not settings.GALAXY_AP_PASSWORD:
-        raise APIConnectionError(
-            "API credentials (GALAXY_AP_NAME, GALAXY_AP_PASSWORD) are not configured."
+    """Answers a repeated ID lookup from the entity store while its response is fresh.
+
+    Only plain first-page lookups are answered and stored; the stored upstream body is
+    returned as is with `X-Entity-Store: HIT`.
+    """
+    lookup = plan.spec.entity_lookup
+    entity_id = lookup_id(lookup, request_body)
+    if entity_id is not None:
+        local = entity_store.lookup(lookup, search_type, entity_id)
+        if local is not None:
+            fingerprint = make_cache_key(plan.api_url, search_type, request_body)[:FINGERPRINT_LENGTH]
+            headers = {"X-Cache": "HIT", "X-Entity-Store": "HIT", "X-Request-Fingerprint": fingerprint}
+            return _respond(plan, local, headers, projection)
+    body, response_headers = await fetch_enformion_api(plan, search_type, request_body)
+    response_headers["X-Entity-Store"] = "MISS"
+    response = _respond(plan, body, response_headers, projection)
+    if (
+        entity_id is not None
+        and response_headers["X-Cache"] not in ("HIT", "STALE")
+        and "X-Coalesced" not in response_headers
+    ):
+        response.background = BackgroundTasks()
+        response.background.add_task(_ingest_entity, lookup, search_type, entity_id, body)
+    return response
+
+
+async def _ingest_entity(lookup: EntityLookup, search_type: str, entity_id: str, body: RawBody):
+    # Runs on the event loop once the response is sent, like every other store update.
+    entity_store.ingest(lookup, search_type, entity_id, body)
+
+
+async def stream_batch(
+    plan: DispatchPlan,
+    search_type: str,
+    batch: BatchRequest,
+    projection: Optional[Projection] = None,
+) -> StreamingResponse:
+    """Validates and runs each batch item upstream, streaming results back as NDJSON.
+
+    A `projection` is applied to each item's result.
+    """
+    settings = plan.settings
+    if len(batch.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch may contain at most {settings.BATCH_MAX_ITEMS} items.",
         )
+    model = plan.spec.model
 
-    headers = {
-        "galaxy-ap-name": settings.GALAXY_AP_NAME,
-        "galaxy-ap-password": settings.GALAXY_AP_PASSWORD.get_secret_value(),
-        "galaxy-search-type": search_type,
-        "Content-Type": "application/json",
-    }
+    async def process(item: dict) -> bytes:
+        request_body = plan.dump(model.model_validate(item))
+        body, _ = await fetch_enformion_api(plan, search_type, request_body)
+        if projection is not None:
+            return projection.project_bytes(body.decoded())
+        return body.decoded()
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        try:
-            response = await client.post(api_url, json=request_body, headers=headers)
-            response.raise_for_status()
-        except httpx.TimeoutException as exc:
-            raise APIConnectionError(f"Request to EnformionGO API timed out: {exc}")
-        except httpx.RequestError as exc:
-            raise APIConnectionError(f"Error communicating with EnformionGO API: {exc}")
-        except httpx.HTTPStatusError as exc:
-            logger.error(
-                f"Invalid request to EnformionGO API. Status: {exc.response.status_code}, Response: {exc.response.text}"
-            )
-            raise InvalidRequestError("The request to the upstream service failed.")
-    return response.json()
+    return StreamingResponse(
+        run_batch(batch.items, process, settings.BATCH_CONCURRENCY), media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+async def stream_all_pages(
+    plan: DispatchPlan,
+    search_type: str,
+    request_body: dict,
+    paging: AllPagesQuery,
+    projection: Optional[Projection] = None,
+) -> StreamingResponse:
+    """Fetches every page of a paged endpoint, streaming the records back as NDJSON.
+
+    The first page is fetched up front, so its errors are returned as usual. Field paths
+    of a `projection` are relative to each page, as for single-page requests.
+    """
+    settings = plan.settings
+    max_records = min(paging.max_records or settings.PAGINATION_MAX_RECORDS, settings.PAGINATION_MAX_RECORDS)
+    first_page = request_body.get("Page") or 1
+
+    async def fetch_page(page: int) -> dict:
+        body, _ = await fetch_enformion_api(plan, search_type, {**request_body, "Page": page})
+        return body.json()
+
+    first = await fetch_page(first_page)
+    return StreamingResponse(
+        stream_pages(
+            first,
+            fetch_page,
+            first_page,
+            request_body.get("ResultsPerPage"),
+            max_records,
+            settings.PAGINATION_CONCURRENCY,
+            projection.apply if projection is not None else None,
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
+async def dispatch(
+    plan: DispatchPlan,
+    search_type: str,
+    payload: Any,
+    paging: Optional[AllPagesQuery],
+    projection: Optional[Projection] = None,
+):
+    """Runs a request against its endpoint's dispatch plan."""
+    if plan.spec.batch:
+        return await stream_batch(plan, search_type, payload, projection)
+    request_body = plan.dump(payload)
+    if paging is not None and paging.all_pages:
+        return await stream_all_pages(plan, search_type, request_body, paging, projection)
+    if plan.spec.prefix_index_field and plan.settings.AUTOCOMPLETE_INDEX_ENABLED:
+        return await call_with_prefix_index(plan, search_type, request_body, projection)
+    if plan.spec.entity_lookup and plan.settings.ENTITY_STORE_ENABLED:
+        return await call_with_entity_store(plan, search_type, request_body, projection)
+    return await call_enformion_api(plan, search_type, request_body, projection)
+
+
+async def process_job_row(endpoint: str, row: Any) -> bytes:
+    """Validates one row of a bulk job like a request to `endpoint` and sends it upstream."""
+    plan = plans_by_path[endpoint]
+    spec = plan.spec
+    search_request = spec.model.model_validate(row)
+    if spec.validator is not None:
+        spec.validator(search_request)
+    search_type = spec.search_type
+    if search_type is None:
+        search_type = getattr(spec.search_type_header.default, "value", spec.search_type_header.default)
+    body, _ = await fetch_enformion_api(plan, search_type, plan.dump(search_request))
+    return body.decoded()
+
+
+# --- Lifespan ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Opens the upstream connection pool and the response store, resumes bulk jobs and builds the MCP server."""
+    await upstream_pool.start(settings)
+    await job_runner.start(settings, process_job_row)
+    if settings.RESPONSE_STORE_ENABLED:
+        response_store.open(settings.RESPONSE_STORE_PATH)
+    prebuild = asyncio.create_task(mcp.prebuild())
+    try:
+        yield
+    finally:
+        await prebuild
+        await prefetcher.aclose()
+        await response_store.aclose()
+        await job_runner.aclose()
+        await upstream_pool.aclose()
 
 
 # --- FastAPI Application ---
@@ -127,207 +462,366 @@ app = FastAPI(
     title="EnformionGO API Wrapper",
     description="A wrapper for the EnformionGO API Endpoints. With a Twist, MCP-enabled using FastMCP.",
     version="1.7.0",
+    lifespan=lifespan,
 )
 
-mcp = FastApiMCP(
+# Mounted at /mcp; the server itself is built after startup (see mcp_server.py)
+mcp = LazyMCP(
     app,
+    settings,
     name="EnformionGO MCPServer",
     description="EnformionGO API Wrapped using FastAPI & converted into an http MCPServer using FastApiMCP **NOTE** This is a Bring your own API KEY tool which can be obtainedfrom http://api.enformiongo.com",
+    exclude_tags=["Admin", "Jobs"],
+    headers=["authorization", settings.REQUEST_TIMEOUT_HEADER],
 )
 
-mcp.mount_http()
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=admission_controller,
+        client_header=settings.ADMISSION_CLIENT_HEADER,
+    )
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(
+    DeadlineMiddleware,
+    header=settings.REQUEST_TIMEOUT_HEADER,
+    cancel_on_disconnect=settings.CANCEL_ON_DISCONNECT,
+)
 
 # --- Exception Handlers ---
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(APIConnectionError, enformiongo_exception_handler)
 app.add_exception_handler(InvalidRequestError, enformiongo_exception_handler)
+app.add_exception_handler(RateLimitError, rate_limit_exception_handler)
+app.add_exception_handler(UpstreamUnavailableError, upstream_unavailable_exception_handler)
+app.add_exception_handler(DeadlineExceededError, deadline_exceeded_exception_handler)
 
 
 # --- Endpoints ---
-
-# --- Dev APIs (Single Result) Endpoints ---
-@app.post("/contact-enrichment", tags=["Dev APIs (Single Result)"])
-async def contact_enrichment(
-    search_request: ContactEnrichmentRequest = Depends(validate_contact_enrichment_request),
-    settings: Settings = Depends(get_settings),
-):
-    """Performs a contact enrichment search. Requires at least two criteria."""
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(
-        settings.CONTACT_ENRICHMENT_API_URL, "DevAPIContactEnrich", request_body, settings
+# The proxied endpoints are declared in `endpoints.ENDPOINTS`; one handler is generated per
+# compiled dispatch plan.
+plans_by_path: Dict[str, DispatchPlan] = {}
+for plan in compile_plans(settings):
+    app.add_api_route(
+        plan.spec.path, build_handler(plan, dispatch), methods=["POST"], tags=[plan.spec.tag]
     )
-
-@app.post("/caller-id", tags=["Dev APIs (Single Result)"])
-async def caller_id(search_request: CallerIdRequest, settings: Settings = Depends(get_settings)):
-    """Retrieves information associated with a provided phone number."""
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(settings.CALLER_ID_API_URL, "DevAPICallerID", request_body, settings)
-
-@app.post("/email-id", tags=["Dev APIs (Single Result)"])
-async def email_id(search_request: EmailIdRequest, settings: Settings = Depends(get_settings)):
-    """Retrieves information associated with a provided email address."""
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(settings.EMAIL_ID_API_URL, "DevAPIEmailID", request_body, settings)
-
-@app.post("/contact-id", tags=["Dev APIs (Single Result)"])
-async def contact_id(search_request: ContactIdRequest, settings: Settings = Depends(get_settings)):
-    """Searches for contact information using a unique person ID."""
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(settings.CONTACT_ID_API_URL, "DevAPIContactID", request_body, settings)
-
-@app.post("/address-id", tags=["Dev APIs (Single Result)"])
-async def address_id(search_request: AddressIdRequest, settings: Settings = Depends(get_settings)):
-    """Finds contact info for current owners or residents of a property."""
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(settings.ADDRESS_ID_API_URL, "DevAPIAddressID", request_body, settings)
-
-@app.post("/address-autocomplete", tags=["Dev APIs (Single Result)"])
-async def address_autocomplete(
-    search_request: AddressAutoCompleteRequest, settings: Settings = Depends(get_settings)
-):
-    """Provides address autocomplete functionality."""
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(
-        settings.ADDRESS_AUTOCOMPLETE_API_URL, "DevAPIAddressAutoComplete", request_body, settings
-    )
-
-# --- People Data Endpoints ---
-@app.post("/person-search", tags=["People Data"])
-async def person_search(
-    search_request: PersonSearchRequest,
-    settings: Settings = Depends(get_settings),
-    galaxy_search_type: PersonSearchType = Header(PersonSearchType.person, description="Search type."),
-):
-    """Performs a person search by proxying the request to the EnformionGO API."""
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(
-        settings.PERSON_SEARCH_API_URL, galaxy_search_type.value, request_body, settings
-    )
-
-@app.post("/reverse-phone-search", tags=["People Data"])
-async def reverse_phone_search(
-    search_request: ReversePhoneSearchRequest, settings: Settings = Depends(get_settings)
-):
-    """Performs a reverse phone search by proxying the request to the EnformionGO API."""
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(settings.REVERSE_PHONE_API_URL, "ReversePhone", request_body, settings)
-
-@app.post("/id-verification", tags=["People Data"])
-async def id_verification(
-    search_request: IdVerificationRequest = Depends(validate_id_verification_request),
-    settings: Settings = Depends(get_settings),
+    plans_by_path[plan.spec.path] = plan
+
+
+# --- Bulk Jobs ---
+@app.post("/jobs", tags=["Jobs"], status_code=202)
+async def submit_job(
+    request: Request,
+    endpoint: str = Query(..., description="The endpoint each row is sent to, e.g. /contact-enrichment."),
+    format: Optional[str] = Query(
+        None,
+        pattern=f"^({CSV}|{NDJSON})$",
+        description="Format of the request body; defaults to csv for a text/csv body, otherwise ndjson.",
+    ),
 ):
-    """Provides an identity score and verification flag. Requires at least two criteria."""
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(
-        settings.ID_VERIFICATION_API_URL, "DevAPIIDVerification", request_body, settings
-    )
+    """Submits a CSV or NDJSON file as a bulk job; each row is one request body for `endpoint`.
 
-@app.post("/census-search", tags=["People Data"])
-async def census_search(search_request: CensusSearchRequest, settings: Settings = Depends(get_settings)):
-    """Searches historical population data."""
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(settings.CENSUS_SEARCH_API_URL, "Census", request_body, settings)
-
-@app.post("/divorce-search", tags=["People Data"])
-async def divorce_search(search_request: DivorceSearchRequest, settings: Settings = Depends(get_settings)):
-    """Searches for divorce records."""
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(settings.DIVORCE_SEARCH_API_URL, "Divorce", request_body, settings)
-
-@app.post("/linkedin-id", tags=["People Data"])
-async def linkedin_id(search_request: LinkedInIdRequest, settings: Settings = Depends(get_settings)):
-    """Searches by a LinkedIn profile URL."""
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(settings.LINKEDIN_ID_API_URL, "LinkedinID", request_body, settings)
-
-
-# --- Property Data Endpoints ---
-@app.post("/property-search-v2", tags=["Property Data"])
-async def property_search_v2(
-    search_request: PropertySearchV2Request,
-    settings: Settings = Depends(get_settings),
-    galaxy_search_type: str = Header(..., description="The galaxy-search-type for Property Search V2."),
-):
+    CSV headers name the request fields (dotted headers such as `Address.addressLine1`
+    build nested objects). Poll `GET /jobs/{job_id}` for progress.
     """
-    Searches for property data.
+    if format is None:
+        format = CSV if request.headers.get("content-type", "").startswith("text/csv") else NDJSON
+    content = await read_upload(request, settings.JOBS_MAX_UPLOAD_BYTES)
+    return await job_runner.submit(endpoint, format, content)
+
+@app.get("/jobs", tags=["Jobs"])
+async def list_jobs():
+    """Lists bulk jobs with their progress, newest first."""
+    return job_runner.jobs()
+
+@app.get("/jobs/{job_id}", tags=["Jobs"])
+async def job_status(job_id: str):
+    """Reports a bulk job's status and how many rows have completed, succeeded and failed."""
+    return job_runner.job(job_id)
+
+@app.get("/jobs/{job_id}/results", tags=["Jobs"])
+async def job_results(job_id: str):
+    """Streams the completed rows of a bulk job as NDJSON in row order.
+
+    Each line holds the row `index`, a `status`, and either the upstream `result` or an
+    `error`. Available while the job runs; rows still pending are not included.
     """
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(
-        settings.PROPERTY_SEARCH_V2_API_URL, galaxy_search_type, request_body, settings
-    )
+    job_runner.job(job_id)
+    return StreamingResponse(job_runner.results(job_id), media_type=NDJSON_MEDIA_TYPE)
 
-# --- Business Data Endpoints ---
-@app.post("/business-search", tags=["Business Data"])
-async def business_search(
-    search_request: BusinessSearchRequest, settings: Settings = Depends(get_settings)
-):
-    """
-    Searches for business data using various criteria.
-    """
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(settings.BUSINESS_SEARCH_V2_API_URL, "Business", request_body, settings)
-
-@app.post("/business-search-v2", tags=["Business Data"])
-async def business_search_v2(
-    search_request: BusinessSearchRequest,
-    settings: Settings = Depends(get_settings),
-    galaxy_search_type: str = Header(..., description="The galaxy-search-type for Business Search V2."),
-):
-    """
-    Searches for business data using various criteria.
-    """
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(
-        settings.BUSINESS_SEARCH_V2_API_URL, galaxy_search_type, request_body, settings
-    )
-
-@app.post("/domain-search", tags=["Business Data"])
-async def domain_search(
-    search_request: DomainSearchRequest,
-    settings: Settings = Depends(get_settings),
-    galaxy_search_type: str = Header(..., description="The galaxy-search-type for Domain Search."),
-):
-    """
-    Searches for domain data.
-    """
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(settings.DOMAIN_SEARCH_API_URL, galaxy_search_type, request_body, settings)
-
-@app.post("/workplace-search", tags=["Business Data"])
-async def workplace_search(
-    search_request: WorkplaceSearchRequest,
-    settings: Settings = Depends(get_settings),
-    galaxy_search_type: str = Header(..., description="The galaxy-search-type for Workplace Search."),
-):
-    """
-    Searches for workplace data.
-    """
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(
-        settings.WORKPLACE_SEARCH_API_URL, galaxy_search_type, request_body, settings
-    )
-
-@app.post("/business-id", tags=["Business Data"])
-async def business_id(
-    search_request: BusinessIDRequest,
-    settings: Settings = Depends(get_settings),
-    galaxy_search_type: str = Header(..., description="The galaxy-search-type for Business ID Search."),
-):
-    """
-    Searches by business ID.
-    """
-    request_body = search_request.model_dump(by_alias=True, exclude_none=True)
-    return await call_enformion_api(settings.BUSINESS_ID_API_URL, galaxy_search_type, request_body, settings)
+@app.delete("/jobs/{job_id}", tags=["Jobs"])
+async def cancel_job(job_id: str):
+    """Cancels an unfinished bulk job; completed rows keep their results."""
+    return job_runner.cancel(job_id)
 
 
 @app.get("/health", tags=["Health"])
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "ok"}
+    """Health check endpoint, including the state of each upstream circuit breaker."""
+    return {
+        "status": "degraded" if circuit_breakers.any_open() else "ok",
+        "circuit_breakers": circuit_breakers.snapshot(),
+    }
+
+
+# --- Admin Endpoints ---
+@app.get("/admin/upstream-pool", tags=["Admin"])
+async def upstream_pool_stats():
+    """Reports upstream connection pool occupancy and connection wait times."""
+    return upstream_pool.snapshot()
+
+@app.get("/admin/singleflight", tags=["Admin"])
+async def singleflight_stats():
+    """Reports how many upstream calls were saved by coalescing identical requests."""
+    return upstream_flights.stats()
+
+@app.get("/admin/rate-limiter", tags=["Admin"])
+async def rate_limiter_stats():
+    """Reports upstream rate limiter queue depth, wait times and bucket states."""
+    return rate_limiter.stats()
+
+@app.get("/admin/resilience", tags=["Admin"])
+async def resilience_stats():
+    """Reports upstream retry and hedging counters and recent per-endpoint latencies."""
+    return upstream_resilience.stats()
+
+@app.get("/admin/cache", tags=["Admin"])
+async def cache_stats():
+    """Reports response cache occupancy, hit ratio and per-endpoint usage."""
+    return response_cache.stats()
+
+@app.get("/admin/autocomplete-index", tags=["Admin"])
+async def autocomplete_index_stats():
+    """Reports how many autocomplete keystrokes the local prefix index answered."""
+    return autocomplete_index.stats()
+
+@app.get("/admin/entity-store", tags=["Admin"])
+async def entity_store_stats():
+    """Reports entity store occupancy and how many upstream ID lookups it avoided."""
+    return entity_store.stats()
+
+@app.get("/admin/jobs", tags=["Admin"])
+async def jobs_stats():
+    """Reports the bulk job runner's configuration and job counts by status."""
+    return job_runner.stats()
+
+@app.get("/admin/logging", tags=["Admin"])
+async def logging_stats():
+    """Reports the log writer's queue depth and the records dropped or suppressed as repetitive."""
+    return log_handler.stats()
+
+@app.get("/admin/admission", tags=["Admin"])
+async def admission_stats():
+    """Reports requests in flight and queued for admission, wait times and shed requests."""
+    return admission_controller.stats()
+
+@app.get("/admin/deadlines", tags=["Admin"])
+async def deadline_stats():
+    """Reports requests past their deadline, client disconnects and the upstream calls cancelled."""
+    return cancellation_stats.as_dict()
+
+@app.get("/admin/response-store", tags=["Admin"])
+async def response_store_stats():
+    """Reports hits, stale answers served, refreshes and the size of the on-disk response store."""
+    return response_store.stats()
+
+@app.get("/admin/prefetch", tags=["Admin"])
+async def prefetch_stats():
+    """Reports prefetches sent, skipped and failed, and how many follow-up calls they answered."""
+    return prefetcher.stats()
+
+@app.get("/admin/credentials", tags=["Admin"])
+async def credentials_stats():
+    """Reports per-account usage, latency and health of the upstream credential pool."""
+    return credential_pool.stats()
+
+@app.delete("/admin/cache", tags=["Admin"])
+async def cache_purge(
+    endpoint: Optional[str] = Query(None, description="Only purge entries for this endpoint, e.g. /caller-id."),
+):
+    """Purges the response cache and the on-disk response store, entirely or for a single endpoint."""
+    purged = {"purged": response_cache.purge(endpoint)}
+    if response_store.active:
+        purged["purged_from_store"] = await response_store.purge(endpoint)
+    return purged
+
+
+# --- Metrics ---
+_BREAKER_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+metrics_registry.callback(
+    "enformion_cache_lookups_total",
+    "Response cache lookups by result.",
+    ("result",),
+    lambda: [(("hit",), response_cache.hits), (("miss",), response_cache.misses)],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_cache_entries", "Responses held in the cache.", (), lambda: [((), len(response_cache))]
+)
+metrics_registry.callback(
+    "enformion_cache_bytes", "Size of the responses held in the cache.", (), lambda: [((), response_cache.total_bytes)]
+)
+metrics_registry.callback(
+    "enformion_autocomplete_index_lookups_total",
+    "Autocomplete prefix index lookups by result.",
+    ("result",),
+    lambda: [
+        (("hit",), autocomplete_index.hits),
+        (("miss",), autocomplete_index.lookups - autocomplete_index.hits),
+    ],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_entity_store_upstream_calls_avoided_total",
+    "ID lookups answered from records seen in search results.",
+    (),
+    lambda: [((), entity_store.hits)],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_singleflight_coalesced_total",
+    "Requests that shared another request's upstream call.",
+    (),
+    lambda: [((), upstream_flights.coalesced)],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_rate_limiter_queued", "Upstream calls waiting for rate limiter tokens.", (), lambda: [((), rate_limiter.queued)]
+)
+metrics_registry.callback(
+    "enformion_upstream_pool_in_flight",
+    "Requests holding or waiting for an upstream connection.",
+    (),
+    lambda: [((), upstream_pool.stats.in_flight)],
+)
+metrics_registry.callback(
+    "enformion_log_records_discarded_total",
+    "Log records not written, by reason (queue_full or sampled).",
+    ("reason",),
+    lambda: [(("queue_full",), log_handler.pipeline.dropped), (("sampled",), log_handler.suppressed)],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_admission_in_flight",
+    "Requests admitted and being processed.",
+    (),
+    lambda: [((), admission_controller.in_flight)],
+)
+metrics_registry.callback(
+    "enformion_admission_queued",
+    "Requests waiting for admission by class (rest or mcp).",
+    ("class",),
+    lambda: [((name,), count) for name, count in admission_controller.stats()["queued_by_class"].items()],
+)
+metrics_registry.callback(
+    "enformion_admission_shed_total",
+    "Requests answered 503 by admission control, by class and reason.",
+    ("class", "reason"),
+    lambda: list(admission_controller.shed.items()),
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_request_deadline_exceeded_total",
+    "Requests answered 504 because the deadline set by the client passed.",
+    (),
+    lambda: [((), cancellation_stats.deadline_exceeded)],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_client_disconnects_total",
+    "Requests cancelled because the client disconnected before the response was sent.",
+    (),
+    lambda: [((), cancellation_stats.disconnects)],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_upstream_calls_cancelled_total",
+    "Upstream calls cut short by a disconnect, a passed deadline or every coalesced waiter leaving.",
+    (),
+    lambda: [((), cancellation_stats.upstream_cancelled)],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_response_store_lookups_total",
+    "On-disk response store lookups by result (hit, stale or miss).",
+    ("result",),
+    lambda: [
+        (("hit",), response_store.hits),
+        (("stale",), response_store.stale_hits),
+        (("miss",), response_store.misses),
+    ],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_response_store_revalidations_total",
+    "Background refreshes of stale response store entries by result.",
+    ("result",),
+    lambda: [
+        (("started",), response_store.revalidations),
+        (("failed",), response_store.revalidation_failures),
+    ],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_prefetch_requests_total",
+    "Speculative follow-up lookups by outcome (issued, failed, skipped_busy or skipped_budget).",
+    ("result",),
+    lambda: [
+        (("issued",), prefetcher.issued),
+        (("failed",), prefetcher.failed),
+        (("skipped_busy",), prefetcher.skipped_busy),
+        (("skipped_budget",), prefetcher.skipped_budget),
+    ],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_prefetch_lookups_total",
+    "Follow-up lookups by whether a prefetched answer was used.",
+    ("result",),
+    lambda: [(("hit",), prefetcher.hits), (("miss",), prefetcher.misses)],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_credential_requests_total",
+    "Upstream calls per pooled account.",
+    ("account",),
+    lambda: [((account.name,), account.requests) for account in credential_pool.accounts],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_credential_upstream_seconds_total",
+    "Upstream time of the finished calls per pooled account.",
+    ("account",),
+    lambda: [((account.name,), account.latency_total) for account in credential_pool.accounts],
+    kind="counter",
+)
+metrics_registry.callback(
+    "enformion_credential_in_flight",
+    "Upstream calls in flight per pooled account.",
+    ("account",),
+    lambda: [((account.name,), account.in_flight) for account in credential_pool.accounts],
+)
+metrics_registry.callback(
+    "enformion_credential_sidelined",
+    "Whether a pooled account is sidelined after auth or quota errors (1) or healthy (0).",
+    ("account",),
+    lambda: [((name,), int(not data["healthy"])) for name, data in credential_pool.stats()["accounts"].items()],
+)
+metrics_registry.callback(
+    "enformion_circuit_breaker_state",
+    "Circuit breaker state per upstream URL (0 closed, 1 half-open, 2 open).",
+    ("upstream",),
+    lambda: [((url,), _BREAKER_STATE_VALUES[data["state"]]) for url, data in circuit_breakers.snapshot().items()],
+)
+
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Serves request, upstream and component metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
 
-mcp.setup_server()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,201 @@
+"""The app's MCP server, created on first use from a schema cached on disk.
+
+Importing fastapi-mcp (and the MCP SDK under it), generating the OpenAPI schema and
+converting it into tools take a large share of the app's startup time, and REST clients
+need none of it. `LazyMCP` therefore registers the /mcp route at import time but creates
+the `FastApiMCP` server only when it is first needed: in a background thread once the app
+is serving, or by the first MCP request if that comes sooner.
+
+The OpenAPI schema and the converted tools are stored in `SCHEMA_CACHE_PATH`, keyed by
+the app's title and version, the versions of the libraries generating them and a digest
+of the source files, so restarted workers and new replicas load them instead of
+regenerating them. `python -m mcp_server` writes the file ahead of time, e.g. while
+building an image.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from importlib import metadata
+from types import FunctionType
+from typing import Any, Dict, Optional
+
+import fastapi
+import httpx
+import pydantic
+from fastapi import FastAPI, Request
+
+logger = logging.getLogger(__name__)
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Client address of the requests tool calls dispatch into the app, so they can be told
+# apart from requests arriving over the network.
+TOOL_CALL_CLIENT = ("mcp-tool-call", 0)
+
+
+def schema_key(app: FastAPI, fastapi_mcp_version: str) -> str:
+    """Returns a digest of everything the generated schema depends on."""
+    digest = hashlib.sha256()
+    for part in (
+        app.title,
+        app.version,
+        app.openapi_version,
+        fastapi.__version__,
+        pydantic.VERSION,
+        fastapi_mcp_version,
+        metadata.version("mcp"),
+    ):
+        digest.update(part.encode() + b"\0")
+    for name in sorted(os.listdir(SOURCE_DIR)):
+        if name.endswith(".py"):
+            with open(os.path.join(SOURCE_DIR, name), "rb") as handle:
+                digest.update(name.encode() + b"\0" + handle.read())
+    return digest.hexdigest()
+
+
+def read_schema_cache(path: str, key: str) -> Optional[Dict[str, Any]]:
+    """Returns the cached schema entry if the file exists and matches `key`."""
+    if not path:
+        return None
+    try:
+        with open(path, "rb") as handle:
+            entry = json.load(handle)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable schema cache %s: %s", path, e)
+        return None
+    return entry if isinstance(entry, dict) and entry.get("key") == key else None
+
+
+def write_schema_cache(path: str, entry: Dict[str, Any]):
+    """Atomically replaces the schema cache file; failures only cost the next start time."""
+    if not path:
+        return
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "w") as handle:
+            json.dump(entry, handle, separators=(",", ":"))
+        os.replace(temporary, path)
+    except OSError as e:
+        logger.warning("Could not write schema cache %s: %s", path, e)
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+class LazyMCP:
+    """A `FastApiMCP` server for `app`, mounted at `path` and built on first use."""
+
+    def __init__(self, app: FastAPI, settings, path: str = "/mcp", **options):
+        """Registers the MCP route; `options` are passed on to `FastApiMCP`."""
+        self.app = app
+        self.settings = settings
+        self._options = options
+        self._server = None
+        self._transport = None
+        self._lock = threading.Lock()
+        app.add_api_route(
+            path,
+            self._handle,
+            methods=["GET", "POST", "DELETE"],
+            include_in_schema=False,
+            operation_id="mcp_http",
+        )
+
+    @property
+    def tools(self):
+        """The MCP tools, building the server if needed."""
+        return self.get().tools
+
+    @property
+    def operation_map(self) -> Dict[str, Dict[str, Any]]:
+        """Maps tool names to the operations they call, building the server if needed."""
+        return self.get().operation_map
+
+    def get(self):
+        """Returns the `FastApiMCP` server, building it on the first call."""
+        if self._server is None:
+            with self._lock:
+                if self._server is None:
+                    self._server = self._build()
+        return self._server
+
+    async def prebuild(self):
+        """Builds the server in a worker thread, off the event loop; errors are logged only."""
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.get)
+        except Exception:
+            logger.exception("Could not build the MCP server; retrying on the first MCP request")
+
+    async def _handle(self, request: Request):
+        """Serves the streamable HTTP transport of the MCP server."""
+        if self._server is None:
+            await asyncio.get_running_loop().run_in_executor(None, self.get)
+        return await self._transport.handle_fastapi_request(request)
+
+    def _build(self):
+        """Creates the server, loading the schema and tools from the cache when it is current."""
+        import fastapi_mcp
+        from fastapi_mcp import FastApiMCP
+        from fastapi_mcp.transport.http import FastApiHttpSessionManager
+        from mcp import types
+
+        path = self.settings.SCHEMA_CACHE_PATH
+        key = schema_key(self.app, fastapi_mcp.__version__)
+        entry = read_schema_cache(path, key)
+        if entry is not None:
+            self.app.openapi_schema = entry["openapi"]
+        convert = FastApiMCP.setup_server.__globals__["convert_openapi_to_mcp_tools"]
+
+        def cached_openapi(**_):
+            return self.app.openapi()
+
+        def cached_convert(openapi_schema, **options):
+            nonlocal entry
+            if entry is not None:
+                return [types.Tool.model_validate(tool) for tool in entry["tools"]], entry["operation_map"]
+            tools, operation_map = convert(openapi_schema, **options)
+            entry = {
+                "key": key,
+                "openapi": openapi_schema,
+                "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+                "operation_map": operation_map,
+            }
+            write_schema_cache(path, entry)
+            return tools, operation_map
+
+        # FastApiMCP.setup_server generates the schema through its module's functions. Run it
+        # against a private copy of that module's namespace that routes them through the app's
+        # memoised schema and the cache, so the shared module is never patched.
+        setup = FastApiMCP.setup_server
+        namespace = {**setup.__globals__, "get_openapi": cached_openapi, "convert_openapi_to_mcp_tools": cached_convert}
+        cached_setup = FunctionType(setup.__code__, namespace, setup.__name__, setup.__defaults__, setup.__closure__)
+
+        class CachedFastApiMCP(FastApiMCP):
+            def setup_server(self):
+                cached_setup(self)
+
+        server = CachedFastApiMCP(
+            self.app,
+            http_client=httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=self.app, raise_app_exceptions=False, client=TOOL_CALL_CLIENT),
+                base_url="http://apiserver",
+                timeout=self.settings.MCP_TOOL_TIMEOUT,
+            ),
+            **self._options,
+        )
+        self._transport = FastApiHttpSessionManager(mcp_server=server.server)
+        logger.info("MCP server ready with %d tools", len(server.tools))
+        return server
+
+
+if __name__ == "__main__":
+    from main import mcp
+
+    mcp.get()
+    print(f"Wrote {mcp.settings.SCHEMA_CACHE_PATH} with {len(mcp.tools)} tools")
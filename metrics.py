@@ -0,0 +1,302 @@
+"""Prometheus metrics for the EnformionGO API wrapper.
+
+Metrics are kept in plain dicts without locks: everything runs on one event loop per
+worker, so recording a sample costs a couple of dict operations and a bisect.
+"""
+
+import asyncio
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# Status recorded for requests cancelled because the client went away (as nginx logs them)
+CLIENT_CLOSED_REQUEST = 499
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """A monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        """Initializes the counter."""
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0):
+        """Increments the counter for `labels`."""
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    """A value that can go up and down per label set."""
+
+    kind = "gauge"
+
+    def dec(self, labels: LabelValues = (), amount: float = 1.0):
+        """Decrements the gauge for `labels`."""
+        self._values[labels] = self._values.get(labels, 0.0) - amount
+
+    def set(self, labels: LabelValues, value: float):
+        """Sets the gauge for `labels`."""
+        self._values[labels] = value
+
+
+class CallbackMetric:
+    """A counter or gauge whose samples are read from a callback at scrape time.
+
+    Used to expose state that components already keep, so the hot path pays nothing.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Iterable[Tuple[LabelValues, float]]],
+        kind: str = "gauge",
+    ):
+        """Initializes the metric."""
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+        self._callback = callback
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self._callback()
+        ]
+
+
+class Histogram:
+    """Observations counted into fixed buckets per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        """Initializes the histogram."""
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [per-bucket counts (last slot is +Inf), sum]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, labels: LabelValues, value: float):
+        """Records one observation for `labels`."""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        """Initializes an empty registry."""
+        self._metrics: list = []
+
+    def register(self, metric):
+        """Adds a metric and returns it."""
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def callback(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Iterable[Tuple[LabelValues, float]]],
+        kind: str = "gauge",
+    ) -> CallbackMetric:
+        return self.register(CallbackMetric(name, help, labelnames, callback, kind))
+
+    def render(self) -> str:
+        """Returns the exposition text for all metrics."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "enformion_http_requests_total", "Requests handled, by route, method and status class.", ("route", "method", "status")
+)
+http_duration = registry.histogram(
+    "enformion_http_request_duration_seconds", "End-to-end request latency by route.", ("route",)
+)
+http_overhead = registry.histogram(
+    "enformion_http_overhead_duration_seconds",
+    "Request latency spent locally (validation, model_dump, serialisation), i.e. excluding upstream waits.",
+    ("route",),
+)
+http_in_flight = registry.gauge("enformion_http_requests_in_flight", "Requests currently being handled.")
+http_response_size = registry.histogram(
+    "enformion_http_response_size_bytes", "Response body sizes by route.", ("route",), SIZE_BUCKETS
+)
+upstream_requests = registry.counter(
+    "enformion_upstream_requests_total",
+    "Upstream lookups by search type and outcome (ok, error, cache_hit).",
+    ("search_type", "outcome"),
+)
+upstream_duration = registry.histogram(
+    "enformion_upstream_duration_seconds", "Time spent waiting for upstream results by search type.", ("search_type",)
+)
+upstream_in_flight = registry.gauge(
+    "enformion_upstream_requests_in_flight", "Upstream lookups currently awaited.", ("search_type",)
+)
+projection_bytes = registry.counter(
+    "enformion_projection_bytes_total",
+    "Bytes of projected responses before and after the `fields` selection.",
+    ("size",),
+)
+
+# Upstream seconds accumulated by the current request, used to split out local overhead.
+_upstream_seconds: ContextVar[Optional[list]] = ContextVar("upstream_seconds", default=None)
+
+
+class UpstreamTimer:
+    """Context manager timing one upstream wait for a search type."""
+
+    __slots__ = ("search_type", "start", "outcome")
+
+    def __init__(self, search_type: str):
+        self.search_type = search_type
+        self.outcome = "ok"
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        upstream_in_flight.inc((self.search_type,))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        upstream_in_flight.dec((self.search_type,))
+        if exc_type is not None:
+            self.outcome = "error"
+        upstream_requests.inc((self.search_type, self.outcome))
+        upstream_duration.observe((self.search_type,), elapsed)
+        accumulator = _upstream_seconds.get()
+        if accumulator is not None:
+            accumulator[0] += elapsed
+        return False
+
+
+def record_projection(original: int, projected: int):
+    """Counts the response bytes a `fields` projection started from and kept."""
+    projection_bytes.inc(("original",), original)
+    projection_bytes.inc(("projected",), projected)
+
+
+def record_cache_hit(search_type: str):
+    """Counts an upstream lookup answered locally."""
+    upstream_requests.inc((search_type, "cache_hit"))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request metrics."""
+
+    def __init__(self, app: ASGIApp):
+        """Wraps `app`."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        accumulator = [0.0]
+        token = _upstream_seconds.set(accumulator)
+        status = 500
+        size = 0
+        http_in_flight.inc()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except asyncio.CancelledError:
+            status = CLIENT_CLOSED_REQUEST
+            raise
+        finally:
+            _upstream_seconds.reset(token)
+            http_in_flight.dec()
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            label = (getattr(route, "path", None) or "unmatched",)
+            http_requests.inc((label[0], scope["method"], f"{status // 100}xx"))
+            http_duration.observe(label, elapsed)
+            http_overhead.observe(label, max(0.0, elapsed - accumulator[0]))
+            http_response_size.observe(label, size)
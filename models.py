@@ -2,15 +2,17 @@
 Pydantic models for the EnformionGO API Wrapper
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field, model_validator
 
+from normalization import AddressText, Email, EmailList, Phone, PhoneList
+
 
 class Address(BaseModel):
     """Represents an address for the person search."""
-    address_line_1: Optional[str] = Field(None, alias="addressLine1")
-    address_line_2: Optional[str] = Field(None, alias="addressLine2")
-    county: Optional[str] = Field(None, alias="County")
+    address_line_1: Optional[AddressText] = Field(None, alias="addressLine1")
+    address_line_2: Optional[AddressText] = Field(None, alias="addressLine2")
+    county: Optional[AddressText] = Field(None, alias="County")
 
 class Name(BaseModel):
     """Represents a name, used for AKAs and relatives."""
@@ -31,9 +33,9 @@ class PersonSearchRequest(BaseModel):
     age_range: Optional[str] = Field(None, alias="AgeRange")
     ssn: Optional[str] = Field(None, alias="Ssn")
     addresses: Optional[List[Address]] = Field(None, alias="Addresses")
-    email: Optional[str] = Field(None, alias="Email")
+    email: Optional[Email] = Field(None, alias="Email")
     client_ip: Optional[str] = Field(None, alias="ClientIp")
-    phone: Optional[str] = Field(None, alias="Phone")
+    phone: Optional[Phone] = Field(None, alias="Phone")
     relatives: Optional[List[Name]] = Field(None, alias="Relatives")
     tahoe_ids: Optional[List[str]] = Field(None, alias="TahoeIds")
     first_name_char_offset: Optional[int] = Field(None, alias="FirstNameCharOffset")
@@ -48,8 +50,8 @@ class PersonSearchRequest(BaseModel):
 
 class ContactEnrichmentAddress(BaseModel):
     """Represents an address specifically for Contact Enrichment."""
-    address_line_1: Optional[str] = Field(None, alias="addressLine1")
-    address_line_2: Optional[str] = Field(None, alias="addressLine2")
+    address_line_1: Optional[AddressText] = Field(None, alias="addressLine1")
+    address_line_2: Optional[AddressText] = Field(None, alias="addressLine2")
 
 class ContactEnrichmentRequest(BaseModel):
     """Defines the request body for the Contact Enrichment API."""
@@ -59,8 +61,8 @@ class ContactEnrichmentRequest(BaseModel):
     dob: Optional[str] = Field(None, alias="Dob")
     age: Optional[int] = Field(None, alias="Age")
     address: Optional[ContactEnrichmentAddress] = Field(None, alias="Address")
-    phone: Optional[str] = Field(None, alias="Phone")
-    email: Optional[str] = Field(None, alias="Email")
+    phone: Optional[Phone] = Field(None, alias="Phone")
+    email: Optional[Email] = Field(None, alias="Email")
 
     class Config:
         """Pydantic config to allow population by alias."""
@@ -68,7 +70,7 @@ class ContactEnrichmentRequest(BaseModel):
 
 class ReversePhoneSearchRequest(BaseModel):
     """Defines the request body for the Reverse Phone Search API."""
-    phone: str = Field(..., alias="Phone", description="The phone number to search for (e.g., '123-456-7890').")
+    phone: Phone = Field(..., alias="Phone", description="The phone number to search for (e.g., '123-456-7890').")
     page: Optional[int] = Field(1, alias="Page", description="The page of data to return.")
     results_per_page: Optional[int] = Field(10, alias="ResultsPerPage", description="The number of results to return per page.")
 
@@ -78,14 +80,14 @@ class ReversePhoneSearchRequest(BaseModel):
 
 class CallerIdRequest(BaseModel):
     """Defines the request body for the Caller ID API."""
-    phone: str = Field(..., alias="Phone")
+    phone: Phone = Field(..., alias="Phone")
 
     class Config:
         populate_by_name = True
 
 class EmailIdRequest(BaseModel):
     """Defines the request body for the Email ID API."""
-    email: str = Field(..., alias="Email")
+    email: Email = Field(..., alias="Email")
 
     class Config:
         populate_by_name = True
@@ -99,8 +101,8 @@ class ContactIdRequest(BaseModel):
 
 class AddressIdRequest(BaseModel):
     """Defines the request body for the Address ID API."""
-    address_line_1: str = Field(..., alias="addressLine1")
-    address_line_2: str = Field(..., alias="addressLine2")
+    address_line_1: AddressText = Field(..., alias="addressLine1")
+    address_line_2: AddressText = Field(..., alias="addressLine2")
     exact_match: Optional[str] = Field(None, alias="ExactMatch", description="Can be 'CurrentOwner' or 'CurrentResident'.")
 
     class Config:
@@ -120,20 +122,20 @@ class IdVerificationRequest(BaseModel):
     last_name: Optional[str] = Field(None, alias="LastName")
     dob: Optional[str] = Field(None, alias="Dob")
     age: Optional[int] = Field(None, alias="Age")
-    address_line_1: Optional[str] = Field(None, alias="AddressLine1")
-    address_line_2: Optional[str] = Field(None, alias="AddressLine2")
-    phones: Optional[List[str]] = Field(None, alias="Phones")
-    emails: Optional[List[str]] = Field(None, alias="Emails")
+    address_line_1: Optional[AddressText] = Field(None, alias="AddressLine1")
+    address_line_2: Optional[AddressText] = Field(None, alias="AddressLine2")
+    phones: Optional[PhoneList] = Field(None, alias="Phones")
+    emails: Optional[EmailList] = Field(None, alias="Emails")
     ssn: Optional[str] = Field(None, alias="Ssn")
 
     class Config:
         populate_by_name = True
 
 class CensusAddress(BaseModel):
-    city: Optional[str] = Field(None, alias="City")
-    county: Optional[str] = Field(None, alias="County")
-    state: Optional[str] = Field(None, alias="State")
-    zip_code: Optional[str] = Field(None, alias="ZipCode")
+    city: Optional[AddressText] = Field(None, alias="City")
+    county: Optional[AddressText] = Field(None, alias="County")
+    state: Optional[AddressText] = Field(None, alias="State")
+    zip_code: Optional[AddressText] = Field(None, alias="ZipCode")
 
 class CensusSearchRequest(BaseModel):
     """Defines the request body for the Census Search API."""
@@ -169,9 +171,9 @@ class DivorceSearchRequest(BaseModel):
     spouse_name_suffix: Optional[str] = Field(None, alias="SpouseNameSuffix")
     marriage_date: Optional[str] = Field(None, alias="MarriageDate")
     divorce_date: Optional[str] = Field(None, alias="DivorceDate")
-    city: Optional[str] = Field(None, alias="City")
-    county: Optional[str] = Field(None, alias="County")
-    state: Optional[str] = Field(None, alias="State")
+    city: Optional[AddressText] = Field(None, alias="City")
+    county: Optional[AddressText] = Field(None, alias="County")
+    state: Optional[AddressText] = Field(None, alias="State")
     poseidon_ids: Optional[List[str]] = Field(None, alias="PosiedonIds")
     tahoe_id: Optional[str] = Field(None, alias="TahoeId")
     ssn: Optional[str] = Field(None, alias="SSN")
@@ -199,9 +201,9 @@ class BusinessSearchRequest(BaseModel):
     middle_name: Optional[str] = Field(None, alias="middleName")
     last_name: Optional[str] = Field(None, alias="lastName")
     creditor_name: Optional[str] = Field(None, alias="creditorName")
-    address_line_1: Optional[str] = Field(None, alias="addressLine1")
-    address_line_2: Optional[str] = Field(None, alias="addressLine2")
-    county: Optional[str] = Field(None, alias="county")
+    address_line_1: Optional[AddressText] = Field(None, alias="addressLine1")
+    address_line_2: Optional[AddressText] = Field(None, alias="addressLine2")
+    county: Optional[AddressText] = Field(None, alias="county")
     poseidon_id: Optional[str] = Field(None, alias="poseidonId")
     tahoe_id: Optional[str] = Field(None, alias="tahoeId")
     tax_id: Optional[str] = Field(None, alias="taxId")
@@ -215,13 +217,13 @@ class BusinessSearchRequest(BaseModel):
 
 class PropertySearchV2Request(BaseModel):
     """Defines the request body for the Property Search V2 API."""
-    address_line_1: Optional[str] = Field(None, alias="addressLine1")
-    address_line_2: Optional[str] = Field(None, alias="addressLine2")
-    unit: Optional[str] = Field(None, alias="unit")
-    city: Optional[str] = Field(None, alias="city")
-    state: Optional[str] = Field(None, alias="state")
-    zip_code: Optional[str] = Field(None, alias="zipCode")
-    county: Optional[str] = Field(None, alias="county")
+    address_line_1: Optional[AddressText] = Field(None, alias="addressLine1")
+    address_line_2: Optional[AddressText] = Field(None, alias="addressLine2")
+    unit: Optional[AddressText] = Field(None, alias="unit")
+    city: Optional[AddressText] = Field(None, alias="city")
+    state: Optional[AddressText] = Field(None, alias="state")
+    zip_code: Optional[AddressText] = Field(None, alias="zipCode")
+    county: Optional[AddressText] = Field(None, alias="county")
     apn: Optional[str] = Field(None, alias="apn")
     fips: Optional[str] = Field(None, alias="fips")
     owner_first_name: Optional[str] = Field(None, alias="ownerFirstName")
@@ -252,8 +254,8 @@ class WorkplaceSearchRequest(BaseModel):
     business_name: Optional[str] = Field(None, alias="businessName")
     first_name: Optional[str] = Field(None, alias="firstName")
     last_name: Optional[str] = Field(None, alias="lastName")
-    city: Optional[str] = Field(None, alias="city")
-    state: Optional[str] = Field(None, alias="state")
+    city: Optional[AddressText] = Field(None, alias="city")
+    state: Optional[AddressText] = Field(None, alias="state")
     page: Optional[int] = Field(None, alias="Page")
     results_per_page: Optional[int] = Field(None, alias="ResultsPerPage")
 
@@ -269,4 +271,14 @@ class BusinessIDRequest(BaseModel):
 
     class Config:
         """Pydantic config to allow population by alias."""
-        populate_by_name = True
\ No newline at end of file
+        populate_by_name = True
+
+class BatchRequest(BaseModel):
+    """Defines the request body for the batch variants of the single-result endpoints.
+
+    Items are kept as raw objects and validated one by one, so a single malformed item
+    is reported in the results instead of rejecting the whole batch.
+    """
+    items: List[Dict[str, Any]] = Field(
+        ..., min_length=1, description="The request bodies to look up, each in the single-item endpoint's format."
+    )
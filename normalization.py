@@ -0,0 +1,53 @@
+"""Canonical forms for request values that arrive in many equivalent spellings.
+
+"(555) 123-4567", "555-123-4567" and "+15551234567" are one phone number; emails and
+addresses differ only in case and spacing. Normalizing them while the request models are
+validated makes equivalent requests produce identical upstream bodies, so the response
+cache and request coalescing treat them as one.
+"""
+
+import re
+from typing import Annotated, List, Optional
+
+from pydantic import AfterValidator
+
+_NON_DIGITS = re.compile(r"\D")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def canonical_phone(value: str) -> str:
+    """Formats a North American number as 555-123-4567.
+
+    A leading country code 1 is dropped. Anything that is not ten digits once punctuation
+    is removed (extensions, international numbers) is only trimmed, never guessed at.
+    """
+    digits = _NON_DIGITS.sub("", value)
+    if len(digits) == 11 and digits[0] == "1":
+        digits = digits[1:]
+    if len(digits) == 10:
+        return f"{digits[:3]}-{digits[3:6]}-{digits[6:]}"
+    return value.strip()
+
+
+def canonical_email(value: str) -> str:
+    """Trims and lowercases an email address."""
+    return value.strip().lower()
+
+
+def canonical_address(value: str) -> str:
+    """Collapses whitespace and uppercases an address component, as postal addresses are written."""
+    return _WHITESPACE.sub(" ", value).strip().upper()
+
+
+def _unique(values: Optional[List[str]]) -> Optional[List[str]]:
+    """Drops repeated values, keeping the first occurrence."""
+    if values is None:
+        return None
+    return list(dict.fromkeys(values))
+
+
+Phone = Annotated[str, AfterValidator(canonical_phone)]
+Email = Annotated[str, AfterValidator(canonical_email)]
+AddressText = Annotated[str, AfterValidator(canonical_address)]
+PhoneList = Annotated[List[Phone], AfterValidator(_unique)]
+EmailList = Annotated[List[Email], AfterValidator(_unique)]
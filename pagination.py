@@ -0,0 +1,168 @@
+"""All-pages streaming for the paged EnformionGO search endpoints."""
+
+import asyncio
+import json
+import math
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Query
+
+from batch import describe_item_error
+
+
+class AllPagesQuery:
+    """Query parameters that switch a paged endpoint into all-pages mode."""
+
+    def __init__(
+        self,
+        all_pages: bool = Query(
+            False, description="Fetch every page and stream the records back as NDJSON instead of one page."
+        ),
+        max_records: Optional[int] = Query(
+            None, ge=1, description="In all-pages mode, stop after this many records."
+        ),
+    ):
+        """Initializes the parameters."""
+        self.all_pages = all_pages
+        self.max_records = max_records
+
+
+def _lookup(data: Dict[str, Any], name: str) -> Any:
+    """Case-insensitive key lookup; the upstream is not consistent about casing."""
+    lowered = name.lower()
+    for key, value in data.items():
+        if key.lower() == lowered:
+            return value
+    return None
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def page_totals(page: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """Returns the (total pages, total results) a response page reports, where known."""
+    pagination = _lookup(page, "pagination")
+    source = pagination if isinstance(pagination, dict) else page
+    return _as_int(_lookup(source, "totalPages")), _as_int(_lookup(source, "totalResults"))
+
+
+def page_records(page: Dict[str, Any]) -> List[Any]:
+    """Returns the records of a response page: its longest top-level list of objects."""
+    records: List[Any] = []
+    for value in page.values():
+        if isinstance(value, list) and len(value) > len(records) and all(isinstance(item, dict) for item in value):
+            records = value
+    return records
+
+
+def record_line(page: int, record: Any) -> bytes:
+    """Encodes one record as an NDJSON line tagged with the page it came from."""
+    return json.dumps({"page": page, "record": record}).encode("utf-8") + b"\n"
+
+
+def page_error_line(page: int, exc: Exception) -> bytes:
+    """Encodes a failed page as an NDJSON error line."""
+    status, detail = describe_item_error(exc)
+    return json.dumps({"page": page, "status": status, "error": detail}).encode("utf-8") + b"\n"
+
+
+def _identity(page: Dict[str, Any]) -> Dict[str, Any]:
+    return page
+
+
+async def stream_pages(
+    first: Dict[str, Any],
+    fetch_page: Callable[[int], Awaitable[Dict[str, Any]]],
+    first_page: int,
+    results_per_page: Optional[int],
+    max_records: int,
+    concurrency: int,
+    project: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+) -> AsyncIterator[bytes]:
+    """Streams the records of `first` and of every following page as NDJSON lines.
+
+    When the first page reports a total, the remaining pages are fetched with at most
+    `concurrency` requests in flight and emitted in completion order; otherwise pages are
+    fetched one after another until a short page. Only the pages in the window are held
+    in memory. Output stops after `max_records` records, outstanding fetches are then
+    cancelled, and a final `summary` line reports what was fetched. A failing page
+    produces an error line and does not abort the stream. `project` is applied to each
+    page before its records are taken; totals are always read from the full first page.
+    """
+    emitted = 0
+    pages_fetched = 1
+    failed_pages = 0
+    total_pages, total_results = page_totals(first)
+    per_page = results_per_page or len(page_records(first))
+    if project is None:
+        project = _identity
+    records = page_records(project(first))
+    if total_pages is None and total_results is not None and per_page:
+        total_pages = math.ceil(total_results / per_page)
+
+    def emit(page: int, records: List[Any]) -> List[bytes]:
+        nonlocal emitted
+        lines = [record_line(page, record) for record in records[: max_records - emitted]]
+        emitted += len(lines)
+        return lines
+
+    for line in emit(first_page, records):
+        yield line
+
+    if total_pages is not None:
+        last_page = total_pages
+        if per_page:
+            last_page = min(last_page, first_page - 1 + math.ceil(max_records / per_page))
+        remaining = iter(range(first_page + 1, last_page + 1))
+        in_flight: Dict[asyncio.Future, int] = {}
+
+        def launch():
+            for page in remaining:
+                in_flight[asyncio.ensure_future(fetch_page(page))] = page
+                if len(in_flight) >= max(1, concurrency):
+                    return
+
+        try:
+            launch()
+            while in_flight and emitted < max_records:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page = in_flight.pop(task)
+                    pages_fetched += 1
+                    try:
+                        lines = emit(page, page_records(project(task.result())))
+                    except Exception as exc:
+                        failed_pages += 1
+                        lines = [page_error_line(page, exc)]
+                    for line in lines:
+                        yield line
+                launch()
+        finally:
+            for task in in_flight:
+                task.cancel()
+    else:
+        page = first_page
+        while records and per_page and len(records) >= per_page and emitted < max_records:
+            page += 1
+            pages_fetched += 1
+            try:
+                records = page_records(project(await fetch_page(page)))
+            except Exception as exc:
+                failed_pages += 1
+                yield page_error_line(page, exc)
+                break
+            for line in emit(page, records):
+                yield line
+
+    summary = {
+        "pages": pages_fetched,
+        "failed_pages": failed_pages,
+        "records": emitted,
+        "total_results": total_results,
+        "truncated": emitted >= max_records and (total_results is None or total_results > emitted),
+    }
+    yield json.dumps({"summary": summary}).encode("utf-8") + b"\n"
@@ -0,0 +1,118 @@
+"""Zero-parse passthrough of upstream EnformionGO response bodies."""
+
+import gzip
+import json
+import zlib
+from typing import Any, Mapping, Optional
+
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+# Encodings requested from the upstream; both can always be decoded with the stdlib.
+UPSTREAM_ACCEPT_ENCODING = "gzip, deflate"
+DEFAULT_MEDIA_TYPE = "application/json"
+
+
+def decode_content(content: bytes, encoding: Optional[str]) -> bytes:
+    """Undoes a `Content-Encoding` applied by the upstream."""
+    if not encoding or encoding == "identity":
+        return content
+    if encoding == "gzip":
+        return gzip.decompress(content)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(content)
+        except zlib.error:
+            return zlib.decompress(content, -zlib.MAX_WBITS)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    """Whether an `Accept-Encoding` header value allows `encoding` (q=0 counts as refused)."""
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        if name.strip().lower() not in (encoding, "*"):
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        return quality > 0
+    return False
+
+
+class RawBody:
+    """An upstream response body kept exactly as it arrived on the wire.
+
+    The body is only decompressed or parsed when something actually needs its contents;
+    plain proxying forwards the original bytes.
+    """
+
+    __slots__ = ("content", "media_type", "encoding")
+
+    def __init__(self, content: bytes, media_type: str = DEFAULT_MEDIA_TYPE, encoding: Optional[str] = None):
+        """Initializes the body.
+
+        Args:
+            content: The bytes as received, possibly compressed.
+            media_type: The upstream `Content-Type`.
+            encoding: The upstream `Content-Encoding`, if any.
+        """
+        self.content = content
+        self.media_type = media_type
+        self.encoding = encoding if encoding and encoding != "identity" else None
+
+    def __len__(self) -> int:
+        return len(self.content)
+
+    def __str__(self) -> str:
+        """The decoded body as text; lets log calls defer decoding to the log writer."""
+        return self.decoded().decode("utf-8", errors="replace")
+
+    def decoded(self) -> bytes:
+        """Returns the uncompressed body."""
+        return decode_content(self.content, self.encoding)
+
+    def json(self) -> Any:
+        """Parses the body as JSON."""
+        return json.loads(self.decoded())
+
+
+class PassthroughResponse(Response):
+    """Sends a `RawBody` to the client without parsing or re-serialising it.
+
+    Compressed upstream bodies are forwarded compressed when the client accepts the
+    encoding, and decompressed on the way out otherwise.
+    """
+
+    def __init__(self, body: RawBody, status_code: int = 200, headers: Optional[Mapping[str, str]] = None):
+        """Initializes the response.
+
+        Args:
+            body: The upstream body to send.
+            status_code: The HTTP status code.
+            headers: Extra response headers.
+        """
+        self.upstream_body = body
+        super().__init__(content=body.content, status_code=status_code, headers=headers, media_type=body.media_type)
+        if body.encoding:
+            self.headers["content-encoding"] = body.encoding
+            self.headers["vary"] = "Accept-Encoding"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = self.upstream_body.encoding
+        if encoding:
+            accept = ""
+            for name, value in scope.get("headers", []):
+                if name == b"accept-encoding":
+                    accept = value.decode("latin-1")
+                    break
+            if not accepts_encoding(accept, encoding):
+                self.body = self.upstream_body.decoded()
+                del self.headers["content-encoding"]
+                self.headers["content-length"] = str(len(self.body))
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,204 @@
+"""Opt-in speculative prefetch of the ID lookups that usually follow a search.
+
+Agents almost always follow `/person-search` with `/contact-id`, and `/business-search`
+with `/business-id`, for the first result or two. With `PREFETCH_ENABLED` those lookups are
+sent in the background once the search response has gone out, and their answers are held
+for `PREFETCH_TTL` seconds so the follow-up call does not wait for the upstream. A
+follow-up arriving while its prefetch is still running waits for that call instead of
+sending another.
+
+Prefetches are only sent while the worker has no requests queued, at most
+`PREFETCH_CONCURRENCY` at a time, and within a per-search-type budget, so speculative
+upstream spend stays bounded.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from cache import ResponseCache
+from config import PrefetchRule, Settings, settings
+from pagination import page_records
+from passthrough import RawBody
+from rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """Sends budgeted follow-up lookups ahead of time and holds their answers briefly."""
+
+    def __init__(
+        self,
+        rules: Dict[str, PrefetchRule],
+        ttl: float,
+        max_entries: int,
+        max_bytes: int,
+        concurrency: int,
+        budgets_per_minute: Dict[str, float],
+        default_budget_per_minute: float,
+        workers: int = 1,
+        clock=time.monotonic,
+    ):
+        """Initializes an empty prefetcher.
+
+        Args:
+            rules: Per search endpoint, the follow-up lookup to prefetch.
+            ttl: Seconds a prefetched answer is held for its follow-up.
+            max_entries: Maximum number of held answers.
+            max_bytes: Maximum total size of the held answers.
+            concurrency: Prefetches in flight at once; more are skipped.
+            budgets_per_minute: Server-wide prefetches per minute per follow-up search type.
+            default_budget_per_minute: The budget of search types not in `budgets_per_minute`.
+            workers: Worker processes sharing the server-wide budgets.
+            clock: Monotonic time source, overridable in tests.
+        """
+        self.rules = rules
+        self.targets = frozenset(rule.target for rule in rules.values())
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self._budgets_per_minute = budgets_per_minute
+        self._default_budget = default_budget_per_minute
+        self._workers = max(1, workers)
+        self._clock = clock
+        self._store = ResponseCache(max_entries, max_bytes, clock)
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._search_types: Dict[str, str] = {}
+        self.issued = 0
+        self.failed = 0
+        self.skipped_budget = 0
+        self.skipped_busy = 0
+        self.hits = 0
+        self.joined = 0
+        self.misses = 0
+
+    def search_type_seen(self, endpoint: str) -> Optional[str]:
+        """The search type callers last used with a follow-up endpoint, if any."""
+        return self._search_types.get(endpoint)
+
+    def follow_up_ids(self, rule: PrefetchRule, body: RawBody) -> List[str]:
+        """Returns the IDs of the leading records of a search response."""
+        try:
+            page = body.json()
+        except ValueError:
+            return []
+        if not isinstance(page, dict):
+            return []
+        ids = []
+        for record in page_records(page)[: rule.top]:
+            for field in rule.id_fields:
+                value = record.get(field)
+                if value:
+                    ids.append(str(value).strip())
+                    break
+        return ids
+
+    def wanted(self, key: str) -> bool:
+        """Whether the answer for `key` is neither held nor being fetched."""
+        return key not in self._pending and not self._store.contains(key)
+
+    def admit(self, search_type: str, busy: bool) -> bool:
+        """Whether one more prefetch of `search_type` may be sent now; takes its budget if so."""
+        if busy or len(self._pending) >= self.concurrency:
+            self.skipped_busy += 1
+            return False
+        if search_type not in self._buckets:
+            per_minute = self._budgets_per_minute.get(search_type, self._default_budget) / self._workers
+            rate = per_minute / 60
+            # Up to ten seconds' worth of budget may be spent at once.
+            self._buckets[search_type] = TokenBucket(rate, max(1.0, rate * 10), self._clock()) if rate > 0 else None
+        bucket = self._buckets[search_type]
+        if bucket is None or bucket.reserve(self._clock()) > 0:
+            if bucket is not None:
+                bucket.refund()
+            self.skipped_budget += 1
+            return False
+        return True
+
+    def start(self, key: str, fetch: Callable[[], Awaitable[RawBody]]):
+        """Runs `fetch` in the background and holds its answer under `key`.
+
+        The task gets a fresh context, so it is bound by neither the deadline nor the
+        metrics of the request whose search triggered it.
+        """
+        self.issued += 1
+        self._pending[key] = asyncio.create_task(self._run(key, fetch), context=contextvars.Context())
+
+    async def _run(self, key: str, fetch: Callable[[], Awaitable[RawBody]]):
+        try:
+            self._store.set(key, await fetch(), self.ttl)
+        except Exception as e:
+            self.failed += 1
+            logger.debug("Prefetch failed: %r", e)
+        finally:
+            self._pending.pop(key, None)
+
+    async def take(self, endpoint: str, search_type: str, key: str) -> Optional[RawBody]:
+        """Returns the prefetched answer for a follow-up call, waiting for it if still in flight.
+
+        The answer is handed out once; later identical calls go through the response cache.
+        """
+        self._search_types[endpoint] = search_type
+        task = self._pending.get(key)
+        if task is not None:
+            # asyncio.wait neither raises the task's errors nor cancels it with this caller.
+            await asyncio.wait((task,))
+        entry = self._store.pop(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if task is not None:
+            self.joined += 1
+        return entry.value
+
+    async def aclose(self):
+        """Cancels the prefetches still in flight."""
+        tasks = list(self._pending.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def clear(self):
+        """Forgets every held answer."""
+        self._store.purge()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns prefetch spend, hit ratios and occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "issued": self.issued,
+            "in_flight": len(self._pending),
+            "failed": self.failed,
+            "skipped_busy": self.skipped_busy,
+            "skipped_budget": self.skipped_budget,
+            "hits": self.hits,
+            "hits_while_in_flight": self.joined,
+            "misses": self.misses,
+            # Share of follow-up calls answered by a prefetch, and of prefetches that were used.
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "used_ratio": round(self.hits / self.issued, 4) if self.issued else 0.0,
+            "entries": len(self._store),
+            "bytes": self._store.total_bytes,
+            "search_types": dict(self._search_types),
+        }
+
+
+def build_prefetcher(settings: Settings) -> Prefetcher:
+    """Creates the prefetcher from the application settings; it has no rules unless enabled."""
+    return Prefetcher(
+        settings.PREFETCH_RULES if settings.PREFETCH_ENABLED else {},
+        ttl=settings.PREFETCH_TTL,
+        max_entries=settings.PREFETCH_MAX_ENTRIES,
+        max_bytes=settings.PREFETCH_MAX_BYTES,
+        concurrency=settings.PREFETCH_CONCURRENCY,
+        budgets_per_minute=settings.PREFETCH_BUDGET_PER_MINUTE,
+        default_budget_per_minute=settings.PREFETCH_DEFAULT_BUDGET_PER_MINUTE,
+        workers=settings.WEB_CONCURRENCY,
+    )
+
+
+prefetcher = build_prefetcher(settings)
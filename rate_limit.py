@@ -0,0 +1,224 @@
+"""Client-side rate limiting of upstream EnformionGO calls."""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+from config import Settings, settings
+from exceptions import RateLimitError
+
+# After a 429 a bucket's rate is halved, but never below this fraction of its configured rate.
+MIN_RATE_FRACTION = 0.1
+# Fraction of the configured rate restored on each successful call after throttling.
+RECOVERY_STEP = 0.05
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a `Retry-After` header given either as delay-seconds or as an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """A token bucket that hands out reservations instead of rejecting callers.
+
+    Tokens may go negative: each caller takes a token immediately and is told how long
+    to wait before using it, which queues callers in arrival order. A bucket without a
+    rate never limits on its own but can still be paused after an upstream 429.
+    """
+
+    def __init__(self, rate: Optional[float], burst: float, now: float):
+        """Initializes the bucket.
+
+        Args:
+            rate: Tokens added per second, or None for no steady-state limit.
+            burst: Maximum number of tokens that can accumulate.
+            now: The current monotonic time.
+        """
+        self.configured_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = now
+        self.paused_until = 0.0
+
+    def reserve(self, now: float) -> float:
+        """Takes one token and returns how many seconds the caller must wait to use it."""
+        if self.rate:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.tokens -= 1
+        self.updated_at = now
+        delay = max(0.0, self.paused_until - now)
+        if self.rate and self.tokens < 0:
+            delay = max(delay, -self.tokens / self.rate)
+        return delay
+
+    def refund(self):
+        """Returns a token taken by a reservation that was abandoned."""
+        if self.rate:
+            self.tokens += 1
+
+    def throttle(self, now: float, retry_after: float):
+        """Pauses the bucket and halves its rate after the upstream signalled overload."""
+        self.paused_until = max(self.paused_until, now + retry_after)
+        if self.rate:
+            self.rate = max(self.configured_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+    def recover(self):
+        """Moves a throttled rate back towards its configured value."""
+        if self.rate and self.rate < self.configured_rate:
+            self.rate = min(self.configured_rate, self.rate + self.configured_rate * RECOVERY_STEP)
+
+    def as_dict(self, now: float) -> Dict[str, Any]:
+        """Returns the bucket state."""
+        return {
+            "configured_rate": self.configured_rate,
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens, 3) if self.rate else None,
+            "paused_for": round(max(0.0, self.paused_until - now), 3),
+        }
+
+
+class RateLimiter:
+    """Admits upstream calls through a global bucket and optional per-search-type buckets.
+
+    Calls over the limit wait in line for up to `max_wait` seconds; calls that would wait
+    longer fail immediately with a `RateLimitError` instead of piling up.
+    """
+
+    def __init__(
+        self,
+        global_rate: Optional[float],
+        global_burst: float,
+        search_type_rates: Dict[str, float],
+        max_wait: float,
+        default_retry_after: float,
+        clock=time.monotonic,
+    ):
+        """Initializes the limiter.
+
+        Args:
+            global_rate: Requests per second across all search types, or None for unlimited.
+            global_burst: Burst size of the global bucket.
+            search_type_rates: Requests per second per `galaxy-search-type`.
+            max_wait: Longest a call may queue before being rejected.
+            default_retry_after: Pause applied after a 429 without a `Retry-After` header.
+            clock: Monotonic time source, overridable in tests.
+        """
+        self._clock = clock
+        now = clock()
+        self.global_bucket = TokenBucket(global_rate, global_burst, now)
+        self.search_type_buckets = {
+            search_type: TokenBucket(rate, max(1.0, rate), now) for search_type, rate in search_type_rates.items()
+        }
+        self.max_wait = max_wait
+        self.default_retry_after = default_retry_after
+        self.queued = 0
+        self.peak_queued = 0
+        self.admitted = 0
+        self.delayed = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _buckets(self, search_type: str) -> List[TokenBucket]:
+        bucket = self.search_type_buckets.get(search_type)
+        return [self.global_bucket] if bucket is None else [self.global_bucket, bucket]
+
+    async def acquire(self, search_type: str):
+        """Waits until a call of `search_type` may be sent upstream.
+
+        Raises:
+            RateLimitError: If the call would have to wait longer than `max_wait`.
+        """
+        buckets = self._buckets(search_type)
+        now = self._clock()
+        delay = max(bucket.reserve(now) for bucket in buckets)
+        if delay > self.max_wait:
+            for bucket in buckets:
+                bucket.refund()
+            self.rejected += 1
+            raise RateLimitError(
+                f"Upstream rate limit for '{search_type}' exceeded; retry in {delay:.1f}s.", retry_after=delay
+            )
+        if delay > 0:
+            self.delayed += 1
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # An abandoned call must not hold up the callers queued behind it.
+                for bucket in buckets:
+                    bucket.refund()
+                raise
+            finally:
+                self.queued -= 1
+            self.wait_total += delay
+            self.wait_max = max(self.wait_max, delay)
+        self.admitted += 1
+
+    def on_success(self, search_type: str):
+        """Lets throttled buckets recover after a successful upstream call."""
+        for bucket in self._buckets(search_type):
+            bucket.recover()
+
+    def on_throttled(self, search_type: str, retry_after: Optional[float]):
+        """Backs off after the upstream answered 429 for `search_type`."""
+        bucket = self.search_type_buckets.get(search_type, self.global_bucket)
+        bucket.throttle(self._clock(), self.default_retry_after if retry_after is None else retry_after)
+        self.throttled += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns queue depth, wait times and bucket states."""
+        now = self._clock()
+        return {
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "admitted": self.admitted,
+            "delayed": self.delayed,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+            "wait": {
+                "avg_ms": round(self.wait_total / self.delayed * 1000, 3) if self.delayed else 0.0,
+                "max_ms": round(self.wait_max * 1000, 3),
+            },
+            "global": self.global_bucket.as_dict(now),
+            "search_types": {name: bucket.as_dict(now) for name, bucket in self.search_type_buckets.items()},
+        }
+
+
+def build_rate_limiter(settings: Settings) -> RateLimiter:
+    """Creates a limiter from the application settings.
+
+    The configured rates are for the whole server, so each of `WEB_CONCURRENCY` worker
+    processes enforces an equal share of them.
+    """
+    workers = max(1, settings.WEB_CONCURRENCY)
+    return RateLimiter(
+        global_rate=settings.RATE_LIMIT_GLOBAL_RPS / workers or None,
+        global_burst=max(1.0, settings.RATE_LIMIT_GLOBAL_BURST / workers),
+        search_type_rates={name: rate / workers for name, rate in settings.RATE_LIMIT_SEARCH_TYPE_RPS.items()},
+        max_wait=settings.RATE_LIMIT_MAX_WAIT,
+        default_retry_after=settings.RATE_LIMIT_DEFAULT_RETRY_AFTER,
+    )
+
+
+rate_limiter = build_rate_limiter(settings)
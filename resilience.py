@@ -0,0 +1,171 @@
+"""Retries, hedged requests and timeout budgets for upstream EnformionGO calls."""
+
+import asyncio
+import random
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from config import Settings, TimeoutPolicy
+
+# Failures where the request most likely never reached the upstream, or the connection
+# was reset under it, and is therefore safe to repeat for a read-only lookup.
+RETRYABLE_EXCEPTIONS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.ReadError,
+    httpx.WriteError,
+    httpx.RemoteProtocolError,
+)
+RETRYABLE_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+Send = Callable[[], Awaitable[httpx.Response]]
+
+
+def is_retryable_response(response: httpx.Response) -> bool:
+    """Whether an upstream response is a transient server failure worth retrying."""
+    return response.status_code in RETRYABLE_STATUS_CODES
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for the given zero-based retry attempt."""
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+def resolve_timeouts(settings: Settings, endpoint: Optional[str]) -> Tuple[httpx.Timeout, float]:
+    """Returns the per-attempt httpx timeout and the total budget in seconds for an endpoint."""
+    policy = settings.UPSTREAM_TIMEOUTS.get(endpoint) if endpoint else None
+    policy = policy or TimeoutPolicy()
+    connect = policy.connect if policy.connect is not None else settings.UPSTREAM_CONNECT_TIMEOUT
+    read = policy.read if policy.read is not None else settings.UPSTREAM_TIMEOUT
+    total = policy.total if policy.total is not None else settings.UPSTREAM_TOTAL_TIMEOUT
+    timeout = httpx.Timeout(read, connect=connect, pool=settings.UPSTREAM_POOL_TIMEOUT)
+    return timeout, total
+
+
+class LatencyTracker:
+    """Keeps a window of recent successful upstream latencies for one endpoint."""
+
+    def __init__(self, size: int = 256):
+        """Initializes an empty window holding at most `size` samples."""
+        self._samples = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float):
+        """Adds a latency sample."""
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        """Returns the q-th quantile (0..1) of the window."""
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class UpstreamResilience:
+    """Wraps upstream sends with bounded retries, optional hedging and a total time budget."""
+
+    def __init__(self):
+        """Initializes the latency windows and counters."""
+        self._latency: Dict[str, LatencyTracker] = {}
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_exceeded = 0
+
+    def hedge_delay(self, settings: Settings, endpoint: Optional[str]) -> Optional[float]:
+        """Returns how long to wait before hedging, or None if hedging is not possible yet."""
+        if not settings.HEDGE_ENABLED or endpoint is None:
+            return None
+        tracker = self._latency.get(endpoint)
+        if tracker is None or len(tracker) < settings.HEDGE_MIN_SAMPLES:
+            return None
+        return max(settings.HEDGE_MIN_DELAY, tracker.percentile(settings.HEDGE_PERCENTILE))
+
+    async def call(self, send: Send, settings: Settings, endpoint: Optional[str], total: float) -> httpx.Response:
+        """Runs `send` under the retry policy within `total` seconds.
+
+        Returns the first non-retryable response, or the last response once attempts are
+        exhausted. Retryable transport errors are re-raised after the final attempt.
+
+        Raises:
+            TimeoutError: If the total budget runs out.
+        """
+        attempts = max(1, settings.RETRY_MAX_ATTEMPTS) if settings.RETRY_ENABLED else 1
+        try:
+            async with asyncio.timeout(total):
+                for attempt in range(attempts):
+                    last = attempt == attempts - 1
+                    try:
+                        response = await self._send(send, settings, endpoint)
+                    except RETRYABLE_EXCEPTIONS:
+                        if last:
+                            raise
+                    else:
+                        if last or not is_retryable_response(response):
+                            return response
+                    self.retries += 1
+                    delay = backoff_delay(attempt, settings.RETRY_BACKOFF_BASE, settings.RETRY_BACKOFF_MAX)
+                    await asyncio.sleep(delay)
+        except TimeoutError:
+            self.budget_exceeded += 1
+            raise
+
+    async def _send(self, send: Send, settings: Settings, endpoint: Optional[str]) -> httpx.Response:
+        delay = self.hedge_delay(settings, endpoint)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.attempts += 1
+        if delay is None:
+            response = await send()
+        else:
+            response = await self._send_hedged(send, delay)
+        if endpoint is not None and not is_retryable_response(response):
+            self._latency.setdefault(endpoint, LatencyTracker()).record(loop.time() - start)
+        return response
+
+    async def _send_hedged(self, send: Send, delay: float) -> httpx.Response:
+        """Sends once, and again if the first send is slower than `delay`; first good answer wins."""
+        primary = asyncio.ensure_future(send())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedges += 1
+                self.attempts += 1
+                tasks.add(asyncio.ensure_future(send()))
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                good = [t for t in done if t.exception() is None and not is_retryable_response(t.result())]
+                if good:
+                    if good[0] is not primary:
+                        self.hedge_wins += 1
+                    return good[0].result()
+                if not pending:
+                    return done.pop().result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns retry and hedging counters and current per-endpoint p95 latencies."""
+        return {
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "budget_exceeded": self.budget_exceeded,
+            "p95_ms": {
+                endpoint: round(tracker.percentile(0.95) * 1000, 3)
+                for endpoint, tracker in self._latency.items()
+                if len(tracker)
+            },
+        }
+
+
+upstream_resilience = UpstreamResilience()
@@ -0,0 +1,331 @@
+"""Opt-in on-disk response store that keeps cached answers across restarts.
+
+With `RESPONSE_STORE_ENABLED`, every upstream answer the in-process cache keeps is also
+written, compressed, to a local SQLite database at `RESPONSE_STORE_PATH`, for the same
+per-endpoint TTL. A restarted or newly forked worker answers from it instead of starting
+cold. For `RESPONSE_STORE_STALE_SECONDS` after its TTL an entry is still served
+immediately while one background call refreshes it (stale-while-revalidate); after that
+it is a miss.
+
+The database runs in WAL mode, so every worker process on the host can share it: reads
+never wait for a writer, and writes happen off the event loop. A refresh is claimed in
+the database, so one worker per host refreshes a stale entry. The file is bounded by
+`RESPONSE_STORE_MAX_BYTES`; the entries closest to expiry are evicted first.
+"""
+
+import asyncio
+import contextvars
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from config import Settings, settings
+from passthrough import RawBody
+
+logger = logging.getLogger(__name__)
+
+# Uncompressed bodies are stored with this encoding; it is served as such to clients accepting it.
+STORE_ENCODING = "deflate"
+COMPRESSION_LEVEL = 6
+# Seconds a worker holds the claim on refreshing a stale entry
+REFRESH_CLAIM_SECONDS = 30.0
+# Rows deleted per statement while the store is over its size bound
+EVICT_CHUNK = 100
+# Writes between purges of entries past their stale window
+PURGE_EVERY = 256
+# Seconds a worker waits for another worker's write transaction
+BUSY_TIMEOUT = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT,
+    body BLOB NOT NULL,
+    encoding TEXT,
+    media_type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    refresh_after REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at);
+CREATE TABLE IF NOT EXISTS store_size (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_size VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN
+    UPDATE store_size SET bytes = bytes + new.size;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses BEGIN
+    UPDATE store_size SET bytes = bytes + new.size - old.size;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN
+    UPDATE store_size SET bytes = bytes - old.size;
+END;
+"""
+
+
+class StoredResponse:
+    """A response read back from the store."""
+
+    __slots__ = ("value", "created_at", "expires_at", "stale")
+
+    def __init__(self, value: RawBody, created_at: float, expires_at: float, stale: bool):
+        """Initializes the entry.
+
+        Args:
+            value: The stored body, compressed unless the upstream sent it uncompressed and small.
+            created_at: Wall-clock time the body was fetched from the upstream.
+            expires_at: Wall-clock time the entry's TTL ends.
+            stale: Whether the TTL has ended and the entry is served while it is refreshed.
+        """
+        self.value = value
+        self.created_at = created_at
+        self.expires_at = expires_at
+        self.stale = stale
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    # Each connection is used by one thread at a time, though not always the one that opened it.
+    db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+class ResponseStore:
+    """A size-bounded, TTL-expiring SQLite store of upstream bodies shared by the workers of a host.
+
+    Reads run on the event loop through their own connection; writes, evictions and
+    refresh claims run in a thread through another, so a worker waiting on the write lock
+    never blocks its event loop.
+    """
+
+    def __init__(self, max_bytes: int, stale_seconds: float, clock=time.time):
+        """Initializes a closed store; `open` attaches the database.
+
+        Args:
+            max_bytes: Maximum total size of the stored (compressed) bodies.
+            stale_seconds: Seconds past its TTL an entry is served while it is refreshed.
+            clock: Wall-clock time source, shared by all workers; overridable in tests.
+        """
+        self.max_bytes = max_bytes
+        self.stale_seconds = stale_seconds
+        self.path: Optional[str] = None
+        self._clock = clock
+        self._reader: Optional[sqlite3.Connection] = None
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        self._refreshing: Set[str] = set()
+        self._writes_since_purge = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.revalidations = 0
+        self.revalidation_failures = 0
+        self.errors = 0
+
+    @property
+    def active(self) -> bool:
+        """Whether the database is open."""
+        return self._reader is not None
+
+    def open(self, path: str):
+        """Opens (creating if needed) the database at `path`.
+
+        Called once per worker process after forking, since SQLite connections must not
+        cross a fork.
+        """
+        if self.active:
+            return
+        self._writer = _connect(path)
+        self._writer.executescript(SCHEMA)
+        self._reader = _connect(path)
+        self.path = path
+
+    async def aclose(self):
+        """Cancels refreshes in flight, finishes pending writes and closes the database."""
+        for task in list(self._tasks):
+            if task.get_name().startswith("revalidate:"):
+                task.cancel()
+        await self.flush()
+        for db in (self._reader, self._writer):
+            if db is not None:
+                db.close()
+        self._reader = self._writer = None
+        self.path = None
+
+    async def flush(self):
+        """Waits for the pending writes and refreshes."""
+        while self._tasks:
+            tasks = list(self._tasks)
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Refreshes spawn writes; the done callbacks may not have run yet.
+            self._tasks.difference_update(tasks)
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        """Returns the fresh or still-servable stale entry for `key`, or None."""
+        if not self.active:
+            return None
+        try:
+            row = self._reader.execute(
+                "SELECT body, encoding, media_type, created_at, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Response store read failed: %s", e)
+            return None
+        now = self._clock()
+        if row is None or row[4] + self.stale_seconds <= now:
+            self.misses += 1
+            return None
+        body, encoding, media_type, created_at, expires_at = row
+        stale = expires_at <= now
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return StoredResponse(RawBody(bytes(body), media_type, encoding), created_at, expires_at, stale)
+
+    def save(self, key: str, endpoint: Optional[str], body: RawBody, ttl: float):
+        """Stores `body` under `key` for `ttl` seconds in the background."""
+        if not self.active or ttl <= 0:
+            return
+        self._spawn(asyncio.to_thread(self._write, key, endpoint, body, ttl), f"save:{key}")
+
+    def revalidate(self, key: str, refresh: Callable[[], Awaitable[Any]]):
+        """Refreshes a stale entry in the background, unless a worker on the host already is.
+
+        `refresh` fetches the answer again and saves it. It runs in a fresh context, so it
+        is bound by neither the deadline nor the metrics of the request that found the
+        entry stale.
+        """
+        if not self.active or key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self._spawn(self._revalidate(key, refresh), f"revalidate:{key}", contextvars.Context())
+
+    def _spawn(self, coro: Awaitable[Any], name: str, context: Optional[contextvars.Context] = None):
+        task = asyncio.create_task(coro, name=name, context=context)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _revalidate(self, key: str, refresh: Callable[[], Awaitable[Any]]):
+        try:
+            if not await asyncio.to_thread(self._claim, key):
+                return
+            self.revalidations += 1
+            await refresh()
+        except Exception as e:
+            self.revalidation_failures += 1
+            logger.debug("Response store refresh failed: %r", e)
+        finally:
+            self._refreshing.discard(key)
+
+    async def purge(self, endpoint: Optional[str] = None) -> int:
+        """Deletes every entry, or those of one endpoint, for all workers; returns how many."""
+        return await asyncio.to_thread(self._purge, endpoint)
+
+    def _purge(self, endpoint: Optional[str]) -> int:
+        with self._write_lock:
+            if endpoint is None:
+                return self._writer.execute("DELETE FROM responses").rowcount
+            return self._writer.execute("DELETE FROM responses WHERE endpoint = ?", (endpoint,)).rowcount
+
+    def _claim(self, key: str) -> bool:
+        now = self._clock()
+        try:
+            with self._write_lock:
+                cursor = self._writer.execute(
+                    "UPDATE responses SET refresh_after = ? WHERE key = ? AND refresh_after <= ?",
+                    (now + REFRESH_CLAIM_SECONDS, key, now),
+                )
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Response store refresh claim failed: %s", e)
+            return False
+        return cursor.rowcount == 1
+
+    def _write(self, key: str, endpoint: Optional[str], body: RawBody, ttl: float):
+        content, encoding = body.content, body.encoding
+        if encoding is None:
+            compressed = zlib.compress(content, COMPRESSION_LEVEL)
+            if len(compressed) < len(content):
+                content, encoding = compressed, STORE_ENCODING
+        now = self._clock()
+        try:
+            with self._write_lock:
+                self._writer.execute(
+                    "INSERT INTO responses (key, endpoint, body, encoding, media_type, size, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET endpoint = excluded.endpoint, "
+                    "body = excluded.body, encoding = excluded.encoding, media_type = excluded.media_type, "
+                    "size = excluded.size, created_at = excluded.created_at, expires_at = excluded.expires_at, "
+                    "refresh_after = 0",
+                    (key, endpoint, content, encoding, body.media_type, len(content), now, now + ttl),
+                )
+                self.writes += 1
+                self._writes_since_purge += 1
+                if self._writes_since_purge >= PURGE_EVERY:
+                    self._writes_since_purge = 0
+                    self._delete("WHERE expires_at <= ?", (now - self.stale_seconds,))
+                self._evict()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Response store write failed: %s", e)
+
+    def _delete(self, where: str, params: tuple) -> int:
+        cursor = self._writer.execute(f"DELETE FROM responses {where}", params)
+        self.evictions += cursor.rowcount
+        return cursor.rowcount
+
+    def _size(self, db: sqlite3.Connection) -> int:
+        return db.execute("SELECT bytes FROM store_size").fetchone()[0]
+
+    def _evict(self):
+        if self._size(self._writer) <= self.max_bytes:
+            return
+        self._delete("WHERE expires_at <= ?", (self._clock() - self.stale_seconds,))
+        while self._size(self._writer) > self.max_bytes:
+            where = "WHERE key IN (SELECT key FROM responses ORDER BY expires_at LIMIT ?)"
+            if not self._delete(where, (EVICT_CHUNK,)):
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit ratios, refreshes and the size of the shared database."""
+        lookups = self.hits + self.stale_hits + self.misses
+        stats = {
+            "enabled": self.active,
+            "path": self.path,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "revalidations": self.revalidations,
+            "revalidation_failures": self.revalidation_failures,
+            "errors": self.errors,
+            "max_bytes": self.max_bytes,
+        }
+        if self.active:
+            try:
+                stats["entries"] = self._reader.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                stats["bytes"] = self._size(self._reader)
+            except sqlite3.Error as e:
+                logger.warning("Response store read failed: %s", e)
+        return stats
+
+
+def build_response_store(settings: Settings) -> ResponseStore:
+    """Creates the response store from the application settings; the app lifespan opens it if enabled."""
+    return ResponseStore(settings.RESPONSE_STORE_MAX_BYTES, settings.RESPONSE_STORE_STALE_SECONDS)
+
+
+response_store = build_response_store(settings)
@@ -0,0 +1,80 @@
+"""Single-flight coalescing of identical in-flight upstream requests."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """Shares one in-flight call between all concurrent callers using the same key.
+
+    The first caller for a key starts the call as an independent task; later callers
+    await the same task until it finishes. Waiters are shielded, so a cancelled waiter
+    (including the one that started the call) does not cancel the shared call while
+    others still wait for it; once every waiter is gone the call is cancelled. An
+    exception raised by the call is re-raised to every waiter.
+    """
+
+    def __init__(self):
+        """Initializes an empty flight table."""
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.executed = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Runs `fn` once per key among concurrent callers.
+
+        Args:
+            key: Identity of the call; callers with equal keys share a result.
+            fn: Zero-argument coroutine factory performing the call.
+
+        Returns:
+            A tuple of the call's result and whether this caller joined an existing call.
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if self._waiters.get(task) == 1 and not task.done():
+                # Nobody is left to use the result, e.g. every client disconnected.
+                task.cancel()
+                self.abandoned += 1
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        self._waiters.pop(task, None)
+        # Mark the exception as retrieved in case every waiter was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns how many upstream calls ran, were saved by coalescing or were abandoned by every waiter."""
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "in_flight": self.in_flight,
+        }
+
+
+upstream_flights = SingleFlight()
@@ -0,0 +1,75 @@
+import asyncio
+
+import httpx
+import pytest
+
+from autocomplete import autocomplete_index
+from cache import response_cache
+from circuit_breaker import circuit_breakers
+from config import settings
+from entities import entity_store
+from http_client import upstream_pool
+
+
+class MockUpstream:
+    """Records upstream requests and answers them through a configurable handler."""
+
+    def __init__(self):
+        self.requests = []
+        self.handler = lambda request: httpx.Response(200, json={"ok": True})
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return self.handler(request)
+
+
+class FakeClock:
+    """A monotonic clock that only moves when a test sets `now`."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock():
+    """A clock for components taking a `clock`, starting at 0."""
+    return FakeClock()
+
+
+@pytest.fixture
+def mock_upstream():
+    """Starts the shared upstream pool against an in-memory mock transport."""
+    upstream = MockUpstream()
+    response_cache.purge()
+    asyncio.run(upstream_pool.aclose())
+    asyncio.run(upstream_pool.start(settings, transport=httpx.MockTransport(upstream)))
+    yield upstream
+    asyncio.run(upstream_pool.aclose())
+    response_cache.purge()
+    autocomplete_index.clear()
+    entity_store.clear()
+    circuit_breakers.reset()
+
+
+@pytest.fixture(autouse=True)
+def jobs_db(tmp_path, monkeypatch):
+    """Keeps the bulk job database of any app lifespan out of the working directory."""
+    monkeypatch.setattr(settings, "JOBS_DB_PATH", str(tmp_path / "jobs.sqlite3"))
+    return settings.JOBS_DB_PATH
+
+
+@pytest.fixture(autouse=True)
+def schema_cache(tmp_path, monkeypatch):
+    """Keeps the OpenAPI/MCP schema cache written by the MCP server out of the working directory."""
+    monkeypatch.setattr(settings, "SCHEMA_CACHE_PATH", str(tmp_path / "schema_cache.json"))
+    return settings.SCHEMA_CACHE_PATH
+
+
+@pytest.fixture(autouse=True)
+def response_store_db(tmp_path, monkeypatch):
+    """Keeps the response store of any app lifespan out of the working directory."""
+    monkeypatch.setattr(settings, "RESPONSE_STORE_PATH", str(tmp_path / "responses.sqlite3"))
+    return settings.RESPONSE_STORE_PATH
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from admission import MCP, REST, AdmissionController, admission_controller
+from exceptions import OverloadedError
+from main import app
+
+client = TestClient(app)
+
+
+def _controller(**options) -> AdmissionController:
+    defaults = dict(max_in_flight=1, max_queue=10, max_queue_per_client=10, max_wait=1.0)
+    return AdmissionController(class_weights={REST: 1.0, MCP: 1.0}, **{**defaults, **options})
+
+
+def test_waiting_clients_and_classes_take_turns():
+    """Tests that freed slots rotate over clients and classes instead of following arrival order."""
+
+    async def run():
+        controller = _controller()
+        await controller.acquire(REST, "busy")
+        order = []
+
+        async def request(request_class, name):
+            await controller.acquire(request_class, name)
+            order.append(name)
+
+        tasks = [asyncio.create_task(request(REST, "busy")) for _ in range(3)]
+        tasks.append(asyncio.create_task(request(REST, "quiet")))
+        tasks.append(asyncio.create_task(request(MCP, "agent")))
+        await asyncio.sleep(0)
+        for _ in tasks:
+            controller.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(run())
+    assert set(order[:3]) == {"busy", "quiet", "agent"}
+
+
+def test_requests_are_shed_when_queue_is_full_or_deadline_passes():
+    """Tests the three shedding reasons."""
+
+    async def run():
+        controller = _controller(max_queue=2, max_queue_per_client=1, max_wait=0.01)
+        await controller.acquire(REST, "a")
+        waiting = []
+        reasons = []
+        for queued, rejected in (("a", "a"), ("b", "c")):
+            waiting.append(asyncio.create_task(controller.acquire(REST, queued)))
+            await asyncio.sleep(0)
+            with pytest.raises(OverloadedError) as shed:
+                await controller.acquire(REST, rejected)
+            reasons.append(shed.value.reason)
+        for task in waiting:
+            with pytest.raises(OverloadedError) as shed:
+                await task
+            reasons.append(shed.value.reason)
+        return reasons, controller.stats()
+
+    reasons, stats = asyncio.run(run())
+    assert reasons == ["client_queue_full", "queue_full", "deadline", "deadline"]
+    assert stats["queued"] == 0
+    assert stats["in_flight"] == 1
+
+
+def test_over_capacity_answers_503_but_health_stays_up(monkeypatch):
+    """Tests that shed requests get a quick 503 with Retry-After while exempt routes still answer."""
+    monkeypatch.setattr(admission_controller, "max_in_flight", 0)
+    monkeypatch.setattr(admission_controller, "max_queue", 0)
+    response = client.post("/caller-id", json={"Phone": "555-123-4567"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    assert client.get("/health").status_code == 200
+    assert client.get("/admin/admission").json()["shed"][REST]["queue_full"] >= 1
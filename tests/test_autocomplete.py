@@ -0,0 +1,66 @@
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from autocomplete import PrefixIndex, normalize_input
+from config import settings
+from main import app
+
+client = TestClient(app)
+
+PREDICTIONS = [
+    {"streetAddress": "123 Main St", "city": "Springfield", "state": "IL", "zipCode": "62701"},
+    {"streetAddress": "123 Maple Ave", "city": "Springfield", "state": "IL", "zipCode": "62704"},
+    {"streetAddress": "1234 Oak Rd", "city": "Peoria", "state": "IL", "zipCode": "61602"},
+]
+
+
+def body(predictions, total=None) -> bytes:
+    total = len(predictions) if total is None else total
+    return json.dumps({"predictions": predictions, "totalResults": total, "isError": False}).encode()
+
+
+def test_longer_inputs_are_filtered_from_complete_prefix():
+    """Tests that a complete shorter-prefix answer is filtered for longer inputs."""
+    index = PrefixIndex(max_entries=10, max_bytes=1_000_000, ttl=60)
+    index.add("123", body(PREDICTIONS))
+
+    result = json.loads(index.lookup("123 Ma"))
+    assert [p["streetAddress"] for p in result["predictions"]] == ["123 Main St", "123 Maple Ave"]
+    assert result["isError"] is False
+    assert result["totalResults"] == 2
+    assert json.loads(index.lookup("123 main st, spring"))["predictions"] == PREDICTIONS[:1]
+    index.add("4", json.dumps({"predictions": PREDICTIONS, "pagination": {"totalResults": 3, "totalPages": 1}}).encode())
+    assert json.loads(index.lookup("4 x"))["pagination"] == {"totalResults": 0, "totalPages": 0}
+    assert index.lookup("12") is None
+    assert index.stats()["hits"] == 3
+
+
+def test_truncated_and_error_answers_are_not_indexed():
+    """Tests that answers not reported complete, or flagged as errors, are never reused."""
+    index = PrefixIndex(max_entries=10, max_bytes=1_000_000, ttl=60)
+    index.add("123", body(PREDICTIONS, total=25))
+    index.add("12", json.dumps({"predictions": PREDICTIONS}).encode())
+    index.add("1234", json.dumps({"predictions": [], "isError": True}).encode())
+    assert index.lookup("1234 oak") is None
+    assert index.stats()["incomplete"] == 2
+    assert index.stats()["entries"] == 0
+    assert normalize_input("  123, Main-St ") == "123 main st"
+
+
+def test_endpoint_answers_keystrokes_locally(mock_upstream, monkeypatch):
+    """Tests that only the first keystroke of a typed address reaches the upstream."""
+    monkeypatch.setattr(settings, "AUTOCOMPLETE_INDEX_ENABLED", True)
+    mock_upstream.handler = lambda request: httpx.Response(200, content=body(PREDICTIONS))
+
+    first = client.post("/address-autocomplete", json={"Input": "123"})
+    assert first.headers["X-Autocomplete-Index"] == "MISS"
+    for typed in ("123 ", "123 M", "123 Map"):
+        response = client.post("/address-autocomplete", json={"Input": typed})
+        assert response.headers["X-Autocomplete-Index"] == "HIT"
+        assert response.headers["X-Cache"] == "HIT"
+        assert response.headers["X-Request-Fingerprint"] != first.headers["X-Request-Fingerprint"]
+    assert response.json()["predictions"] == [PREDICTIONS[1]]
+    assert len(mock_upstream.requests) == 1
+    assert client.get("/admin/autocomplete-index").json()["hits"] >= 3
@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from main import app, mcp
+
+client = TestClient(app)
+
+
+def test_batch_streams_results_and_item_errors(mock_upstream):
+    """Tests that invalid and failing items are reported without aborting the batch."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        phone = json.loads(request.content)["Phone"]
+        if phone == "bad":
+            return httpx.Response(500, json={"error": "upstream"})
+        return httpx.Response(200, json={"phone": phone})
+
+    mock_upstream.handler = handler
+    items = [{"Phone": "111"}, {"NotAPhone": "x"}, {"Phone": "bad"}, {"Phone": "222"}]
+    response = client.post("/caller-id/batch", json={"items": items})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = {record["index"]: record for record in map(json.loads, response.text.splitlines())}
+    assert sorted(records) == [0, 1, 2, 3]
+    assert records[0] == {"index": 0, "status": 200, "result": {"phone": "111"}}
+    assert records[1]["status"] == 422
+    assert records[2]["status"] == 400
+    assert records[3]["result"] == {"phone": "222"}
+
+
+def test_batch_items_past_the_deadline_are_reported_as_504(mock_upstream):
+    """Tests that an item cut short by the request deadline gets the same 504 as the single-item endpoint."""
+
+    async def slow(request):
+        await asyncio.sleep(5)
+        return httpx.Response(200, json={"ok": True})
+
+    mock_upstream.handler = slow
+    response = client.post(
+        "/caller-id/batch", json={"items": [{"Phone": "555-123-4567"}]}, headers={"X-Request-Timeout": "0.1"}
+    )
+    assert [json.loads(line)["status"] for line in response.text.splitlines()] == [504]
+
+
+def test_batch_endpoints_are_mcp_tools():
+    """Tests that every batch endpoint is exposed as an MCP tool."""
+    batch_tools = [tool.name for tool in mcp.tools if "batch" in tool.name]
+    assert len(batch_tools) == 4
@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+
+from cache import ResponseCache, cache_ttl_for, make_cache_key
+from config import settings
+from main import app
+
+client = TestClient(app)
+
+
+def test_cache_key_ignores_field_order():
+    """Tests that equivalent bodies produce the same cache key."""
+    a = make_cache_key("https://x/Phone/Enrich", "DevAPICallerID", {"Phone": "1", "Page": 1})
+    b = make_cache_key("https://x/Phone/Enrich", "DevAPICallerID", {"Page": 1, "Phone": "1"})
+    c = make_cache_key("https://x/Phone/Enrich", "ReversePhone", {"Phone": "1", "Page": 1})
+    assert a == b
+    assert a != c
+
+
+def test_only_listed_endpoints_are_cached():
+    """Tests that endpoints missing from CACHE_TTLS are not cached by default."""
+    assert cache_ttl_for(settings, "/caller-id") == settings.CACHE_TTLS["/caller-id"]
+    assert cache_ttl_for(settings, "/id-verification") == 0
+    assert cache_ttl_for(settings, "/person-search") == 0
+
+
+def test_cache_expires_and_evicts_lru(fake_clock):
+    """Tests TTL expiry and least-recently-used eviction."""
+    cache = ResponseCache(max_entries=2, max_bytes=1_000_000, clock=fake_clock)
+    cache.set("a", b"1", ttl=10)
+    cache.set("b", b"2", ttl=10)
+    assert cache.get("a") is not None
+    cache.set("c", b"3", ttl=10)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    fake_clock.now = 11
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["expirations"] == 1
+
+
+def test_endpoint_responses_are_cached(mock_upstream):
+    """Tests that a repeated lookup is served from the cache with a HIT header."""
+    first = client.post("/caller-id", json={"Phone": "555-123-4567"})
+    second = client.post("/caller-id", json={"Phone": "555-123-4567"})
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == {"ok": True}
+    assert len(mock_upstream.requests) == 1
+
+    assert client.get("/admin/cache").json()["endpoints"]["/caller-id"]["entries"] == 1
+    assert client.delete("/admin/cache", params={"endpoint": "/caller-id"}).json() == {"purged": 1}
+    assert client.post("/caller-id", json={"Phone": "555-123-4567"}).headers["X-Cache"] == "MISS"
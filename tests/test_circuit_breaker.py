@@ -0,0 +1,72 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, circuit_breakers
+from config import settings
+from exceptions import UpstreamUnavailableError
+from main import app
+
+client = TestClient(app)
+
+
+def make_breaker(clock):
+    return CircuitBreaker(
+        "https://upstream.test/x",
+        window=4,
+        min_calls=4,
+        failure_rate=0.5,
+        slow_call_seconds=5.0,
+        slow_call_rate=0.75,
+        open_seconds=10.0,
+        half_open_probes=1,
+        clock=clock,
+    )
+
+
+def test_breaker_trips_on_failure_rate_and_recovers(fake_clock):
+    """Tests the closed -> open -> half-open -> closed cycle."""
+    breaker = make_breaker(fake_clock)
+    for success in (True, False, True, False):
+        breaker.before_call()
+        breaker.record(success, 0.1)
+    assert breaker.state == OPEN
+    with pytest.raises(UpstreamUnavailableError):
+        breaker.before_call()
+
+    fake_clock.now = 11
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(UpstreamUnavailableError):
+        breaker.before_call()
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_breaker_trips_on_slow_calls_and_reopens_on_failed_probe(fake_clock):
+    """Tests latency-based tripping and a failed half-open probe."""
+    breaker = make_breaker(fake_clock)
+    for _ in range(4):
+        breaker.before_call()
+        breaker.record(True, 6.0)
+    assert breaker.state == OPEN
+    fake_clock.now = 11
+    breaker.before_call()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+
+def test_open_breaker_fails_fast_with_503(mock_upstream):
+    """Tests that an open breaker returns 503 and is reported by /health."""
+    circuit_breakers.reset()
+    breaker = circuit_breakers.for_url(settings.DIVORCE_SEARCH_API_URL)
+    for _ in range(settings.BREAKER_MIN_CALLS):
+        breaker.record(False, 0.1)
+
+    response = client.post("/divorce-search", json={"LastName": "Smith"})
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert mock_upstream.requests == []
+
+    health = client.get("/health").json()
+    assert health["status"] == "degraded"
+    assert health["circuit_breakers"][settings.DIVORCE_SEARCH_API_URL]["state"] == OPEN
@@ -0,0 +1,97 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+import main
+from config import Credential, settings
+from credentials import CredentialPool, build_credential_pool
+from main import app
+
+client = TestClient(app)
+
+
+def _pool(*credentials: Credential, **options) -> CredentialPool:
+    return CredentialPool(list(credentials), sideline_seconds=60.0, max_wait=1.0, **options)
+
+
+def test_traffic_follows_weights_and_load():
+    """Tests that idle accounts share calls by weight and busy accounts are passed over."""
+
+    async def run():
+        pool = _pool(Credential(name="a", password="p", weight=3), Credential(name="b", password="p"))
+        picked = []
+        for _ in range(8):
+            account = await pool.acquire()
+            picked.append(account.name)
+            pool.release(account, 200, 0.01, None)
+        busy = await pool.acquire()
+        return picked, busy.name, (await pool.acquire()).name
+
+    picked, busy, next_pick = asyncio.run(run())
+    assert picked.count("a") == 6
+    assert busy != next_pick
+
+
+def test_account_at_its_ceiling_is_skipped():
+    """Tests that an account out of request budget yields to one with capacity."""
+    now = [0.0]
+    pool = _pool(
+        Credential(name="a", password="p", weight=10, max_rps=1),
+        Credential(name="b", password="p"),
+        clock=lambda: now[0],
+    )
+    names = [asyncio.run(pool.acquire()).name for _ in range(3)]
+    assert names == ["a", "b", "b"]
+
+
+def test_call_cancelled_at_the_ceiling_gives_its_slot_back():
+    """Tests that a call abandoned while waiting for an account's ceiling leaves no load behind."""
+
+    async def run():
+        pool = _pool(Credential(name="a", password="p", max_rps=1))
+        account = pool.accounts[0]
+        first = await pool.acquire()
+        pool.release(first, 200, 0.01, None)
+        tokens = account.bucket.tokens
+
+        async def post(headers):
+            raise AssertionError("the cancelled call must not be sent")
+
+        waiting = asyncio.create_task(pool.call(post))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        return account, tokens
+
+    account, tokens = asyncio.run(run())
+    assert (account.in_flight, account.requests) == (0, 1)
+    assert account.bucket.tokens >= tokens
+
+
+def test_refused_account_is_sidelined_and_call_fails_over(mock_upstream, monkeypatch):
+    """Tests that an auth error moves the call to another account and sidelines the first."""
+    pool = build_credential_pool(
+        settings.model_copy(
+            update={"GALAXY_AP_POOL": [Credential(name="spare", password="p")], "CACHE_ENABLED": False}
+        )
+    )
+    monkeypatch.setattr(main, "credential_pool", pool)
+
+    def handler(request):
+        if request.headers["galaxy-ap-name"] == settings.GALAXY_AP_NAME:
+            return httpx.Response(401, json={"message": "Invalid credentials"})
+        return httpx.Response(200, json={"ok": True})
+
+    mock_upstream.handler = handler
+    for number in range(3):
+        response = client.post("/reverse-phone-search", json={"Phone": f"555-123-456{number}"})
+        assert response.status_code == 200
+    assert len(mock_upstream.requests) == 4
+
+    stats = client.get("/admin/credentials").json()
+    primary = stats["accounts"][settings.GALAXY_AP_NAME]
+    assert stats["failovers"] == 1
+    assert primary["healthy"] is False
+    assert primary["sideline_reason"] == "auth"
+    assert stats["accounts"]["spare"]["requests"] == 3
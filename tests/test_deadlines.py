@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+from deadlines import DeadlineMiddleware, cancellation_stats, parse_timeout
+from main import app
+
+client = TestClient(app)
+
+
+def test_parse_timeout():
+    """Tests that only positive, finite second counts set a deadline."""
+    assert parse_timeout("2.5") == 2.5
+    assert parse_timeout("0") is None
+    assert parse_timeout("inf") is None
+    assert parse_timeout("soon") is None
+
+
+def test_timeout_header_bounds_the_upstream_call(mock_upstream):
+    """Tests that a request past its deadline is answered 504 and its upstream call cancelled."""
+
+    async def slow(request):
+        await asyncio.sleep(5)
+        return httpx.Response(200, json={"ok": True})
+
+    mock_upstream.handler = slow
+    exceeded, cancelled = cancellation_stats.deadline_exceeded, cancellation_stats.upstream_cancelled
+    start = time.perf_counter()
+    response = client.post(
+        "/reverse-phone-search", json={"Phone": "555-123-4567"}, headers={"X-Request-Timeout": "0.1"}
+    )
+    assert response.status_code == 504
+    assert time.perf_counter() - start < 2
+    assert cancellation_stats.deadline_exceeded == exceeded + 1
+    assert cancellation_stats.upstream_cancelled == cancelled + 1
+
+
+def test_disconnect_cancels_the_handler():
+    """Tests that a client going away after sending its body cancels the request quietly."""
+    finished = []
+
+    async def handler(scope, receive, send):
+        await receive()
+        try:
+            await asyncio.sleep(5)
+        finally:
+            finished.append(True)
+
+    async def run():
+        messages = [{"type": "http.request", "body": b"{}", "more_body": False}, {"type": "http.disconnect"}]
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            raise AssertionError("nothing should be sent to a disconnected client")
+
+        scope = {"type": "http", "method": "POST", "path": "/caller-id", "headers": []}
+        await asyncio.wait_for(DeadlineMiddleware(handler)(scope, receive, send), 1)
+
+    disconnects = cancellation_stats.disconnects
+    asyncio.run(run())
+    assert finished == [True]
+    assert cancellation_stats.disconnects == disconnects + 1
@@ -0,0 +1,40 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from config import settings
+from endpoints import ENDPOINTS, compile_plans
+from main import app
+from models import BusinessSearchRequest
+
+client = TestClient(app)
+
+
+def test_plans_resolve_urls_and_prebuild_headers():
+    """Tests that compiling the registry resolves URLs and static headers once."""
+    plans = {plan.spec.path: plan for plan in compile_plans(settings)}
+    assert len(plans) == len(ENDPOINTS)
+    assert plans["/caller-id"].api_url == settings.CALLER_ID_API_URL
+    assert plans["/caller-id/batch"].endpoint == "/caller-id"
+    assert plans["/caller-id"].headers_for("DevAPICallerID")["galaxy-search-type"] == "DevAPICallerID"
+    assert set(plans["/person-search"].headers_by_search_type) == {"Person", "Teaser"}
+    assert plans["/domain-search"].headers_for("Domain")["galaxy-search-type"] == "Domain"
+
+
+def test_plan_serializer_matches_model_dump():
+    """Tests that the cached serializer produces the same body as model_dump."""
+    plan = next(plan for plan in compile_plans(settings) if plan.spec.path == "/business-search")
+    request = BusinessSearchRequest.model_validate({"businessName": "Acme", "Page": 2})
+    assert plan.dump(request) == request.model_dump(by_alias=True, exclude_none=True)
+
+
+def test_search_type_header_and_validators(mock_upstream):
+    """Tests that generated handlers forward header search types and run validators."""
+    client.post("/person-search", json={"FirstName": "Jane"}, headers={"galaxy-search-type": "Teaser"})
+    client.post("/person-search", json={"FirstName": "John"})
+    assert [request.headers["galaxy-search-type"] for request in mock_upstream.requests] == ["Teaser", "Person"]
+    assert json.loads(mock_upstream.requests[0].content) == {"FirstName": "Jane"}
+
+    response = client.post("/contact-enrichment", json={"FirstName": "Jane"})
+    assert response.status_code == 400
+    assert len(mock_upstream.requests) == 2
@@ -0,0 +1,59 @@
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from config import settings
+from entities import EntityLookup, EntityStore, lookup_id
+from main import app
+from passthrough import RawBody
+
+client = TestClient(app)
+
+CONTACT = {"person": {"tahoeId": "G111", "name": {"firstName": "Jane"}}, "isError": False}
+PERSONS = {"persons": [{"tahoeId": "G111"}], "isError": False}
+
+
+def test_store_holds_lookup_responses_by_search_type_and_id_until_they_expire(fake_clock):
+    """Tests that stored responses are kept per search type and ID, and that errors and expired ones are not served."""
+    store = EntityStore(max_entries=10, max_bytes=100_000, ttl=60, clock=fake_clock)
+    lookup = EntityLookup("person", "PersonId")
+    body = RawBody(json.dumps(CONTACT).encode())
+    store.ingest(lookup, "DevAPIContactID", "G111", body)
+    store.ingest(lookup, "DevAPIContactID", "G222", RawBody(b'{"isError": true}'))
+
+    assert store.lookup(lookup, "DevAPIContactID", "G111") is body
+    assert store.lookup(lookup, "Teaser", "G111") is None
+    assert store.lookup(lookup, "DevAPIContactID", "G222") is None
+    fake_clock.now = 61
+    assert store.lookup(lookup, "DevAPIContactID", "G111") is None
+    assert store.stats()["upstream_calls_avoided"] == 1
+
+    assert lookup_id(lookup, {"PersonId": " G111 ", "Page": 1}) == "G111"
+    assert lookup_id(lookup, {"PersonId": "G111", "Page": 2}) is None
+
+
+@pytest.fixture
+def entity_store_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "ENTITY_STORE_ENABLED", True)
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+
+
+def test_repeated_contact_id_is_answered_with_the_upstream_body(mock_upstream, entity_store_enabled):
+    """Tests that a stored contact-id answer is the upstream's own body and that searches are not used."""
+    mock_upstream.handler = lambda request: httpx.Response(
+        200, json=PERSONS if request.url.path.endswith("/PersonSearch") else CONTACT
+    )
+    client.post("/person-search", json={"FirstName": "Jane"})
+    miss = client.post("/contact-id", json={"PersonId": "G111"})
+    assert miss.headers["X-Entity-Store"] == "MISS"
+    assert len(mock_upstream.requests) == 2
+
+    hit = client.post("/contact-id", json={"PersonId": "G111"})
+    assert hit.headers["X-Entity-Store"] == "HIT"
+    assert hit.headers["X-Cache"] == "HIT"
+    assert hit.headers["X-Request-Fingerprint"] == miss.headers["X-Request-Fingerprint"]
+    assert hit.content == miss.content
+    assert len(mock_upstream.requests) == 2
+    assert client.get("/admin/entity-store").json()["upstream_calls_avoided"] == 1
@@ -0,0 +1,22 @@
+import os
+import runpy
+
+CONF_PATH = os.path.join(os.path.dirname(__file__), "..", "gunicorn.conf.py")
+
+
+def test_workers_follow_cpu_quota_and_environment(tmp_path, monkeypatch):
+    """Tests that workers default to the usable CPUs and honour WEB_CONCURRENCY."""
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")  # restored afterwards; the config exports it
+    conf = runpy.run_path(CONF_PATH)
+    assert conf["workers"] == 2
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("150000 100000\n")
+    assert conf["available_cpus"](str(cpu_max)) == min(2, os.process_cpu_count())
+    cpu_max.write_text("max 100000\n")
+    assert conf["available_cpus"](str(cpu_max)) == os.process_cpu_count()
+
+    worker_count = conf["worker_count"]
+    assert worker_count({}, cpus=6) == 6
+    assert worker_count({"GUNICORN_MAX_WORKERS": "4"}, cpus=6) == 4
+    assert worker_count({"WEB_CONCURRENCY": "3"}, cpus=6) == 3
+    assert conf["worker_class"] == "uvicorn_worker.UvicornWorker"
@@ -0,0 +1,56 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from config import settings
+from http_client import UpstreamPool, upstream_origins
+from main import app
+
+
+def test_pool_reuses_client_and_records_stats():
+    """Tests that requests go through the shared client and are counted."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        pool = UpstreamPool()
+        await pool.start(settings, transport=httpx.MockTransport(handler))
+        client = pool.client
+        for _ in range(3):
+            response = await pool.post("https://upstream.test/x", json={"a": 1}, headers={})
+            assert response.body.json() == {"ok": True}
+        assert pool.client is client
+        snapshot = pool.snapshot()
+        await pool.aclose()
+        return snapshot
+
+    snapshot = asyncio.run(run())
+    assert len(calls) == 3
+    assert snapshot["requests"] == 3
+    assert snapshot["in_flight"] == 0
+    assert snapshot["limits"]["max_connections"] == settings.UPSTREAM_MAX_CONNECTIONS
+
+
+def test_pool_requires_start():
+    """Tests that using an unstarted pool fails loudly."""
+    with pytest.raises(RuntimeError):
+        UpstreamPool().client
+
+
+def test_upstream_origins_are_deduplicated():
+    """Tests that pre-warm targets collapse to one entry per origin."""
+    assert upstream_origins(settings) == ["https://devapi.enformion.com"]
+
+
+def test_lifespan_manages_pool():
+    """Tests that the app lifespan opens and closes the shared pool."""
+    with TestClient(app) as client:
+        response = client.get("/admin/upstream-pool")
+        assert response.status_code == 200
+        assert response.json()["started"] is True
+    assert response.json()["requests"] == 0
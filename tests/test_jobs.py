@@ -0,0 +1,190 @@
+import asyncio
+import json
+import sqlite3
+import time
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from jobs import CANCELLED, COMPLETED, INSERT_CHUNK, NDJSON, PENDING, QUEUED, JobRunner, JobStore, RunnerLock
+from config import settings
+from main import app
+
+CSV_FILE = (
+    "FirstName,LastName,Phone,Address.addressLine2\n"
+    "Jane,Doe,(555) 123-4567,\n"
+    "John,,,\n"
+    "Jim,Beam,,\"Springfield, IL\"\n"
+)
+
+
+def wait_for(client: TestClient, job_id: str) -> dict:
+    for _ in range(200):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] == COMPLETED:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job did not complete: {job}")
+
+
+def test_csv_job_runs_rows_through_the_endpoint_validator(mock_upstream):
+    """Tests that a CSV job validates each row, calls upstream and reports per-row results."""
+    with TestClient(app) as client:
+        job = client.post("/jobs?endpoint=/contact-enrichment", content=CSV_FILE, headers={"content-type": "text/csv"})
+        assert job.status_code == 202
+        job = wait_for(client, job.json()["id"])
+        assert (job["total"], job["succeeded"], job["failed"]) == (3, 2, 1)
+
+        lines = [json.loads(line) for line in client.get(f"/jobs/{job['id']}/results").text.splitlines()]
+        assert [(line["index"], line["status"]) for line in lines] == [(0, 200), (1, 400), (2, 200)]
+        assert lines[0]["result"] == {"ok": True}
+        assert json.loads(mock_upstream.requests[0].content)["Phone"] == "555-123-4567"
+        assert len(mock_upstream.requests) == 2
+
+        assert client.post("/jobs?endpoint=/caller-id", content="{}").status_code == 404
+
+
+def test_oversized_upload_is_refused(mock_upstream, monkeypatch):
+    """Tests that files over the upload limit get a 413, with or without a declared length."""
+    monkeypatch.setattr(settings, "JOBS_MAX_UPLOAD_BYTES", len(CSV_FILE) - 1)
+    headers = {"content-type": "text/csv"}
+    with TestClient(app) as client:
+        assert client.post("/jobs?endpoint=/contact-enrichment", content=CSV_FILE, headers=headers).status_code == 413
+        chunks = (line.encode() for line in CSV_FILE.splitlines(keepends=True))
+        assert client.post("/jobs?endpoint=/contact-enrichment", content=chunks, headers=headers).status_code == 413
+        assert client.get("/jobs").json() == []
+    assert mock_upstream.requests == []
+
+
+def test_cancelled_job_is_not_started(tmp_path):
+    """Tests that a job cancelled before the runner picks it up stays cancelled."""
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create_job("/id-verification")
+    store.set_status(job_id, QUEUED)
+    store.set_status(job_id, CANCELLED)
+    assert not store.start(job_id)
+    assert store.status(job_id) == CANCELLED
+    store.close()
+
+
+def test_restarted_runner_skips_checkpointed_rows(tmp_path):
+    """Tests that only rows without a checkpointed result are sent after a restart."""
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    job_id = store.create_job("/id-verification")
+    store.add_rows(job_id, 0, [{"row": 0}, {"row": 1}, {"row": 2}])
+    store.set_status(job_id, QUEUED)
+    store.complete_row(job_id, 0, 200, result=b'{"done":0}')
+    store.close()
+
+    sent = []
+
+    async def process(endpoint, row):
+        sent.append(row["row"])
+        return b'{"done":%d}' % row["row"]
+
+    async def resume():
+        runner = JobRunner()
+        config = SimpleNamespace(
+            JOBS_DB_PATH=path,
+            JOBS_ENDPOINTS=["/id-verification"],
+            JOBS_MAX_ROWS=10,
+            JOBS_CONCURRENCY=2,
+            JOBS_POLL_INTERVAL=0.01,
+        )
+        await runner.start(config, process)
+        while runner.job(job_id)["status"] != COMPLETED:
+            await asyncio.sleep(0.01)
+        lines = [json.loads(line) async for line in runner.results(job_id)]
+        await runner.aclose()
+        return lines
+
+    lines = asyncio.run(resume())
+    assert sorted(sent) == [1, 2]
+    assert [line["result"] for line in lines] == [{"done": 0}, {"done": 1}, {"done": 2}]
+
+
+def test_runner_recovers_from_an_unexpected_error(tmp_path, monkeypatch):
+    """Tests that the runner backs off and finishes the job after a failure outside row processing."""
+    path = str(tmp_path / "jobs.sqlite3")
+    complete_row = JobStore.complete_row
+    failures = []
+
+    def flaky_complete_row(self, *args, **kwargs):
+        if not failures:
+            failures.append(True)
+            raise sqlite3.OperationalError("database is locked")
+        complete_row(self, *args, **kwargs)
+
+    monkeypatch.setattr(JobStore, "complete_row", flaky_complete_row)
+
+    async def process(endpoint, row):
+        return b'{"done":%d}' % row["row"]
+
+    async def run():
+        runner = JobRunner()
+        config = SimpleNamespace(
+            JOBS_DB_PATH=path,
+            JOBS_ENDPOINTS=["/id-verification"],
+            JOBS_MAX_ROWS=10,
+            JOBS_CONCURRENCY=2,
+            JOBS_POLL_INTERVAL=0.01,
+        )
+        await runner.start(config, process)
+        job = await runner.submit("/id-verification", NDJSON, b'{"row": 0}\n{"row": 1}\n')
+        while runner.job(job["id"])["status"] != COMPLETED:
+            await asyncio.sleep(0.01)
+        job = runner.job(job["id"])
+        await runner.aclose()
+        return job
+
+    job = asyncio.run(asyncio.wait_for(run(), 5))
+    assert failures == [True]
+    assert (job["total"], job["succeeded"]) == (2, 2)
+
+
+def test_interrupted_upload_leaves_no_job(tmp_path):
+    """Tests that a job is not run before all its rows are stored, and is dropped if the upload is cancelled."""
+    sent = []
+
+    async def process(endpoint, row):
+        sent.append(row)
+        return b"{}"
+
+    async def run():
+        runner = JobRunner()
+        config = SimpleNamespace(
+            JOBS_DB_PATH=str(tmp_path / "jobs.sqlite3"),
+            JOBS_ENDPOINTS=["/id-verification"],
+            JOBS_MAX_ROWS=10 * INSERT_CHUNK,
+            JOBS_CONCURRENCY=2,
+            JOBS_POLL_INTERVAL=0.01,
+        )
+        await runner.start(config, process)
+        content = b'{"row": 0}\n' * (3 * INSERT_CHUNK)
+        upload = asyncio.create_task(runner.submit("/id-verification", NDJSON, content))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        statuses = [job["status"] for job in runner.jobs()]
+        upload.cancel()
+        await asyncio.gather(upload, return_exceptions=True)
+        await asyncio.sleep(0.05)
+        jobs = runner.jobs()
+        await runner.aclose()
+        return statuses, jobs
+
+    statuses, jobs = asyncio.run(run())
+    assert statuses == [PENDING]
+    assert jobs == []
+    assert sent == []
+
+
+def test_one_process_at_a_time_runs_jobs(tmp_path):
+    """Tests that the runner lock elects a single holder and is handed over on release."""
+    path = str(tmp_path / "jobs.sqlite3.lock")
+    first, second = RunnerLock(path), RunnerLock(path)
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
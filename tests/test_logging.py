@@ -0,0 +1,72 @@
+import io
+import json
+import logging
+
+from logging_config import JsonFormatter, LogPipeline, PipelineHandler, RepeatSampler
+
+
+def make_logger(handler: logging.Handler) -> logging.Logger:
+    log = logging.getLogger("tests.logging")
+    log.handlers = [handler]
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    return log
+
+
+def test_records_are_formatted_as_json_by_the_writer_thread():
+    """Tests that arguments, extra fields and tracebacks end up in one JSON object per record."""
+    stream = io.StringIO()
+    pipeline = LogPipeline(stream, formatter=JsonFormatter())
+    log = make_logger(PipelineHandler(pipeline))
+    pipeline.start()
+    log.info("Fetched %d records", 3, extra={"endpoint": "/caller-id"})
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.exception("Failed")
+    pipeline.close()
+
+    first, second = map(json.loads, stream.getvalue().splitlines())
+    assert (first["level"], first["message"], first["endpoint"]) == ("INFO", "Fetched 3 records", "/caller-id")
+    assert first["logger"] == "tests.logging"
+    assert "ValueError: boom" in second["exception"]
+    assert pipeline.written == 2
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    """Tests that records beyond the queue bound are counted as dropped."""
+    pipeline = LogPipeline(io.StringIO(), max_queue=2)
+    log = make_logger(PipelineHandler(pipeline))
+    for number in range(5):
+        log.warning("Record %d", number)
+    assert pipeline.dropped == 3
+    assert pipeline.stats()["queued"] == 2
+
+
+def test_repetitive_records_are_sampled_per_call_site():
+    """Tests that a call site logs `burst` records per window and reports how many it held back."""
+    stream = io.StringIO()
+    pipeline = LogPipeline(stream)
+    handler = PipelineHandler(pipeline, RepeatSampler(burst=2, window=60.0))
+    log = make_logger(handler)
+
+    def fail(number: int):
+        log.error("Upstream failed: %d", number)
+
+    for number in range(5):
+        fail(number)
+    log.error("Another call site")
+    assert handler.suppressed == 3
+
+    handler.sampler.window = 0.0
+    fail(5)
+    pipeline.start()
+    pipeline.close()
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [record["message"] for record in records] == [
+        "Upstream failed: 0",
+        "Upstream failed: 1",
+        "Another call site",
+        "Upstream failed: 5",
+    ]
+    assert records[-1]["suppressed"] == 3
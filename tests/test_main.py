@@ -9,4 +9,4 @@ def test_health_check():
     """Tests the health check endpoint."""
     response = client.get("/health")
     assert response.status_code == 200
-    assert response.json() == {"status": "ok"}
+    assert response.json() == {"status": "ok", "circuit_breakers": {}}
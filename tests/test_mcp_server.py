@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from main import app
+from mcp_server import LazyMCP
+
+MCP_HEADERS = {"accept": "application/json, text/event-stream"}
+
+
+def make_app(version: str = "1.0.0") -> FastAPI:
+    sample = FastAPI(title="Sample", version=version)
+
+    @sample.post("/echo")
+    async def echo(value: str):
+        return {"value": value}
+
+    return sample
+
+
+def test_schema_cache_is_reused_until_the_version_changes(tmp_path, monkeypatch):
+    """Tests that a second server loads its tools from the cache instead of converting the schema."""
+    from fastapi_mcp import server as server_module
+
+    config = SimpleNamespace(SCHEMA_CACHE_PATH=str(tmp_path / "schema_cache.json"), MCP_TOOL_TIMEOUT=5.0)
+    generators = server_module.get_openapi, server_module.convert_openapi_to_mcp_tools
+
+    def checked_conversion(*args, **kwargs):
+        # Other threads building servers must see the library's module untouched.
+        assert (server_module.get_openapi, server_module.convert_openapi_to_mcp_tools) == (
+            generators[0],
+            checked_conversion,
+        )
+        return generators[1](*args, **kwargs)
+
+    monkeypatch.setattr(server_module, "convert_openapi_to_mcp_tools", checked_conversion)
+    first = LazyMCP(make_app(), config)
+    assert [tool.name for tool in first.tools] == ["echo_echo_post"]
+
+    def no_conversion(*args, **kwargs):
+        raise AssertionError("schema converted despite a current cache")
+
+    monkeypatch.setattr(server_module, "convert_openapi_to_mcp_tools", no_conversion)
+    cached_app = make_app()
+    cached = LazyMCP(cached_app, config)
+    assert cached.tools == first.tools
+    assert cached.operation_map == first.operation_map
+    assert cached_app.openapi()["info"]["version"] == "1.0.0"
+
+    with pytest.raises(AssertionError):
+        LazyMCP(make_app("1.0.1"), config).get()
+    assert server_module.convert_openapi_to_mcp_tools is no_conversion
+
+
+def test_importing_the_app_defers_the_mcp_server(tmp_path):
+    """Tests that fastapi-mcp is not imported until the MCP server is needed."""
+    script = "import sys, main; print('fastapi_mcp' in sys.modules)"
+    env = {**os.environ, "GALAXY_AP_NAME": "x", "GALAXY_AP_PASSWORD": "y", "SCHEMA_CACHE_PATH": ""}
+    output = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+    assert output.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_mcp_requests_are_served_by_the_lazy_server(schema_cache):
+    """Tests that /mcp answers an MCP session and that startup wrote the schema cache."""
+    initialize = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {"protocolVersion": "2025-03-26", "capabilities": {}, "clientInfo": {"name": "test", "version": "1"}},
+    }
+    with TestClient(app) as client:
+        response = client.post("/mcp", json=initialize, headers=MCP_HEADERS)
+        assert response.status_code == 200
+        headers = {**MCP_HEADERS, "mcp-session-id": response.headers["mcp-session-id"]}
+        client.post("/mcp", json={"jsonrpc": "2.0", "method": "notifications/initialized"}, headers=headers)
+        tools = client.post("/mcp", json={"jsonrpc": "2.0", "id": 2, "method": "tools/list"}, headers=headers)
+        assert "caller_id_caller_id_post" in [tool["name"] for tool in tools.json()["result"]["tools"]]
@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+
+from main import app
+from metrics import MetricsRegistry
+
+client = TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Tests the Prometheus text rendering of counters and histograms."""
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_total", "Demo counter.", ("route",))
+    histogram = registry.histogram("demo_seconds", "Demo histogram.", ("route",), buckets=(0.1, 1.0))
+    counter.inc(("/a",))
+    counter.inc(("/a",))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(("/a",), value)
+
+    text = registry.render()
+    assert "# TYPE demo_total counter" in text
+    assert 'demo_total{route="/a"} 2' in text
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{route="/a"} 3' in text
+    assert 'demo_seconds_sum{route="/a"} 5.55' in text
+
+
+def test_metrics_endpoint_reports_routes_and_upstream(mock_upstream):
+    """Tests that requests are recorded by route template and search type."""
+    client.post("/caller-id", json={"Phone": "555-123-4567"})
+    client.post("/caller-id", json={"Phone": "555-123-4567"})
+    client.get("/no-such-route")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'enformion_http_requests_total{route="/caller-id",method="POST",status="2xx"}' in text
+    assert 'enformion_http_requests_total{route="unmatched",method="GET",status="4xx"}' in text
+    assert 'enformion_upstream_requests_total{search_type="DevAPICallerID",outcome="ok"}' in text
+    assert 'enformion_upstream_requests_total{search_type="DevAPICallerID",outcome="cache_hit"}' in text
+    assert 'enformion_http_overhead_duration_seconds_count{route="/caller-id"}' in text
+    assert 'enformion_http_response_size_bytes_bucket{route="/caller-id",le="256"}' in text
+    assert "enformion_http_requests_in_flight 1" in text  # the scrape itself
+    assert 'enformion_cache_lookups_total{result="hit"}' in text
@@ -0,0 +1,28 @@
+import gzip
+import json
+
+from benchmarks.mock_upstream import MockUpstream, upstream_paths
+
+
+def test_every_upstream_url_is_served():
+    """Tests that the mock answers every configured upstream URL with a JSON body."""
+    mock = MockUpstream()
+    for path in upstream_paths().values():
+        status, headers, body = mock.respond(path, b"{}", accept_gzip=True)
+        assert status == 200, path
+        assert headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(body))["isError"] is False
+
+
+def test_search_pages_and_injected_failures():
+    """Tests paging totals and that error and 429 injection follow the configured rates."""
+    mock = MockUpstream(total_results=25)
+    status, _, body = mock.respond("/PersonSearch", b'{"Page": 3, "ResultsPerPage": 10}')
+    page = json.loads(body)
+    assert len(page["persons"]) == 5
+    assert page["pagination"]["totalPages"] == 3
+
+    assert mock.respond("/Nowhere", b"{}")[0] == 404
+    throttled = MockUpstream(throttle_rate=1.0, retry_after=2)
+    assert throttled.respond("/Phone/Enrich", b"{}")[:2] == (429, {"Retry-After": "2"})
+    assert MockUpstream(error_rate=1.0).respond("/Phone/Enrich", b"{}")[0] == 500
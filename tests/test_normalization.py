@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+
+from main import app
+from models import AddressIdRequest, IdVerificationRequest
+from normalization import canonical_phone
+
+client = TestClient(app)
+
+
+def test_phone_spellings_share_one_canonical_form():
+    """Tests that common phone formats collapse to one value and odd ones are left alone."""
+    for spelling in ("(555) 123-4567", "555-123-4567", "+15551234567", "555.123.4567", " 1 555 123 4567 "):
+        assert canonical_phone(spelling) == "555-123-4567"
+    assert canonical_phone(" +44 20 7946 0958 ") == "+44 20 7946 0958"
+
+
+def test_models_normalize_emails_addresses_and_lists():
+    """Tests that validation produces canonical upstream bodies."""
+    request = IdVerificationRequest.model_validate(
+        {
+            "Phones": ["(555) 123-4567", "+15551234567"],
+            "Emails": [" Jane.Doe@Example.com", "jane.doe@example.com"],
+            "AddressLine1": "123  main st ",
+        }
+    )
+    assert request.model_dump(by_alias=True, exclude_none=True) == {
+        "Phones": ["555-123-4567"],
+        "Emails": ["jane.doe@example.com"],
+        "AddressLine1": "123 MAIN ST",
+    }
+    address = AddressIdRequest.model_validate({"addressLine1": "1 Elm st", "addressLine2": "springfield,  il"})
+    assert address.address_line_2 == "SPRINGFIELD, IL"
+
+
+def test_equivalent_requests_share_fingerprint_and_upstream_call(mock_upstream):
+    """Tests that phone variants hit the cache of the first spelling."""
+    first = client.post("/caller-id", json={"Phone": "(555) 123-4567"})
+    second = client.post("/caller-id", json={"Phone": "+15551234567"})
+
+    assert first.headers["X-Request-Fingerprint"] == second.headers["X-Request-Fingerprint"]
+    assert second.headers["X-Cache"] == "HIT"
+    assert len(mock_upstream.requests) == 1
+    assert mock_upstream.requests[0].content == b'{"Phone":"555-123-4567"}'
@@ -0,0 +1,96 @@
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from main import app
+from pagination import page_records, page_totals
+
+client = TestClient(app)
+
+
+def paged_handler(total: int, fail_page: int = None, with_totals: bool = True):
+    """Answers reverse phone searches with `total` records split into pages."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        page, per_page = body["Page"], body["ResultsPerPage"]
+        if page == fail_page:
+            return httpx.Response(500, json={"error": "upstream"})
+        first = (page - 1) * per_page
+        persons = [{"id": i} for i in range(first, min(first + per_page, total))]
+        data = {"persons": persons, "counts": {"searchResults": total}}
+        if with_totals:
+            data["pagination"] = {"currentPageNumber": page, "totalResults": total}
+        return httpx.Response(200, json=data)
+
+    return handler
+
+
+def read_lines(response):
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return [line for line in lines if "record" in line], lines[-1]
+
+
+def test_page_helpers_find_totals_and_records():
+    """Tests that totals and records are found whatever the casing and record key."""
+    page = {"Pagination": {"TotalPages": "3", "totalResults": 25}, "businesses": [{"a": 1}], "tags": ["x", "y"]}
+    assert page_totals(page) == (3, 25)
+    assert page_records(page) == [{"a": 1}]
+    assert page_totals({"persons": []}) == (None, None)
+
+
+def test_all_pages_streams_every_record(mock_upstream):
+    """Tests that every page is fetched and each record is streamed once."""
+    mock_upstream.handler = paged_handler(total=25)
+    response = client.post(
+        "/reverse-phone-search", params={"all_pages": True}, json={"Phone": "555-123-4567", "ResultsPerPage": 10}
+    )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records, summary = read_lines(response)
+    assert sorted(line["record"]["id"] for line in records) == list(range(25))
+    assert summary == {
+        "summary": {"pages": 3, "failed_pages": 0, "records": 25, "total_results": 25, "truncated": False}
+    }
+    assert len(mock_upstream.requests) == 3
+
+
+def test_all_pages_stops_at_max_records(mock_upstream):
+    """Tests that max_records caps the output and the pages requested."""
+    mock_upstream.handler = paged_handler(total=1000)
+    response = client.post(
+        "/reverse-phone-search",
+        params={"all_pages": True, "max_records": 15},
+        json={"Phone": "555-123-4567", "ResultsPerPage": 10},
+    )
+
+    records, summary = read_lines(response)
+    assert len(records) == 15
+    assert summary["summary"]["truncated"] is True
+    assert len(mock_upstream.requests) == 2
+
+
+def test_all_pages_reports_failed_pages(mock_upstream):
+    """Tests that a failing page becomes an error line without aborting the stream."""
+    mock_upstream.handler = paged_handler(total=30, fail_page=2)
+    response = client.post(
+        "/reverse-phone-search", params={"all_pages": True}, json={"Phone": "555-123-4567", "ResultsPerPage": 10}
+    )
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert {"page": 2, "status": 400, "error": "An internal error occurred while processing the request."} in lines
+    assert lines[-1]["summary"]["failed_pages"] == 1
+    assert lines[-1]["summary"]["records"] == 20
+
+
+def test_all_pages_without_totals_reads_until_short_page(mock_upstream):
+    """Tests the sequential fallback when the upstream does not report a total."""
+    mock_upstream.handler = paged_handler(total=23, with_totals=False)
+    response = client.post(
+        "/reverse-phone-search", params={"all_pages": True}, json={"Phone": "555-123-4567", "ResultsPerPage": 10}
+    )
+
+    records, summary = read_lines(response)
+    assert len(records) == 23
+    assert summary["summary"]["pages"] == 3
@@ -0,0 +1,54 @@
+import gzip
+
+import httpx
+from fastapi.testclient import TestClient
+
+from main import app
+from passthrough import RawBody, accepts_encoding
+
+client = TestClient(app)
+
+PAYLOAD = b'{"records":[{"id":1},{"id":2}]}'
+
+
+def gzip_upstream(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        200,
+        headers={"Content-Type": "application/json; charset=utf-8", "Content-Encoding": "gzip"},
+        stream=httpx.ByteStream(gzip.compress(PAYLOAD)),
+    )
+
+
+def test_accepts_encoding():
+    """Tests Accept-Encoding negotiation, including q=0 refusals."""
+    assert accepts_encoding("gzip, deflate, br", "gzip")
+    assert accepts_encoding("*", "gzip")
+    assert not accepts_encoding("gzip;q=0, deflate", "gzip")
+    assert not accepts_encoding("identity", "gzip")
+
+
+def test_raw_body_decodes_lazily():
+    """Tests that compressed bodies are decoded and parsed only on demand."""
+    body = RawBody(gzip.compress(PAYLOAD), encoding="gzip")
+    assert len(body) == len(gzip.compress(PAYLOAD))
+    assert body.json() == {"records": [{"id": 1}, {"id": 2}]}
+
+
+def test_compressed_upstream_body_is_forwarded_as_is(mock_upstream):
+    """Tests that gzip clients receive the upstream bytes without re-encoding."""
+    mock_upstream.handler = gzip_upstream
+    response = client.post("/business-search", json={"businessName": "Acme"}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"] == "application/json; charset=utf-8"
+    assert response.content == PAYLOAD
+
+
+def test_compressed_upstream_body_is_decoded_for_identity_clients(mock_upstream):
+    """Tests that clients which refuse gzip get the decoded body."""
+    mock_upstream.handler = gzip_upstream
+    response = client.post(
+        "/business-search", json={"businessName": "Acme"}, headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-length"] == str(len(PAYLOAD))
+    assert response.content == PAYLOAD
@@ -0,0 +1,60 @@
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+import main
+from config import settings
+from main import app
+from prefetch import Prefetcher, build_prefetcher
+
+client = TestClient(app)
+
+
+def test_budget_caps_prefetches_per_search_type():
+    """Tests that prefetches stop once a search type's budget is spent, and while the worker is busy."""
+    now = [0.0]
+    prefetcher = Prefetcher(
+        {},
+        ttl=60.0,
+        max_entries=100,
+        max_bytes=1 << 20,
+        concurrency=4,
+        budgets_per_minute={"Person": 6.0},
+        default_budget_per_minute=0.0,
+        clock=lambda: now[0],
+    )
+    assert prefetcher.admit("Person", busy=False)
+    assert not prefetcher.admit("Person", busy=False)
+    assert not prefetcher.admit("BusinessId", busy=False)
+    now[0] = 10.0
+    assert not prefetcher.admit("Person", busy=True)
+    assert prefetcher.admit("Person", busy=False)
+    assert prefetcher.stats()["skipped_budget"] == 2
+    assert prefetcher.stats()["skipped_busy"] == 1
+
+
+def test_follow_up_is_answered_from_prefetch(mock_upstream, monkeypatch):
+    """Tests that the top search results are looked up ahead of time and the follow-up uses them."""
+    prefetcher = build_prefetcher(settings.model_copy(update={"PREFETCH_ENABLED": True}))
+    monkeypatch.setattr(main, "prefetcher", prefetcher)
+
+    def handler(request):
+        if request.url.path.endswith("/PersonSearch"):
+            return httpx.Response(200, json={"persons": [{"tahoeId": f"G{n}"} for n in range(3)]})
+        return httpx.Response(200, json={"person": json.loads(request.content)["PersonId"]})
+
+    mock_upstream.handler = handler
+    assert client.post("/person-search", json={"FirstName": "Jane", "LastName": "Doe"}).status_code == 200
+
+    hit = client.post("/contact-id", json={"PersonId": "G0"})
+    assert hit.headers["X-Prefetch"] == "HIT"
+    assert hit.json() == {"person": "G0"}
+    miss = client.post("/contact-id", json={"PersonId": "G2"})
+    assert "X-Prefetch" not in miss.headers
+    assert len(mock_upstream.requests) == 4
+
+    stats = client.get("/admin/prefetch").json()
+    assert stats["issued"] == 2
+    assert stats["hits"] == 1
+    assert stats["hit_ratio"] == 0.5
@@ -0,0 +1,56 @@
+import json
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from main import app
+from projection import parse_fields
+
+client = TestClient(app)
+
+PERSONS = {
+    "persons": [
+        {"tahoeId": "G111", "name": {"firstName": "Jane", "lastName": "Doe"}, "addresses": [{"city": "Springfield"}]},
+        {"tahoeId": "G222", "name": {"firstName": "John", "lastName": "Doe"}, "addresses": []},
+    ],
+    "pagination": {"currentPageNumber": 1, "totalPages": 1},
+    "isError": False,
+}
+
+
+def test_paths_select_case_insensitively_through_lists():
+    """Tests that paths traverse lists, ignore key case and keep whole subtrees."""
+    projection = parse_fields(" persons.TAHOEID, persons.name.firstName,pagination ")
+    assert projection.apply(PERSONS) == {
+        "persons": [
+            {"tahoeId": "G111", "name": {"firstName": "Jane"}},
+            {"tahoeId": "G222", "name": {"firstName": "John"}},
+        ],
+        "pagination": PERSONS["pagination"],
+    }
+    assert parse_fields("persons,persons.name").apply(PERSONS) == {"persons": PERSONS["persons"]}
+    assert parse_fields("persons.tahoeId,persons.name.firstName") is parse_fields("persons.name.firstName,persons.tahoeId")
+    assert parse_fields("  ") is None
+    with pytest.raises(HTTPException):
+        parse_fields("persons..name")
+
+
+def test_projected_response_reports_sizes_and_keeps_cache_whole(mock_upstream):
+    """Tests that projection shrinks the response while the cached body stays complete."""
+    mock_upstream.handler = lambda request: httpx.Response(200, json=PERSONS)
+
+    # /contact-id is cached by default; searches are not.
+    response = client.post("/contact-id?fields=persons.tahoeId", json={"PersonId": "G111"})
+    assert response.json() == {"persons": [{"tahoeId": "G111"}, {"tahoeId": "G222"}]}
+    assert int(response.headers["X-Projected-Size"]) == len(response.content)
+
+    full = client.post("/contact-id", json={"PersonId": "G111"})
+    assert full.headers["X-Cache"] == "HIT"
+    assert full.json() == PERSONS
+    assert int(response.headers["X-Original-Size"]) == len(full.content)
+    assert len(mock_upstream.requests) == 1
+
+    batch = client.post("/caller-id/batch?fields=persons.name.lastName", json={"items": [{"Phone": "555-123-4567"}]})
+    assert json.loads(batch.text)["result"] == {"persons": [{"name": {"lastName": "Doe"}}] * 2}
@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from exceptions import RateLimitError
+from main import app
+from config import settings
+from rate_limit import RateLimiter, TokenBucket, build_rate_limiter, parse_retry_after, rate_limiter
+
+client = TestClient(app)
+
+
+def test_bucket_queues_callers_in_order():
+    """Tests that reservations beyond the burst are spaced by the refill rate."""
+    bucket = TokenBucket(rate=10.0, burst=2, now=0.0)
+    assert [bucket.reserve(0.0) for _ in range(4)] == [0.0, 0.0, pytest.approx(0.1), pytest.approx(0.2)]
+
+
+def test_limiter_rejects_when_wait_exceeds_max():
+    """Tests that calls which would queue too long fail fast."""
+
+    async def run():
+        limiter = RateLimiter(None, 1, {"Person": 1.0}, max_wait=0.5, default_retry_after=1.0)
+        await limiter.acquire("Person")
+        with pytest.raises(RateLimitError):
+            await limiter.acquire("Person")
+        await limiter.acquire("Business")
+        return limiter.stats()
+
+    stats = asyncio.run(run())
+    assert stats["rejected"] == 1
+    assert stats["admitted"] == 2
+
+
+def test_cancelled_waiter_returns_its_token():
+    """Tests that a call cancelled while queued does not delay the callers behind it."""
+    now = [0.0]
+
+    async def run():
+        limiter = RateLimiter(None, 1, {"Person": 1.0}, max_wait=5.0, default_retry_after=1.0, clock=lambda: now[0])
+        await limiter.acquire("Person")
+        waiting = asyncio.create_task(limiter.acquire("Person"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.queued == 0
+    assert limiter.search_type_buckets["Person"].reserve(0.0) == pytest.approx(1.0)
+
+
+def test_throttle_pauses_bucket():
+    """Tests that an upstream 429 pauses and slows the affected bucket."""
+    bucket = TokenBucket(rate=10.0, burst=10, now=0.0)
+    bucket.throttle(0.0, retry_after=2.0)
+    assert bucket.rate == 5.0
+    assert bucket.reserve(0.5) >= 1.5
+
+
+def test_parse_retry_after():
+    """Tests both Retry-After formats."""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_upstream_429_is_returned_as_429(mock_upstream):
+    """Tests that an upstream 429 is surfaced to the caller with Retry-After."""
+    mock_upstream.handler = lambda request: httpx.Response(429, headers={"Retry-After": "0"})
+    response = client.post("/reverse-phone-search", json={"Phone": "555-123-4567"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert rate_limiter.stats()["throttled"] >= 1
+
+
+def test_limits_are_shared_between_worker_processes():
+    """Tests that each of several workers enforces its share of the server-wide limits."""
+    shared = settings.model_copy(
+        update={"WEB_CONCURRENCY": 4, "RATE_LIMIT_GLOBAL_RPS": 20.0, "RATE_LIMIT_SEARCH_TYPE_RPS": {"Person": 8.0}}
+    )
+    limiter = build_rate_limiter(shared)
+    assert limiter.global_bucket.rate == 5.0
+    assert limiter.global_bucket.burst == 5.0
+    assert limiter.search_type_buckets["Person"].rate == 2.0
@@ -0,0 +1,78 @@
+import asyncio
+
+import httpx
+import pytest
+
+from config import settings
+from resilience import UpstreamResilience, resolve_timeouts
+
+fast_settings = settings.model_copy(
+    update={"RETRY_BACKOFF_BASE": 0.0, "HEDGE_ENABLED": True, "HEDGE_MIN_SAMPLES": 1, "HEDGE_MIN_DELAY": 0.01}
+)
+
+
+def test_retries_5xx_then_succeeds():
+    """Tests that transient 5xx responses and connection errors are retried."""
+    outcomes = [httpx.Response(503), httpx.ConnectError("reset"), httpx.Response(200)]
+
+    async def send():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    resilience = UpstreamResilience()
+    response = asyncio.run(resilience.call(send, fast_settings.model_copy(update={"HEDGE_ENABLED": False}), None, 5))
+    assert response.status_code == 200
+    assert resilience.stats()["retries"] == 2
+
+
+def test_client_errors_are_not_retried():
+    """Tests that 4xx responses are returned without retrying."""
+    calls = []
+
+    async def send():
+        calls.append(1)
+        return httpx.Response(400)
+
+    response = asyncio.run(UpstreamResilience().call(send, fast_settings, None, 5))
+    assert response.status_code == 400
+    assert len(calls) == 1
+
+
+def test_hedge_wins_over_slow_primary():
+    """Tests that a hedged duplicate answers when the first attempt stalls."""
+    delays = [0.0, 1.0, 0.0]
+
+    async def send():
+        await asyncio.sleep(delays.pop(0))
+        return httpx.Response(200)
+
+    async def run():
+        resilience = UpstreamResilience()
+        await resilience.call(send, fast_settings, "/caller-id", 5)
+        await resilience.call(send, fast_settings, "/caller-id", 5)
+        return resilience.stats()
+
+    stats = asyncio.run(run())
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_total_budget_is_enforced():
+    """Tests that the total timeout budget bounds all attempts."""
+
+    async def send():
+        await asyncio.sleep(1)
+        return httpx.Response(200)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(UpstreamResilience().call(send, settings, None, 0.01))
+
+
+def test_per_endpoint_timeouts():
+    """Tests that endpoint overrides fall back to the global defaults."""
+    timeout, total = resolve_timeouts(settings, "/address-autocomplete")
+    assert (timeout.connect, timeout.read, total) == (2.0, 3.0, 5.0)
+    timeout, total = resolve_timeouts(settings, "/census-search")
+    assert (timeout.connect, timeout.read, total) == (5.0, 15.0, 30.0)
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+import main
+from cache import response_cache
+from config import settings
+from main import app
+from passthrough import RawBody
+from response_store import ResponseStore
+
+
+def test_entries_are_compressed_expire_and_stay_within_the_size_bound(tmp_path):
+    """Tests the TTL and stale window of stored entries, compression and eviction by expiry."""
+    now = [1_000.0]
+    store = ResponseStore(max_bytes=2_000, stale_seconds=30.0, clock=lambda: now[0])
+    store.open(str(tmp_path / "responses.sqlite3"))
+    body = RawBody(json.dumps({"names": ["Jane Doe"] * 100}).encode())
+
+    async def run():
+        store.save("short", "/caller-id", body, 10.0)
+        store.save("long", "/caller-id", body, 100.0)
+        await store.flush()
+        entry = store.get("short")
+        assert entry.value.encoding == "deflate"
+        assert entry.value.json() == json.loads(body.content)
+        assert not entry.stale
+        now[0] += 20.0
+        assert store.get("short").stale
+        now[0] += 20.0
+        assert store.get("short") is None
+
+        for n in range(50):
+            store.save(f"filler-{n}", "/caller-id", RawBody(bytes(range(256)) * 2), 1_000.0)
+        await store.flush()
+        assert store.get("long") is None
+        stats = store.stats()
+        assert stats["bytes"] <= 2_000
+        assert stats["evictions"] > 0
+        await store.aclose()
+
+    asyncio.run(run())
+
+
+def test_answers_survive_a_restart_and_stale_ones_are_refreshed(mock_upstream, monkeypatch):
+    """Tests that a restarted app answers from disk and refreshes a stale answer in the background."""
+    offset = [0.0]
+    store = ResponseStore(max_bytes=1 << 20, stale_seconds=300.0, clock=lambda: main.time.time() + offset[0])
+    monkeypatch.setattr(settings, "RESPONSE_STORE_ENABLED", True)
+    monkeypatch.setattr(main, "response_store", store)
+    request = {"Phone": "555-123-4567"}
+
+    with TestClient(app) as client:
+        assert client.post("/caller-id", json=request).headers["X-Cache"] == "MISS"
+        # A restart: the in-process cache is gone and the database is opened again.
+        path = store.path
+        client.portal.call(store.aclose)
+        response_cache.purge()
+        store.open(path)
+
+        hit = client.post("/caller-id", json=request)
+        assert hit.headers["X-Response-Store"] == "HIT"
+        assert hit.json() == {"ok": True}
+        assert len(mock_upstream.requests) == 1
+
+        response_cache.purge()
+        offset[0] = settings.CACHE_TTLS["/caller-id"] + 60
+        stale = client.post("/caller-id", json=request)
+        assert stale.headers["X-Cache"] == "STALE"
+        assert stale.json() == {"ok": True}
+        client.portal.call(store.flush)
+        assert len(mock_upstream.requests) == 2
+
+        response_cache.purge()
+        assert client.post("/caller-id", json=request).headers["X-Response-Store"] == "HIT"
+        stats = client.get("/admin/response-store").json()
+        assert (stats["hits"], stats["stale_hits"], stats["revalidations"]) == (2, 1, 1)
+        assert client.delete("/admin/cache").json()["purged_from_store"] == 1
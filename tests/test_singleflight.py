@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    """Tests that identical concurrent calls run the underlying call once."""
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"body"
+
+    async def run():
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do("k", fetch) for _ in range(5)))
+        return flights, results
+
+    flights, results = asyncio.run(run())
+    assert calls == 1
+    assert [value for value, _ in results] == [b"body"] * 5
+    assert sum(shared for _, shared in results) == 4
+    assert flights.stats() == {"executed": 1, "coalesced": 4, "abandoned": 0, "in_flight": 0}
+
+
+def test_errors_propagate_to_every_waiter():
+    """Tests that a failing shared call raises in all waiters."""
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        flights = SingleFlight()
+        return await asyncio.gather(*(flights.do("k", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    """Tests that cancelling the initiating waiter leaves other waiters unaffected."""
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        flights = SingleFlight()
+        leader = asyncio.ensure_future(flights.do("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == ("done", True)
+
+
+def test_call_is_cancelled_once_every_waiter_is_gone():
+    """Tests that the shared call stops when nobody is left to receive its result."""
+    started = []
+
+    async def fetch():
+        started.append(True)
+        await asyncio.sleep(10)
+
+    async def run():
+        flights = SingleFlight()
+        waiters = [asyncio.ensure_future(flights.do("k", fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        return flights
+
+    flights = asyncio.run(run())
+    assert started == [True]
+    assert flights.stats()["abandoned"] == 1
+    assert flights.in_flight == 0